@@ -1,17 +1,54 @@
+import os
+
 from flask import Flask
 from flask_cors import CORS
-from flask_migrate import Migrate
 from flask_sqlalchemy import SQLAlchemy
 
+from app.config import budgeted_engine_config
+from app.utils.compression import register_response_compression
+from app.utils.db_routing import RoutingSession
+from app.utils.json_provider import FastJSONProvider
+from app.utils.timing import register_request_timing
+
 # Initialize extensions
-db = SQLAlchemy()
-migrate = Migrate()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 cors = CORS()
 
+class SearcherFlask(Flask):
+  """Flask application that can run async views on a persistent worker event loop."""
+  
+  json_provider_class = FastJSONProvider
+  
+  def async_to_sync(self, func):
+    """
+    Run async views on the worker's event loop when PERSISTENT_EVENT_LOOP is set.
+    
+    Flask otherwise starts a new event loop for every async view call, so
+    pooled async clients cannot keep connections between requests; the
+    clients opened on that loop are closed when the view returns.
+    """
+    from app.utils.event_loop import run_loop_exit_callbacks, worker_loop
+    
+    if not self.config.get('PERSISTENT_EVENT_LOOP'):
+      async def run_and_clean_up(*args, **kwargs):
+        try:
+          return await func(*args, **kwargs)
+        finally:
+          await run_loop_exit_callbacks()
+      
+      return super().async_to_sync(run_and_clean_up)
+    
+    def wrapper(*args, **kwargs):
+      return worker_loop.run(func(*args, **kwargs))
+    
+    return wrapper
+
 def create_app(config_object='app.config.DevelopmentConfig'):
   """Create application factory."""
-  app = Flask(__name__.split('.')[0])
+  app = SearcherFlask(__name__.split('.')[0])
   app.config.from_object(config_object)
+  if app.config.get('SIZE_POOLS_FROM_BUDGET'):
+    app.config.update(budgeted_engine_config())
   
   # Initialize extensions with app
   register_extensions(app)
@@ -19,12 +56,26 @@ def create_app(config_object='app.config.DevelopmentConfig'):
   # Register blueprints
   register_blueprints(app)
   
+  # Time request stages for Server-Timing headers and /metrics
+  register_request_timing(app)
+  
+  # Registered last so it runs first and its time is included in Server-Timing
+  register_response_compression(app)
+  
   return app
 
 def register_extensions(app):
   """Register Flask extensions."""
   db.init_app(app)
-  migrate.init_app(app, db)
+  
+  # Alembic is slow to import and only needed by the `flask db` commands
+  if os.getenv('FLASK_RUN_FROM_CLI') == 'true':
+    from flask_migrate import Migrate
+    Migrate(app, db)
+  
+  from app.services.db_pools import instrument_pools
+  instrument_pools(app)
+  
   cors.init_app(
     app,
     origins=app.config.get('CORS_ORIGIN_WHITELIST', '*'),
@@ -34,10 +85,51 @@ def register_extensions(app):
 
 def register_blueprints(app):
   """Register Flask blueprints."""
-  from app.api import companies, enrichment, saved
+  from app.api import companies, enrichment, metrics, saved
   
   app.register_blueprint(companies.blueprint)
   app.register_blueprint(enrichment.blueprint)
+  app.register_blueprint(metrics.blueprint)
+  app.register_blueprint(metrics.prometheus_blueprint)
   app.register_blueprint(saved.blueprint)
   
-  return None 
\ No newline at end of file
+  return None 
+
+def warm_up(app):
+  """
+  Load the dependencies and clients that are otherwise created on first use.
+  
+  Called from the gunicorn worker startup when WARMUP_ON_START is set, so the
+  first requests of a worker do not pay for imports and new connections.
+  """
+  # Imported only to load them
+  import httpx
+  import lxml.html
+  import openai
+  from playwright.async_api import async_playwright
+  
+  from app.services.ai_service import SUMMARY_MODEL, get_ai_service
+  from app.services.enrichment_service import get_enrichment_service
+  from app.utils.token_budget import count_tokens
+  
+  count_tokens('warm up', SUMMARY_MODEL)
+  ai_service = get_ai_service()
+  get_enrichment_service()
+  
+  with app.app_context():
+    with db.engine.connect():
+      pass
+    
+    if app.config.get('PERSISTENT_EVENT_LOOP'):
+      from app.utils.async_db import async_db
+      from app.utils.event_loop import worker_loop
+      
+      async def open_clients():
+        ai_service.client
+        ai_service._get_http_client()
+        async with async_db.engine().connect():
+          pass
+      
+      worker_loop.run(open_clients())
+  
+  return None
@@ -1,13 +1,17 @@
+import os
+
 from flask import Blueprint, request
 
-from app.services.ai_service import AIService
+from app.services.ai_service import get_ai_service
 from app.services.company_service import CompanyService
+from app.utils.deadline import deadline_scope, parse_request_timeout
 from app.utils.helpers import create_response, error_response, parse_request_args, validate_pagination
 
+# Seconds a search may take, clients can ask for less with X-Request-Timeout
+SEARCH_REQUEST_TIMEOUT = float(os.getenv('SEARCH_REQUEST_TIMEOUT', '15'))
 
 # Initialize blueprint
 blueprint = Blueprint('companies', __name__, url_prefix='/api/companies')
-ai_service = AIService()
 
 @blueprint.route('/search', methods=['GET'])
 async def search_companies():
@@ -26,14 +30,16 @@ async def search_companies():
     # Get search query
     text_query = request.args.get('q', '')
     
-    # Use the unified search method
-    companies, total, pages, current_page, generated_sql = await CompanyService.unified_search(
-      page=page,
-      per_page=per_page,
-      filters=filters,
-      text_query=text_query,
-      ai_service=ai_service
-    )
+    # Use the unified search method, AI calls share the request deadline
+    timeout = parse_request_timeout(request.headers, SEARCH_REQUEST_TIMEOUT, SEARCH_REQUEST_TIMEOUT)
+    with deadline_scope(timeout):
+      companies, total, pages, current_page, generated_sql = await CompanyService.unified_search(
+        page=page,
+        per_page=per_page,
+        filters=filters,
+        text_query=text_query,
+        ai_service=get_ai_service()
+      )
     
     # Prepare response
     response_data = {
@@ -53,12 +59,12 @@ async def search_companies():
     return error_response(f"Error searching companies: {str(e)}")
 
 @blueprint.route('/<int:company_id>', methods=['GET'])
-def get_company(company_id):
+async def get_company(company_id):
   """Get company by ID."""
   try:
-    company = CompanyService.get_company(company_id)
+    company = await CompanyService.get_company_async(company_id)
     if not company:
-      return error_response("Company not found", status=404)
+      return error_response("Company not found", status_code=404)
       
     return create_response({'company': company.to_dict()})
   except Exception as e:
@@ -1,17 +1,18 @@
-from flask import Blueprint, request
+from flask import Blueprint, Response, request, stream_with_context
 
-from app.services.enrichment_service import EnrichmentService
-from app.utils.helpers import create_response, error_response
+from app.services.enrichment_service import get_enrichment_service
+from app.services.job_service import JobQueueService
+from app.utils.helpers import create_response, error_response, format_sse, validate_pagination
+from app.utils.streaming import iterate_async
 
 # Initialize blueprint
 blueprint = Blueprint('enrichment', __name__, url_prefix='/api/enrichment')
-enrichment_service = EnrichmentService()
 
 @blueprint.route('/company/<int:company_id>', methods=['POST'])
 async def enrich_company(company_id):
   """Enrich a company with AI-generated summary."""
   try:
-    success, company, error = await enrichment_service.enrich_company(company_id)
+    success, company, error = await get_enrichment_service().enrich_company(company_id)
     
     if not success:
       return error_response(error or "Failed to enrich company", 400)
@@ -20,6 +21,25 @@ async def enrich_company(company_id):
   except Exception as e:
     return error_response(f"Error enriching company: {str(e)}")
 
+@blueprint.route('/company/<int:company_id>/stream', methods=['GET', 'POST'])
+def enrich_company_stream(company_id):
+  """
+  Enrich a company, streaming progress and the summary as server-sent events.
+  
+  Emits "stage" events while fetching and summarizing, "token" events with
+  summary text as it is generated, then "result" with the stored company
+  or "error". GET is accepted so browsers can use EventSource.
+  """
+  def events():
+    for event, data in iterate_async(get_enrichment_service().enrich_company_stream(company_id)):
+      yield format_sse(event, data)
+  
+  return Response(
+    stream_with_context(events()),
+    mimetype='text/event-stream',
+    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+  )
+
 @blueprint.route('/batch', methods=['POST'])
 async def batch_enrich():
   """Enrich multiple companies with AI-generated summaries."""
@@ -30,7 +50,8 @@ async def batch_enrich():
     if not company_ids:
       return error_response("No company IDs provided", 400)
       
-    success, enriched_companies, error = await enrichment_service.batch_enrich_companies(company_ids)
+    stats = {}
+    success, enriched_companies, error = await get_enrichment_service().batch_enrich_companies(company_ids, stats=stats)
     
     if not success and not enriched_companies:
       return error_response(error or "Failed to enrich companies", 400)
@@ -38,7 +59,61 @@ async def batch_enrich():
     return create_response({
       'enriched_companies': enriched_companies,
       'count': len(enriched_companies),
+      'fetches_saved': stats.get('fetches_saved', 0),
+      'usage': {
+        'tokens_in': stats.get('tokens_in', 0),
+        'tokens_out': stats.get('tokens_out', 0),
+        'cost_usd': round(stats.get('cost_usd', 0), 6)
+      },
       'errors': error
     })
   except Exception as e:
-    return error_response(f"Error in batch enrichment: {str(e)}") 
\ No newline at end of file
+    return error_response(f"Error in batch enrichment: {str(e)}") 
+
+@blueprint.route('/jobs', methods=['POST'])
+def submit_enrichment_job():
+  """Queue a background enrichment job and return its ID immediately."""
+  try:
+    data = request.get_json()
+    if not data:
+      return error_response("No data provided", 400)
+    
+    company_ids = data.get('company_ids', [])
+    if not company_ids:
+      return error_response("No company IDs provided", 400)
+    
+    try:
+      max_attempts = max(1, int(data.get('max_attempts', 3)))
+    except (TypeError, ValueError):
+      return error_response("Invalid max_attempts: must be a number", 400)
+    
+    try:
+      company_ids = [int(company_id) for company_id in company_ids]
+    except (TypeError, ValueError):
+      return error_response("Invalid company_ids: must be numbers", 400)
+    
+    success, job, error = JobQueueService.submit_enrichment_job(company_ids, max_attempts=max_attempts)
+    
+    if not success:
+      return error_response(error or "Failed to queue enrichment job", 400)
+      
+    return create_response({'job': job}, status_code=202)
+  except Exception as e:
+    return error_response(f"Error queuing enrichment job: {str(e)}")
+
+@blueprint.route('/jobs/<int:job_id>', methods=['GET'])
+def get_enrichment_job(job_id):
+  """Get progress and per-company results of an enrichment job."""
+  try:
+    page, per_page = validate_pagination(
+      request.args.get('page'),
+      request.args.get('per_page')
+    )
+    
+    job = JobQueueService.get_job_status(job_id, page=page, per_page=per_page)
+    if not job:
+      return error_response("Enrichment job not found", status_code=404)
+      
+    return create_response({'job': job})
+  except Exception as e:
+    return error_response(f"Error retrieving enrichment job: {str(e)}")
@@ -0,0 +1,67 @@
+from flask import Blueprint, Response
+
+from app.services.db_pools import get_pool_stats
+from app.services.hedging import get_call_stats
+from app.services.query_log import get_sql_query_logger
+from app.services.rate_limiter import get_rate_limiter_stats
+from app.services.token_usage import get_usage_stats
+from app.services.write_buffer import get_company_write_buffer
+from app.utils.helpers import create_response, error_response
+from app.utils.timing import render_prometheus
+
+# Initialize blueprint
+blueprint = Blueprint('metrics', __name__, url_prefix='/api/metrics')
+prometheus_blueprint = Blueprint('prometheus', __name__)
+
+@blueprint.route('/rate-limits', methods=['GET'])
+def get_rate_limits():
+  """Get the state of the shared OpenAI rate limiters."""
+  try:
+    return create_response({'rate_limits': get_rate_limiter_stats()})
+  except Exception as e:
+    return error_response(f"Error retrieving rate limits: {str(e)}")
+
+@blueprint.route('/enrichment-writes', methods=['GET'])
+def get_enrichment_writes():
+  """Get flush latency and batch size of the enrichment write buffer."""
+  try:
+    return create_response({'enrichment_writes': get_company_write_buffer().stats()})
+  except Exception as e:
+    return error_response(f"Error retrieving enrichment write stats: {str(e)}")
+
+@blueprint.route('/token-usage', methods=['GET'])
+def get_token_usage():
+  """Get OpenAI tokens, latency and estimated cost per model since startup."""
+  try:
+    return create_response({'token_usage': get_usage_stats()})
+  except Exception as e:
+    return error_response(f"Error retrieving token usage: {str(e)}")
+
+@blueprint.route('/llm-calls', methods=['GET'])
+def get_llm_calls():
+  """Get latency percentiles and hedge rates per type of LLM call."""
+  try:
+    return create_response({'llm_calls': get_call_stats()})
+  except Exception as e:
+    return error_response(f"Error retrieving LLM call stats: {str(e)}")
+
+@blueprint.route('/db-pools', methods=['GET'])
+def get_db_pools():
+  """Get connection pool usage and saturation of the primary and replica databases."""
+  try:
+    return create_response({'db_pools': get_pool_stats()})
+  except Exception as e:
+    return error_response(f"Error retrieving database pool stats: {str(e)}")
+
+@blueprint.route('/sql-query-log', methods=['GET'])
+def get_sql_query_log():
+  """Get entries logged, dropped and queued, and plans captured by the SQL query log."""
+  try:
+    return create_response({'sql_query_log': get_sql_query_logger().stats()})
+  except Exception as e:
+    return error_response(f"Error retrieving SQL query log stats: {str(e)}")
+
+@prometheus_blueprint.route('/metrics', methods=['GET'])
+def get_prometheus_metrics():
+  """Get request and stage duration histograms in the Prometheus text format."""
+  return Response(render_prometheus(), mimetype='text/plain; version=0.0.4')
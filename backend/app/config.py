@@ -1,20 +1,113 @@
 import os
+from typing import Tuple
+
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+# Connections all gunicorn workers together may open to each database, kept under Postgres max_connections
+# (100 by default) with room for the enrichment worker, CLI commands and admin sessions
+DATABASE_CONNECTION_BUDGET = int(os.getenv('DATABASE_CONNECTION_BUDGET', '80'))
+
+def engine_options(prefix: str, pool_size: int, max_overflow: int, statement_timeout_ms: int) -> dict:
+  """
+  Build SQLAlchemy engine options, overridable with <prefix>_* environment variables.
+
+  Args:
+      prefix: Environment variable prefix, e.g. DATABASE or DATABASE_REPLICA
+      pool_size: Default number of pooled connections
+      max_overflow: Default number of connections opened beyond the pool
+      statement_timeout_ms: Default Postgres statement_timeout of each connection, 0 to disable
+
+  Returns:
+      Options for SQLALCHEMY_ENGINE_OPTIONS or a SQLALCHEMY_BINDS entry
+  """
+  options = {
+    'pool_size': int(os.getenv(f'{prefix}_POOL_SIZE', str(pool_size))),
+    'max_overflow': int(os.getenv(f'{prefix}_MAX_OVERFLOW', str(max_overflow))),
+    # Seconds a request waits for a free connection before failing
+    'pool_timeout': float(os.getenv(f'{prefix}_POOL_TIMEOUT', '10')),
+    # Replace connections before server-side or load balancer idle timeouts close them
+    'pool_recycle': int(os.getenv(f'{prefix}_POOL_RECYCLE', '1800')),
+    'pool_pre_ping': os.getenv(f'{prefix}_POOL_PRE_PING', 'true').lower() == 'true',
+  }
+  statement_timeout = int(os.getenv(f'{prefix}_STATEMENT_TIMEOUT_MS', str(statement_timeout_ms)))
+  if statement_timeout:
+    options['connect_args'] = {'options': f'-c statement_timeout={statement_timeout}'}
+  return options
+
+def worker_pool_limits(reserved: int = 0) -> Tuple[int, int]:
+  """
+  Split DATABASE_CONNECTION_BUDGET of a database between gunicorn workers and the engines of each worker.
+
+  Each worker pools a sync engine and, with PERSISTENT_EVENT_LOOP (on in
+  production), an async one. WEB_CONCURRENCY and GUNICORN_THREADS are set by
+  gunicorn.conf.py; an engine never gets more connections than a worker has threads.
+
+  Args:
+      reserved: Connections per worker opened outside the engines, e.g. for advisory locks
+
+  Returns:
+      Tuple of (pool_size, max_overflow) for each engine
+  """
+  workers = int(os.getenv('WEB_CONCURRENCY', '1'))
+  threads = int(os.getenv('GUNICORN_THREADS', '16'))
+  engines = 2 if os.getenv('PERSISTENT_EVENT_LOOP', 'true').lower() == 'true' else 1
+  per_engine = min((DATABASE_CONNECTION_BUDGET // workers - reserved) // engines, threads)
+  if per_engine < 2:
+    print(f"DATABASE_CONNECTION_BUDGET {DATABASE_CONNECTION_BUDGET} is too small for {workers} workers, using 2 connections per engine")
+    per_engine = 2
+  pool_size = (per_engine + 1) // 2
+  return pool_size, per_engine - pool_size
+
+def replica_binds(pool_size: int, max_overflow: int, statement_timeout_ms: int) -> dict:
+  """
+  Build SQLALCHEMY_BINDS with the read replica when DATABASE_REPLICA_URL is set.
+
+  Returns:
+      {'replica': {...}} or an empty dictionary
+  """
+  url = os.getenv('DATABASE_REPLICA_URL')
+  if not url:
+    return {}
+  return {'replica': {'url': url, **engine_options('DATABASE_REPLICA', pool_size, max_overflow, statement_timeout_ms)}}
+
+def budgeted_engine_config() -> dict:
+  """
+  Build the engine options of the primary and the replica sized from DATABASE_CONNECTION_BUDGET.
+
+  Called by create_app rather than at import, so the worker count gunicorn.conf.py
+  exports is read and the budget warning is only printed by processes that build the app.
+
+  Returns:
+      Dictionary with SQLALCHEMY_ENGINE_OPTIONS and SQLALCHEMY_BINDS
+  """
+  # The primary also holds the advisory lock connections
+  reserved = int(os.getenv('ADVISORY_LOCK_POOL_SIZE', '4'))
+  return {
+    'SQLALCHEMY_ENGINE_OPTIONS': engine_options('DATABASE', *worker_pool_limits(reserved=reserved), statement_timeout_ms=30000),
+    'SQLALCHEMY_BINDS': replica_binds(*worker_pool_limits(), statement_timeout_ms=15000),
+  }
+
 class Config:
   """Base configuration."""
   SECRET_KEY = os.getenv('SECRET_KEY', 'dev-key-please-change')
   APP_DIR = os.path.abspath(os.path.dirname(__file__))
   PROJECT_ROOT = os.path.abspath(os.path.join(APP_DIR, os.pardir))
   SQLALCHEMY_TRACK_MODIFICATIONS = False
+  SQLALCHEMY_ENGINE_OPTIONS = engine_options('DATABASE', pool_size=5, max_overflow=10, statement_timeout_ms=30000)
+  # Read-only search queries go to the replica when DATABASE_REPLICA_URL is set
+  SQLALCHEMY_BINDS = replica_binds(pool_size=5, max_overflow=10, statement_timeout_ms=15000)
   CORS_ORIGIN_WHITELIST = [
     'http://localhost:3000',
     'http://localhost:8080',
   ]
   OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
+  # Run async views on one event loop per worker process instead of one per request
+  PERSISTENT_EVENT_LOOP = os.getenv('PERSISTENT_EVENT_LOOP', 'false').lower() == 'true'
+  # Import heavy dependencies and open clients when a gunicorn worker starts instead of on first use
+  WARMUP_ON_START = os.getenv('WARMUP_ON_START', 'false').lower() == 'true'
 
 class DevelopmentConfig(Config):
   """Development configuration."""
@@ -33,7 +126,11 @@ class ProductionConfig(Config):
   """Production configuration."""
   ENV = 'production'
   DEBUG = False
+  PERSISTENT_EVENT_LOOP = os.getenv('PERSISTENT_EVENT_LOOP', 'true').lower() == 'true'
+  WARMUP_ON_START = os.getenv('WARMUP_ON_START', 'true').lower() == 'true'
   SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL')
+  # create_app replaces the engine options with budgeted_engine_config() when the app is built
+  SIZE_POOLS_FROM_BUDGET = True
 
 # Dictionary with different configuration environments
 config = {
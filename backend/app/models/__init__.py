@@ -1 +1,3 @@
-from app.models.company import Company, SavedCompany 
\ No newline at end of file
+from app.models.company import Company, SavedCompany
+from app.models.job import EnrichmentJob, EnrichmentJobItem
+from app.models.query_log import SqlQueryLog
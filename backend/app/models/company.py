@@ -38,6 +38,10 @@ class BaseModel(db.Model):
 class Company(BaseModel, TimestampMixin):
   """Company model for storing company information."""
   __tablename__ = 'companies'
+  __table_args__ = (
+    # Serves stale-company scans ordered by (enriched_at, id)
+    db.Index('ix_companies_enrichment_staleness', 'enriched_at', 'id'),
+  )
 
   id = db.Column(db.Integer, primary_key=True)
   website = db.Column(db.String(255))
@@ -51,6 +55,13 @@ class Company(BaseModel, TimestampMixin):
   linkedin_url = db.Column(db.String(255))
   ai_summary = db.Column(db.Text)
 
+  # Enrichment metadata, used to skip re-summarizing unchanged websites
+  enriched_at = db.Column(db.DateTime)
+  enrichment_source_url = db.Column(db.String(255))
+  enrichment_content_hash = db.Column(db.String(64))
+  enrichment_model = db.Column(db.String(50))
+  enrichment_prompt_version = db.Column(db.String(20))
+
   def to_dict(self):
     """Convert company to dictionary."""
     return {
@@ -65,6 +76,7 @@ class Company(BaseModel, TimestampMixin):
       'industry': self.industry,
       'linkedin_url': self.linkedin_url,
       'ai_summary': self.ai_summary,
+      'enriched_at': self.enriched_at.isoformat() if self.enriched_at else None,
       'created_at': self.created_at.isoformat() if self.created_at else None,
       'updated_at': self.updated_at.isoformat() if self.updated_at else None
     }
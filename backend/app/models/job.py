@@ -0,0 +1,72 @@
+from app import db
+from app.models.company import BaseModel, TimestampMixin
+
+class EnrichmentJob(BaseModel, TimestampMixin):
+  """Model for a background enrichment job covering several companies."""
+  __tablename__ = 'enrichment_jobs'
+
+  id = db.Column(db.Integer, primary_key=True)
+  total = db.Column(db.Integer, nullable=False, default=0)
+  max_attempts = db.Column(db.Integer, nullable=False, default=3)
+
+  # Relationships
+  items = db.relationship('EnrichmentJobItem', backref='job', lazy='dynamic')
+
+  def to_dict(self):
+    """Convert job to dictionary."""
+    return {
+      'id': self.id,
+      'total': self.total,
+      'max_attempts': self.max_attempts,
+      'created_at': self.created_at.isoformat() if self.created_at else None,
+      'updated_at': self.updated_at.isoformat() if self.updated_at else None
+    }
+
+  def __repr__(self):
+    """String representation of enrichment job."""
+    return f"<EnrichmentJob(id={self.id}, total={self.total})>"
+
+class EnrichmentJobItem(BaseModel, TimestampMixin):
+  """Model for one company within an enrichment job, claimed by workers."""
+  __tablename__ = 'enrichment_job_items'
+  __table_args__ = (
+    db.Index('ix_enrichment_job_items_claim', 'status', 'available_at'),
+    db.Index('ix_enrichment_job_items_job_status', 'job_id', 'status'),
+  )
+
+  STATUS_PENDING = 'pending'
+  STATUS_RUNNING = 'running'
+  STATUS_SUCCEEDED = 'succeeded'
+  STATUS_FAILED = 'failed'
+
+  id = db.Column(db.Integer, primary_key=True)
+  job_id = db.Column(db.Integer, db.ForeignKey('enrichment_jobs.id'), nullable=False)
+  company_id = db.Column(db.Integer, db.ForeignKey('companies.id'), nullable=False)
+  status = db.Column(db.String(20), nullable=False, default=STATUS_PENDING)
+  attempts = db.Column(db.Integer, nullable=False, default=0)
+  max_attempts = db.Column(db.Integer, nullable=False, default=3)
+  available_at = db.Column(db.DateTime, nullable=False)
+  locked_until = db.Column(db.DateTime)
+  locked_by = db.Column(db.String(100))
+  error = db.Column(db.Text)
+  result = db.Column(db.JSON)
+  finished_at = db.Column(db.DateTime)
+
+  def to_dict(self):
+    """Convert job item to dictionary."""
+    return {
+      'id': self.id,
+      'job_id': self.job_id,
+      'company_id': self.company_id,
+      'status': self.status,
+      'attempts': self.attempts,
+      'max_attempts': self.max_attempts,
+      'error': self.error,
+      'result': self.result,
+      'available_at': self.available_at.isoformat() if self.available_at else None,
+      'finished_at': self.finished_at.isoformat() if self.finished_at else None
+    }
+
+  def __repr__(self):
+    """String representation of enrichment job item."""
+    return f"<EnrichmentJobItem(job_id={self.job_id}, company_id={self.company_id}, status={self.status})>"
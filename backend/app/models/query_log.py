@@ -0,0 +1,46 @@
+from datetime import datetime
+
+from app import db
+from app.models.company import BaseModel
+
+class SqlQueryLog(BaseModel):
+  """Model for one execution of AI-generated search SQL."""
+  __tablename__ = 'sql_query_log'
+  __table_args__ = (
+    db.Index('ix_sql_query_log_fingerprint_created', 'fingerprint', 'created_at'),
+    db.Index('ix_sql_query_log_created', 'created_at'),
+  )
+
+  id = db.Column(db.BigInteger, primary_key=True)
+  created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+  # Hash of the SQL with literals replaced, shared by queries that differ only in values
+  fingerprint = db.Column(db.String(16), nullable=False)
+  sql_text = db.Column(db.Text, nullable=False)
+  natural_query = db.Column(db.Text)
+  count_ms = db.Column(db.Float)
+  page_ms = db.Column(db.Float)
+  rows_returned = db.Column(db.Integer)
+  total_rows = db.Column(db.Integer)
+  error = db.Column(db.Text)
+  # EXPLAIN of the slower statement, captured for a sample of slow executions (see SQL_PLAN_ANALYZE)
+  plan = db.Column(db.Text)
+
+  def to_dict(self):
+    """Convert query log entry to dictionary."""
+    return {
+      'id': self.id,
+      'created_at': self.created_at.isoformat() if self.created_at else None,
+      'fingerprint': self.fingerprint,
+      'sql_text': self.sql_text,
+      'natural_query': self.natural_query,
+      'count_ms': self.count_ms,
+      'page_ms': self.page_ms,
+      'rows_returned': self.rows_returned,
+      'total_rows': self.total_rows,
+      'error': self.error,
+      'plan': self.plan
+    }
+
+  def __repr__(self):
+    """String representation of query log entry."""
+    return f"<SqlQueryLog(fingerprint={self.fingerprint}, count_ms={self.count_ms}, page_ms={self.page_ms})>"
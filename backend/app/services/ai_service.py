@@ -1,34 +1,170 @@
+import asyncio
+import functools
 import json
 import os
 import re
-from typing import Dict, Optional, Tuple, List
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Dict, Optional, Tuple, List
 
-from bs4 import BeautifulSoup
-import httpx
-from playwright.async_api import async_playwright
 from sqlalchemy import inspect
+from urllib.parse import urlparse
 
 from app.models.company import Company
+from app.services.hedging import get_call_tracker
+from app.services.rate_limiter import PRIORITY_BATCH, PRIORITY_INTERACTIVE, get_rate_limiter
+from app.services.scrape_cache import get_scrape_cache
+from app.services.token_usage import record_usage
+from app.utils.deadline import DeadlineExceeded, bounded_timeout, remaining as deadline_remaining
+from app.utils.event_loop import on_loop_exit
+from app.utils.html_extractor import extract_text, extract_text_async
+from app.utils.single_flight import single_flight
+from app.utils.timing import timed
+from app.utils.token_budget import compress_prompt, count_tokens, fit_text, format_fields, join_nonempty
 from app.utils.url_utils import UrlUtils
 
-import openai
+# openai, httpx and Playwright are imported on first use, keeping app startup fast
+if TYPE_CHECKING:
+  import httpx
+  import openai
+
+# Static (plain HTTP) fetch settings
+SCRAPE_STATIC_TIMEOUT = float(os.getenv('SCRAPE_STATIC_TIMEOUT', '10'))
+SCRAPE_CONNECT_TIMEOUT = float(os.getenv('SCRAPE_CONNECT_TIMEOUT', '5'))
+SCRAPE_MAX_BYTES = int(os.getenv('SCRAPE_MAX_BYTES', str(2 * 1024 * 1024)))
+SCRAPE_MAX_CONNECTIONS = int(os.getenv('SCRAPE_MAX_CONNECTIONS', '50'))
+SCRAPE_STATIC_MIN_TEXT = int(os.getenv('SCRAPE_STATIC_MIN_TEXT', '200'))
+SCRAPE_TIER_MEMORY_SIZE = int(os.getenv('SCRAPE_TIER_MEMORY_SIZE', '10000'))
+SCRAPE_USER_AGENT = os.getenv(
+  'SCRAPE_USER_AGENT',
+  'Mozilla/5.0 (compatible; ProspectorBot/1.0; +https://prospector.ai)'
+)
+
+# Browser render profiles: "full" waits for the network to go idle, "fast"
+# blocks non-document resources and stops once enough text is on the page
+RENDER_PROFILE_FULL = 'full'
+RENDER_PROFILE_FAST = 'fast'
+RENDER_PROFILES = {
+  RENDER_PROFILE_FULL: {
+    'wait_until': 'networkidle',
+    'timeout': 15000,
+    'block_resources': False,
+    'settle_ms': 0
+  },
+  RENDER_PROFILE_FAST: {
+    'wait_until': 'domcontentloaded',
+    'timeout': 10000,
+    'block_resources': True,
+    'settle_ms': int(os.getenv('SCRAPE_RENDER_SETTLE_MS', '1500'))
+  }
+}
+DEFAULT_RENDER_PROFILE = os.getenv('SCRAPE_RENDER_PROFILE', RENDER_PROFILE_FAST)
+RENDER_POLL_INTERVAL = 0.25
+
+# Resource types and hosts skipped by the fast render profile
+BLOCKED_RESOURCE_TYPES = {'image', 'media', 'font', 'stylesheet', 'texttrack', 'manifest', 'other'}
+BLOCKED_HOSTS = (
+  'google-analytics.com', 'googletagmanager.com', 'doubleclick.net', 'googlesyndication.com',
+  'adservice.google.com', 'facebook.net', 'connect.facebook.com', 'hotjar.com', 'segment.com',
+  'segment.io', 'mixpanel.com', 'hs-analytics.net', 'hs-scripts.com', 'hubspot.com',
+  'intercom.io', 'intercomcdn.com', 'clarity.ms', 'licdn.com', 'ads-twitter.com',
+  'fullstory.com', 'nr-data.net', 'newrelic.com', 'optimizely.com', 'quantserve.com',
+  'scorecardresearch.com', 'crazyegg.com', 'mouseflow.com', 'amplitude.com', 'heap.io'
+)
+
+# Website characters that are enough for a summary, used to stop rendering early
+SUMMARY_CONTENT_CHARS = 3000
+
+# Input tokens of a single-company summary prompt; company details and
+# instructions are always sent and website text fills the rest
+SUMMARY_INPUT_TOKEN_BUDGET = int(os.getenv('SUMMARY_INPUT_TOKEN_BUDGET', '1000'))
+
+# Batched summarization: companies per completion are bounded by an input
+# token budget, and each company gets the single-call output allowance
+SUMMARY_BATCH_TOKEN_BUDGET = int(os.getenv('SUMMARY_BATCH_TOKEN_BUDGET', '6000'))
+SUMMARY_BATCH_MAX_COMPANIES = int(os.getenv('SUMMARY_BATCH_MAX_COMPANIES', '8'))
+SUMMARY_BATCH_OUTPUT_TOKENS = 150
+
+# Model and prompt version recorded with each summary; bump the version
+# whenever the summary prompts change so incremental runs regenerate them
+SUMMARY_MODEL = 'gpt-3.5-turbo'
+SUMMARY_PROMPT_VERSION = '2'
+SQL_MODEL = 'gpt-4'
+SEARCH_MODEL = 'gpt-3.5-turbo'
+
+# Company columns described to the SQL model; enrichment bookkeeping is left out
+SQL_SCHEMA_EXCLUDED_COLUMNS = {
+  'enrichment_source_url', 'enrichment_content_hash', 'enrichment_model', 'enrichment_prompt_version'
+}
+
+# Retry policy for OpenAI calls
+OPENAI_MAX_RETRIES = int(os.getenv('OPENAI_MAX_RETRIES', '3'))
+OPENAI_RETRY_BACKOFF = 1.0
+OPENAI_RETRY_BACKOFF_MAX = 30.0
+
+# Seconds an OpenAI request may take, further limited by the caller's deadline
+OPENAI_REQUEST_TIMEOUT = float(os.getenv('OPENAI_REQUEST_TIMEOUT', '60'))
+
+# Hedge slow interactive calls with a second request, optionally to a faster model
+OPENAI_HEDGING_ENABLED = os.getenv('OPENAI_HEDGING_ENABLED', 'true').lower() == 'true'
+SQL_HEDGE_MODEL = os.getenv('SQL_HEDGE_MODEL') or None
+SEARCH_HEDGE_MODEL = os.getenv('SEARCH_HEDGE_MODEL') or None
+
+# Result used when a page does not look like an active company website
+UNAVAILABLE_MESSAGE = "Company information unavailable, might not be active"
+
+# Fetch tiers used by scrape_website
+TIER_STATIC = 'static'
+TIER_BROWSER = 'browser'
+
+# HTTP statuses that usually mean bot protection rather than a dead site
+BROWSER_RETRY_STATUSES = {401, 403, 429, 503}
+
+# Markers of pages that only render their content with JavaScript
+JS_GATE_PATTERNS = [
+  r'enable\s+javascript', r'javascript\s+is\s+(?:disabled|required)',
+  r'requires\s+javascript', r'<div\s+id=["\'](?:root|app|__next)["\']\s*>\s*</div>'
+]
 
 class AIService:
   """Service for AI-related operations."""
   
-  def __init__(self, api_key=None):
-    """Initialize AI service with API key."""
+  # Which tier last served each normalized URL, shared by all instances
+  _scrape_tiers: "OrderedDict[str, str]" = OrderedDict()
+  
+  def __init__(self, api_key=None, scrape_cache=None):
+    """Initialize AI service with API key and an optional scrape cache."""
     self.api_key = api_key or os.environ.get('OPENAI_API_KEY')
-    # Create an explicit httpx client without proxies to avoid the error
-    http_client = httpx.AsyncClient()
-    self.client = openai.AsyncOpenAI(api_key=self.api_key, http_client=http_client)
+    # OpenAI and page fetch clients, created lazily per thread and event loop
+    self._loop_clients = threading.local()
+    self._scrape_cache = scrape_cache
+  
+  @property
+  def scrape_cache(self):
+    """Scrape cache, the shared on-disk cache unless one was passed in."""
+    if self._scrape_cache is None:
+      self._scrape_cache = get_scrape_cache()
+    return self._scrape_cache
     
-  async def scrape_website(self, url: str) -> Tuple[str, Optional[str]]:
+  @timed('scrape')
+  async def scrape_website(
+    self,
+    url: str,
+    render_profile: str = None,
+    force_refresh: bool = False
+  ) -> Tuple[str, Optional[str]]:
     """
-    Scrape website content from URL using Playwright.
+    Scrape website content from URL.
+    
+    Pages are first fetched over plain HTTP. Playwright is only used when the
+    static HTML looks empty or JS-gated, or when the URL is known to need it.
+    Results are cached on disk and stale entries are revalidated with
+    ETag/Last-Modified before being fetched again.
     
     Args:
         url: Website URL to scrape
+        render_profile: Browser render profile ("fast" or "full"), defaults to SCRAPE_RENDER_PROFILE
+        force_refresh: Ignore the scrape cache and fetch the page again
         
     Returns:
         Tuple of (content, error_message)
@@ -42,36 +178,373 @@ class AIService:
     
     # Normalize URL using UrlUtils
     url = UrlUtils.normalize_url(url)
-
+    
+    # Concurrent callers for the same URL, profile and refresh mode share one scrape;
+    # across processes the scrape cache dedupes
+    profile = render_profile or DEFAULT_RENDER_PROFILE
+    return await single_flight.do(
+      f"scrape:{profile}:{'refresh' if force_refresh else 'cached'}:{url}",
+      lambda: self._scrape_normalized(url, render_profile, force_refresh)
+    )
+  
+  async def _scrape_normalized(
+    self,
+    url: str,
+    render_profile: str = None,
+    force_refresh: bool = False
+  ) -> Tuple[str, Optional[str]]:
+    """
+    Scrape a normalized URL through the cache and the fetch tiers.
+    
+    Args:
+        url: Normalized website URL
+        render_profile: Browser render profile
+        force_refresh: Ignore the scrape cache
+        
+    Returns:
+        Tuple of (content, error_message)
+    """
+    # The cache is sqlite on disk, so its reads and writes run off the event loop
+    loop = asyncio.get_running_loop()
+    cached = None
+    if self.scrape_cache and not force_refresh:
+      cached = await loop.run_in_executor(None, self.scrape_cache.get, url)
+      if cached and cached['state'] == 'fresh':
+        return cached['content'], cached['error']
+    
+    # Ask the server whether a stale entry is still current
+    request_headers = {}
+    if cached and cached['state'] == 'revalidate':
+      if cached['etag']:
+        request_headers['If-None-Match'] = cached['etag']
+      if cached['last_modified']:
+        request_headers['If-Modified-Since'] = cached['last_modified']
+    
+    page_text, error, validators = await self._fetch_tiered(url, render_profile, request_headers)
+    
+    if validators.get('not_modified'):
+      await loop.run_in_executor(
+        None, self.scrape_cache.mark_validated, url, validators.get('etag'), validators.get('last_modified')
+      )
+      return cached['content'], cached['error']
+    
+    # Cache content and inactive-site results, but not transient errors
+    if self.scrape_cache and (not error or error == UNAVAILABLE_MESSAGE):
+      await loop.run_in_executor(None, functools.partial(
+        self.scrape_cache.put,
+        url,
+        page_text,
+        error=error,
+        etag=validators.get('etag'),
+        last_modified=validators.get('last_modified'),
+        tier=validators.get('tier')
+      ))
+    
+    return page_text, error
+  
+  async def _fetch_tiered(
+    self,
+    url: str,
+    render_profile: str = None,
+    request_headers: Dict = None
+  ) -> Tuple[str, Optional[str], Dict]:
+    """
+    Fetch and extract a page, escalating from plain HTTP to the browser.
+    
+    Args:
+        url: Normalized website URL
+        render_profile: Browser render profile
+        request_headers: Conditional request headers for revalidation
+        
+    Returns:
+        Tuple of (content, error_message, validators). Validators hold the
+        etag, last_modified and tier of the response, and not_modified when
+        the server answered 304.
+    """
+    # Skip the static tier for URLs that previously needed a browser
+    if self._scrape_tiers.get(url) != TIER_BROWSER:
+      html_content, status, error, validators = await self._fetch_static(url, request_headers)
+      
+      if status == 304:
+        return "", None, {**validators, 'not_modified': True}
+      
+      # Network-level failures would fail in the browser as well
+      if error and status is None:
+        return "", f"Error accessing website: {error}", {}
+      
+      if html_content:
+        page_text = await extract_text_async(html_content)
+        if not self._looks_js_gated(html_content, page_text):
+          self._record_scrape_tier(url, TIER_STATIC)
+          validators['tier'] = TIER_STATIC
+          if not self._validate_company_content(page_text):
+            return "", UNAVAILABLE_MESSAGE, validators
+          return page_text, None, validators
+      elif error and status not in BROWSER_RETRY_STATUSES:
+        return "", f"Error accessing website: {error}", {}
+    elif request_headers:
+      # Rendered pages are revalidated with a body-less conditional request
+      status, validators = await self._revalidate(url, request_headers)
+      if status == 304:
+        return "", None, {**validators, 'not_modified': True}
+    
+    page_text, error, validators = await self._fetch_rendered(url, render_profile)
+    if not error:
+      self._record_scrape_tier(url, TIER_BROWSER)
+    validators['tier'] = TIER_BROWSER
+    return page_text, error, validators
+  
+  def _loop_client(self, name: str, factory: Callable[[], Any]) -> Any:
+    """
+    Get a client bound to the running event loop, creating it if needed.
+    
+    Pooled connections belong to the loop that opened them. Flask runs each
+    async view on its own loop unless PERSISTENT_EVENT_LOOP is set, so clients
+    are kept per thread and replaced when the thread's loop changes. Clients
+    of the persistent worker loop live until the worker stops; others are
+    closed before their loop is (see on_loop_exit).
+    
+    Args:
+        name: Client name
+        factory: Creates the client
+        
+    Returns:
+        Client for the running loop
+    """
+    state = self._loop_clients
+    loop = asyncio.get_running_loop()
+    if getattr(state, 'loop', None) is not loop:
+      state.loop = loop
+      state.clients = {}
+    if name not in state.clients:
+      client = factory()
+      state.clients[name] = client
+      # Closed when the worker stops, or when the view or stream that owns a short-lived loop ends
+      on_loop_exit(client.close if name == 'openai' else client.aclose)
+    return state.clients[name]
+  
+  @property
+  def client(self) -> 'openai.AsyncOpenAI':
+    """OpenAI client for the running event loop."""
+    import httpx
+    import openai
+    
+    # Create an explicit httpx client without proxies to avoid the error;
+    # retries are handled by _chat_completion so 429s reach the rate limiter
+    return self._loop_client('openai', lambda: openai.AsyncOpenAI(
+      api_key=self.api_key,
+      http_client=httpx.AsyncClient(),
+      max_retries=0
+    ))
+  
+  def _get_http_client(self) -> 'httpx.AsyncClient':
+    """
+    Get the pooled HTTP client for the running event loop.
+    
+    Returns:
+        httpx.AsyncClient with keep-alive and HTTP/2 enabled
+    """
+    import httpx
+    
+    return self._loop_client('http', lambda: httpx.AsyncClient(
+      http2=True,
+      follow_redirects=True,
+      headers={'User-Agent': SCRAPE_USER_AGENT, 'Accept': 'text/html,application/xhtml+xml'},
+      timeout=httpx.Timeout(SCRAPE_STATIC_TIMEOUT, connect=SCRAPE_CONNECT_TIMEOUT),
+      limits=httpx.Limits(
+        max_connections=SCRAPE_MAX_CONNECTIONS,
+        max_keepalive_connections=SCRAPE_MAX_CONNECTIONS,
+        keepalive_expiry=30
+      )
+    ))
+  
+  async def _fetch_static(
+    self,
+    url: str,
+    request_headers: Dict = None
+  ) -> Tuple[str, Optional[int], Optional[str], Dict]:
+    """
+    Fetch raw HTML over plain HTTP, reading at most SCRAPE_MAX_BYTES.
+    
+    Args:
+        url: Normalized website URL
+        request_headers: Extra request headers, e.g. conditional validators
+        
+    Returns:
+        Tuple of (html, HTTP status or None on network errors, error_message, validators)
+    """
+    import httpx
+    
+    try:
+      client = self._get_http_client()
+      async with client.stream('GET', url, headers=request_headers) as response:
+        validators = self._response_validators(response.headers)
+        
+        if response.status_code == 304:
+          return "", 304, None, validators
+        
+        if response.status_code >= 400:
+          return "", response.status_code, f"HTTP {response.status_code}", validators
+        
+        content_type = response.headers.get('content-type', '')
+        if content_type and 'html' not in content_type:
+          return "", response.status_code, f"Unsupported content type: {content_type}", validators
+        
+        body = bytearray()
+        async for chunk in response.aiter_bytes():
+          body.extend(chunk)
+          if len(body) >= SCRAPE_MAX_BYTES:
+            break
+        
+        encoding = response.encoding or 'utf-8'
+        html = bytes(body[:SCRAPE_MAX_BYTES]).decode(encoding, errors='replace')
+        return html, response.status_code, None, validators
+    except httpx.HTTPError as e:
+      return "", None, str(e) or e.__class__.__name__, {}
+  
+  async def _revalidate(self, url: str, request_headers: Dict) -> Tuple[Optional[int], Dict]:
+    """
+    Send a conditional request without downloading the body.
+    
+    Args:
+        url: Normalized website URL
+        request_headers: If-None-Match/If-Modified-Since headers
+        
+    Returns:
+        Tuple of (HTTP status or None on network errors, validators)
+    """
+    import httpx
+    
+    try:
+      async with self._get_http_client().stream('GET', url, headers=request_headers) as response:
+        return response.status_code, self._response_validators(response.headers)
+    except httpx.HTTPError:
+      return None, {}
+  
+  @staticmethod
+  def _response_validators(headers) -> Dict:
+    """Extract cache validators from response headers."""
+    return {
+      'etag': headers.get('etag'),
+      'last_modified': headers.get('last-modified')
+    }
+  
+  def _looks_js_gated(self, html: str, page_text: str) -> bool:
+    """
+    Check if static HTML looks empty or needs JavaScript to show its content.
+    
+    Args:
+        html: Raw HTML
+        page_text: Text extracted from the HTML
+        
+    Returns:
+        True if the page should be rendered in a browser, False otherwise
+    """
+    # Next to no text usually means an empty shell filled in by scripts
+    if len(page_text.strip()) < SCRAPE_STATIC_MIN_TEXT:
+      return True
+    
+    # Substantial text means the server already rendered the page
+    if len(page_text) >= 1000:
+      return False
+    
+    for pattern in JS_GATE_PATTERNS:
+      if re.search(pattern, html, re.IGNORECASE):
+        return True
+    
+    return False
+  
+  def _record_scrape_tier(self, url: str, tier: str) -> None:
+    """Remember which tier served a URL, evicting the oldest entries."""
+    self._scrape_tiers[url] = tier
+    self._scrape_tiers.move_to_end(url)
+    while len(self._scrape_tiers) > SCRAPE_TIER_MEMORY_SIZE:
+      self._scrape_tiers.popitem(last=False)
+  
+  async def _fetch_rendered(self, url: str, render_profile: str = None) -> Tuple[str, Optional[str], Dict]:
+    """
+    Render the page in headless Chromium and extract its text.
+    
+    Args:
+        url: Normalized website URL
+        render_profile: Name of the entry in RENDER_PROFILES to use
+        
+    Returns:
+        Tuple of (content, error_message, validators)
+    """
+    profile_name = render_profile or DEFAULT_RENDER_PROFILE
+    if profile_name not in RENDER_PROFILES:
+      return "", f"Unknown render profile: {profile_name}", {}
+    profile = RENDER_PROFILES[profile_name]
+    
+    from playwright.async_api import async_playwright
+    
     try:
       async with async_playwright() as p:
         browser = await p.chromium.launch(headless=True)
         page = await browser.new_page()
         
         try:
+          if profile['block_resources']:
+            await page.route('**/*', self._route_blocked_resources)
+          
           # Set a reasonable timeout
-          await page.goto(url, timeout=15000, wait_until="networkidle")
+          response = await page.goto(url, timeout=profile['timeout'], wait_until=profile['wait_until'])
+          validators = self._response_validators(response.headers) if response else {}
+          
+          # Give client-side rendering a short window to fill in the page
+          if profile['settle_ms']:
+            await self._wait_for_text(page, profile['settle_ms'])
           
           # Get full HTML content including dynamic elements
           html_content = await page.content()
           
           # Process content
-          page_text = self._process_html_content(html_content)
+          page_text = await extract_text_async(html_content)
           
           # Check if content suggests this is a company website
           if not self._validate_company_content(page_text):
             await browser.close()
-            return "", "Company information unavailable, might not be active"
+            return "", UNAVAILABLE_MESSAGE, validators
             
           await browser.close()
-          return page_text, None
+          return page_text, None, validators
           
         except Exception as e:
           await browser.close()
-          return "", f"Error accessing website: {str(e)}"
+          return "", f"Error accessing website: {str(e)}", {}
           
     except Exception as e:
-      return "", f"Error initializing browser: {str(e)}"
+      return "", f"Error initializing browser: {str(e)}", {}
+  
+  @staticmethod
+  async def _route_blocked_resources(route) -> None:
+    """Abort non-document resources and analytics requests, continue the rest."""
+    request = route.request
+    host = urlparse(request.url).hostname or ''
+    
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or host.endswith(BLOCKED_HOSTS):
+      await route.abort()
+    else:
+      await route.continue_()
+  
+  @staticmethod
+  async def _wait_for_text(page, settle_ms: int) -> None:
+    """
+    Poll the rendered text until it fills the summary budget or the settle window ends.
+    
+    Args:
+        page: Playwright page
+        settle_ms: Maximum time to wait in milliseconds
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settle_ms / 1000
+    
+    while True:
+      text_length = await page.evaluate("() => document.body ? document.body.innerText.length : 0")
+      if text_length >= SUMMARY_CONTENT_CHARS or loop.time() >= deadline:
+        return
+      await asyncio.sleep(RENDER_POLL_INTERVAL)
     
   def _validate_url(self, url: str) -> bool:
     """
@@ -113,53 +586,478 @@ class AIService:
     return False
           
   def _process_html_content(self, html: str) -> str:
-    """Process HTML content to extract text."""
-    soup = BeautifulSoup(html, 'html.parser')
+    """Process HTML content to extract text within the extraction budget."""
+    return extract_text(html)
+  
+  async def _chat_completion(self, model: str, messages: List[Dict], priority: int = PRIORITY_BATCH, **kwargs):
+    """
+    Create a chat completion through the shared rate limiter, retrying
+    rate-limited and transient failures.
     
-    # Remove script and style elements
-    for script in soup(["script", "style"]):
-      script.decompose()
+    Args:
+        model: OpenAI model name
+        messages: Chat messages
+        priority: PRIORITY_INTERACTIVE for user-facing calls, PRIORITY_BATCH otherwise
+        **kwargs: Extra arguments for chat.completions.create
+        
+    Returns:
+        Chat completion response
+    """
+    import openai
     
-    # Get text
-    text = soup.get_text()
+    limiter = get_rate_limiter(model)
+    reserved_tokens = sum(count_tokens(message['content'], model) for message in messages) + kwargs.get('max_tokens', 256)
+    loop = asyncio.get_running_loop()
     
-    # Break into lines and remove leading and trailing space
-    lines = (line.strip() for line in text.splitlines())
+    for attempt in range(OPENAI_MAX_RETRIES + 1):
+      # Waiting for capacity and the request itself are bounded by the caller's deadline
+      try:
+        await asyncio.wait_for(limiter.acquire(reserved_tokens, priority), timeout=bounded_timeout(None))
+      except asyncio.TimeoutError:
+        raise DeadlineExceeded(f"Request deadline exceeded waiting for {model} capacity")
+      started = loop.time()
+      timeout = bounded_timeout(OPENAI_REQUEST_TIMEOUT)
+      
+      try:
+        response = await asyncio.wait_for(
+          self.client.chat.completions.create(model=model, messages=messages, timeout=timeout, **kwargs),
+          timeout=timeout
+        )
+      except openai.RateLimitError as e:
+        retry_after = self._retry_after(e)
+        limiter.release(reserved_tokens, rate_limited=True, retry_after=retry_after)
+        if attempt == OPENAI_MAX_RETRIES:
+          raise
+        delay = retry_after or min(OPENAI_RETRY_BACKOFF_MAX, OPENAI_RETRY_BACKOFF * 2 ** attempt)
+        print(f"Rate limited by OpenAI ({model}), retrying in {delay:.1f}s")
+        await self._sleep_before_retry(delay)
+        continue
+      except (openai.APITimeoutError, openai.APIConnectionError, openai.InternalServerError, asyncio.TimeoutError) as e:
+        limiter.release(reserved_tokens, latency=loop.time() - started)
+        if attempt == OPENAI_MAX_RETRIES:
+          raise
+        delay = min(OPENAI_RETRY_BACKOFF_MAX, OPENAI_RETRY_BACKOFF * 2 ** attempt)
+        print(f"OpenAI request failed ({model}): {str(e) or e.__class__.__name__}, retrying in {delay:.1f}s")
+        await self._sleep_before_retry(delay)
+        continue
+      except BaseException:
+        limiter.release(reserved_tokens)
+        raise
+      
+      # For streams this is the time to the first byte, usage is recorded by the caller
+      latency = loop.time() - started
+      usage = getattr(response, 'usage', None)
+      limiter.release(
+        reserved_tokens,
+        used_tokens=usage.total_tokens if usage else None,
+        latency=latency
+      )
+      if usage:
+        record_usage(model, usage.prompt_tokens, usage.completion_tokens, latency)
+      return response
+  
+  @staticmethod
+  async def _sleep_before_retry(delay: float) -> None:
+    """Wait before a retry, giving up if the retry could not start before the deadline."""
+    left = deadline_remaining()
+    if left is not None and left <= delay:
+      raise DeadlineExceeded("Request deadline exceeded before retrying")
+    await asyncio.sleep(delay)
+  
+  async def _hedged_completion(
+    self,
+    call_type: str,
+    model: str,
+    messages: List[Dict],
+    parse: Callable[[Any], Any],
+    hedge_model: Optional[str] = None,
+    hedge: bool = True,
+    priority: int = PRIORITY_INTERACTIVE,
+    **kwargs
+  ) -> Any:
+    """
+    Create a chat completion, sending a hedge request if it is slow.
     
-    # Break multi-headlines into a line each
-    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    When the first request has not answered after the call type's recent p95
+    latency, a second request is sent (to hedge_model if given) and the first
+    valid answer is used. The other request is cancelled. Latency and hedging
+    are recorded per call type.
     
-    # Drop blank lines
-    text = ' '.join(chunk for chunk in chunks if chunk)
+    Args:
+        call_type: Name the latency distribution is tracked under
+        model: OpenAI model name
+        messages: Chat messages
+        parse: Turns a response into the result, raising ValueError for invalid answers
+        hedge_model: Model used for the hedge request, defaults to model
+        hedge: Whether hedging is allowed for this call
+        priority: PRIORITY_INTERACTIVE for user-facing calls, PRIORITY_BATCH otherwise
+        **kwargs: Extra arguments for chat.completions.create
+        
+    Returns:
+        Parsed result of the first valid answer
+        
+    Raises:
+        ValueError: If no request gave a valid answer
+        DeadlineExceeded: If the deadline passed before an answer
+    """
+    tracker = get_call_tracker(call_type)
+    loop = asyncio.get_running_loop()
+    started = loop.time()
     
-    # Return full text for better context
-    return text
-
-  async def generate_company_summary(self, company_data: Dict, website_content: str) -> str:
+    async def attempt(attempt_model: str):
+      response = await self._chat_completion(attempt_model, messages, priority=priority, **kwargs)
+      return parse(response)
+    
+    tasks = [asyncio.ensure_future(attempt(model))]
+    hedged = False
+    try:
+      delay = tracker.hedge_delay() if hedge and OPENAI_HEDGING_ENABLED else None
+      left = deadline_remaining()
+      if delay is not None and (left is None or left > delay):
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if not done:
+          hedged = True
+          tasks.append(asyncio.ensure_future(attempt(hedge_model or model)))
+      
+      error = None
+      pending = set(tasks)
+      while pending:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+          if task.exception() is None:
+            tracker.record(loop.time() - started, hedged=hedged, hedge_won=task is not tasks[0])
+            return task.result()
+          # Keep the first request's error unless the hedge is all we heard from
+          if error is None or task is tasks[0]:
+            error = task.exception()
+      
+      tracker.record(
+        loop.time() - started,
+        hedged=hedged,
+        failed=True,
+        deadline_exceeded=isinstance(error, DeadlineExceeded)
+      )
+      raise error
+    finally:
+      for task in tasks:
+        if not task.done():
+          task.cancel()
+  
+  @staticmethod
+  def _retry_after(error: Exception) -> Optional[float]:
+    """Read the Retry-After delay in seconds from an OpenAI error response."""
+    response = getattr(error, 'response', None)
+    if response is None:
+      return None
+    
+    headers = response.headers
+    try:
+      if headers.get('retry-after-ms'):
+        return float(headers['retry-after-ms']) / 1000
+      if headers.get('retry-after'):
+        return float(headers['retry-after'])
+    except ValueError:
+      return None
+    return None
+  
+  @timed('summary')
+  async def generate_company_summary(
+    self,
+    company_data: Dict,
+    website_content: str,
+    priority: int = PRIORITY_BATCH
+  ) -> str:
     """Generate company summary using AI."""
     if not website_content:
-      return "Company information unavailable, might not be active"
+      return UNAVAILABLE_MESSAGE
     
     try:
       prompt = self._create_summary_prompt(company_data, website_content)
       
-      response = await self.client.chat.completions.create(
-        model="gpt-3.5-turbo",
+      summary = await self._hedged_completion(
+        'summary',
+        model=SUMMARY_MODEL,
         messages=[{"role": "user", "content": prompt}],
+        parse=lambda response: response.choices[0].message.content.strip(),
+        hedge=False,
+        priority=priority,
         max_tokens=150
       )
       
-      summary = response.choices[0].message.content.strip()
-      
       # Validate that generated summary contains company information
       if self._validate_generated_summary(summary):
         return summary
       else:
-        return "Company information unavailable, might not be active"
+        return UNAVAILABLE_MESSAGE
     except Exception as e:
       print(f"Error generating summary: {e}")
-      return "Company information unavailable, might not be active"
+      return UNAVAILABLE_MESSAGE
       
+  async def stream_company_summary(
+    self,
+    company_data: Dict,
+    website_content: str,
+    priority: int = PRIORITY_INTERACTIVE
+  ) -> AsyncIterator[str]:
+    """
+    Generate a company summary with the streaming API, yielding text as it arrives.
+    
+    The yielded text is not validated; callers should pass the joined text to
+    _validate_generated_summary before storing it.
+    
+    Args:
+        company_data: Company information
+        website_content: Extracted website text
+        priority: PRIORITY_INTERACTIVE for user-facing calls, PRIORITY_BATCH otherwise
+        
+    Yields:
+        Summary text deltas
+    """
+    if not website_content:
+      yield UNAVAILABLE_MESSAGE
+      return
+    
+    prompt = self._create_summary_prompt(company_data, website_content)
+    tracker = get_call_tracker('summary_stream')
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    parts = []
+    
+    try:
+      # Retries and rate limiting cover opening the stream
+      stream = await self._chat_completion(
+        model=SUMMARY_MODEL,
+        messages=[{"role": "user", "content": prompt}],
+        priority=priority,
+        max_tokens=150,
+        stream=True
+      )
+      async for chunk in stream:
+        delta = chunk.choices[0].delta.content if chunk.choices else None
+        if delta:
+          parts.append(delta)
+          yield delta
+    except BaseException as e:
+      tracker.record(loop.time() - started, failed=True, deadline_exceeded=isinstance(e, DeadlineExceeded))
+      raise
+    
+    latency = loop.time() - started
+    tracker.record(latency)
+    # Streamed responses carry no usage, count the tokens locally
+    record_usage(SUMMARY_MODEL, count_tokens(prompt, SUMMARY_MODEL), count_tokens(''.join(parts), SUMMARY_MODEL), latency)
+  
+  @timed('summary_batch')
+  async def generate_company_summaries(self, entries: List[Tuple[Any, Dict, str]]) -> Dict[Any, str]:
+    """
+    Generate summaries for several companies, packing them into shared completions.
+    
+    Companies are grouped within SUMMARY_BATCH_TOKEN_BUDGET and each group is
+    answered with one JSON completion. Entries missing from or malformed in
+    the batched answer are retried with single-company calls.
+    
+    Args:
+        entries: List of (key, company data, website content) tuples
+        
+    Returns:
+        Dictionary of key to summary
+    """
+    summaries = {}
+    pending = []
+    
+    for key, company_data, website_content in entries:
+      if website_content:
+        pending.append((key, company_data, website_content))
+      else:
+        summaries[key] = UNAVAILABLE_MESSAGE
+    
+    if len(pending) == 1:
+      key, company_data, website_content = pending[0]
+      summaries[key] = await self.generate_company_summary(company_data, website_content)
+      return summaries
+    
+    results = await asyncio.gather(*(
+      self._generate_summary_batch(batch) for batch in self._pack_summary_batches(pending)
+    ))
+    for batch_summaries in results:
+      summaries.update(batch_summaries)
+    
+    return summaries
+  
+  def _pack_summary_batches(self, entries: List[Tuple[Any, Dict, str]]) -> List[List[Tuple[Any, Dict, str]]]:
+    """
+    Group summary entries so each group fits the batch token budget.
+    
+    Args:
+        entries: List of (key, company data, website content) tuples
+        
+    Returns:
+        List of entry groups
+    """
+    batches = []
+    current = []
+    current_tokens = 0
+    
+    for entry in entries:
+      tokens = count_tokens(self._create_batch_company_block(0, entry[1], entry[2]), SUMMARY_MODEL)
+      if current and (
+        current_tokens + tokens > SUMMARY_BATCH_TOKEN_BUDGET or len(current) >= SUMMARY_BATCH_MAX_COMPANIES
+      ):
+        batches.append(current)
+        current = []
+        current_tokens = 0
+      current.append(entry)
+      current_tokens += tokens
+    
+    if current:
+      batches.append(current)
+    
+    return batches
+  
+  async def _generate_summary_batch(self, batch: List[Tuple[Any, Dict, str]]) -> Dict[Any, str]:
+    """
+    Summarize one group of companies with a single JSON completion.
+    
+    Args:
+        batch: List of (key, company data, website content) tuples
+        
+    Returns:
+        Dictionary of key to summary
+    """
+    answers = {}
+    
+    try:
+      prompt = self._create_batch_summary_prompt(batch)
+      answers = await self._hedged_completion(
+        'summary_batch',
+        model=SUMMARY_MODEL,
+        messages=[{"role": "user", "content": prompt}],
+        parse=lambda response: self._parse_batch_summaries(response.choices[0].message.content, len(batch)),
+        hedge=False,
+        priority=PRIORITY_BATCH,
+        response_format={"type": "json_object"},
+        max_tokens=SUMMARY_BATCH_OUTPUT_TOKENS * len(batch) + 50
+      )
+    except Exception as e:
+      print(f"Error generating batched summaries: {e}")
+    
+    summaries = {}
+    retries = []
+    
+    for index, (key, company_data, website_content) in enumerate(batch):
+      summary = answers.get(index)
+      if summary is None:
+        retries.append((key, company_data, website_content))
+      elif self._validate_generated_summary(summary):
+        summaries[key] = summary
+      else:
+        summaries[key] = UNAVAILABLE_MESSAGE
+    
+    # Fall back to single-company calls for entries the batch did not answer
+    if retries:
+      retried = await asyncio.gather(*(
+        self.generate_company_summary(company_data, website_content)
+        for _, company_data, website_content in retries
+      ))
+      for (key, _, _), summary in zip(retries, retried):
+        summaries[key] = summary
+    
+    return summaries
+  
+  @staticmethod
+  def _parse_batch_summaries(content: str, count: int) -> Dict[int, str]:
+    """
+    Parse a batched summary answer.
+    
+    Args:
+        content: Raw completion content
+        count: Number of companies in the batch
+        
+    Returns:
+        Dictionary of batch index to summary, only containing well-formed answers
+    """
+    try:
+      data = json.loads(content)
+    except (TypeError, ValueError):
+      return {}
+    
+    items = data.get('summaries') if isinstance(data, dict) else None
+    if not isinstance(items, list):
+      return {}
+    
+    answers = {}
+    for item in items:
+      if not isinstance(item, dict):
+        continue
+      try:
+        index = int(item.get('id'))
+      except (TypeError, ValueError):
+        continue
+      summary = item.get('summary')
+      if 0 <= index < count and index not in answers and isinstance(summary, str) and summary.strip():
+        answers[index] = summary.strip()
+    
+    return answers
+  
+  @staticmethod
+  def _format_company_fields(company_data: Dict) -> str:
+    """Format the known company details for a summary prompt."""
+    return format_fields([
+      ('Name', company_data.get('name')),
+      ('Industry', company_data.get('industry')),
+      ('Location', join_nonempty([company_data.get('locality'), company_data.get('region'), company_data.get('country')])),
+      ('Founded', company_data.get('founded')),
+      ('Size', company_data.get('size'))
+    ])
+  
+  def _fit_website_content(self, company_data: Dict, website_content: str) -> str:
+    """
+    Select website text for a company within the summary input budget.
+    
+    Company details and instructions are always sent; the website text gets
+    the tokens of SUMMARY_INPUT_TOKEN_BUDGET they leave, filled with headings
+    and first paragraphs first.
+    
+    Args:
+        company_data: Company information
+        website_content: Extracted website text
+        
+    Returns:
+        Website text within the budget
+    """
+    overhead = count_tokens(self._create_summary_prompt(company_data, "", fit=False), SUMMARY_MODEL)
+    return fit_text(website_content, SUMMARY_INPUT_TOKEN_BUDGET - overhead, SUMMARY_MODEL)
+  
+  def _create_batch_company_block(self, index: int, company_data: Dict, website_content: str) -> str:
+    """Create the prompt section for one company in a batched summary prompt."""
+    return compress_prompt(f"""
+    Company id: {index}
+    {self._format_company_fields(company_data)}
+    Website Content:
+    """) + '\n' + self._fit_website_content(company_data, website_content) + '\n'
+  
+  def _create_batch_summary_prompt(self, batch: List[Tuple[Any, Dict, str]]) -> str:
+    """Create prompt summarizing several companies in one JSON answer."""
+    blocks = '\n'.join(
+      self._create_batch_company_block(index, company_data, website_content)
+      for index, (_, company_data, website_content) in enumerate(batch)
+    )
+    instructions = compress_prompt("""
+    Based STRICTLY on the following company information and website content, generate a concise summary
+    for each company. Do NOT use any external knowledge not contained in the provided information, and
+    do NOT mix up information between companies.
+    """)
+    answer_format = compress_prompt("""
+    For each company, if you cannot determine what the company does from its provided information, use
+    "Unable to determine company information from the provided content." as its summary.
+    Otherwise, provide a 2-3 sentence summary focusing on what the company does and its key characteristics,
+    ONLY using the information provided for that company.
+    
+    Respond with a JSON object of the form:
+    {"summaries": [{"id": <company id>, "summary": "<summary>"}]}
+    with exactly one entry per company id.
+    """)
+    return f"{instructions}\n\n{blocks}\n{answer_format}"
+  
   def _validate_generated_summary(self, summary: str) -> bool:
     """
     Validate that the generated summary contains useful company information.
@@ -186,55 +1084,80 @@ class AIService:
       
     return True
       
-  def _create_summary_prompt(self, company_data: Dict, website_content: str) -> str:
-    """Create prompt for company summary."""
-    return f"""
+  def _create_summary_prompt(self, company_data: Dict, website_content: str, fit: bool = True) -> str:
+    """
+    Create prompt for company summary.
+    
+    Args:
+        company_data: Company information
+        website_content: Extracted website text
+        fit: Fit the website text into SUMMARY_INPUT_TOKEN_BUDGET
+        
+    Returns:
+        Prompt text
+    """
+    if fit:
+      website_content = self._fit_website_content(company_data, website_content)
+    
+    instructions = compress_prompt(f"""
     Based STRICTLY on the following company information and website content, generate a concise summary.
     Do NOT use any external knowledge not contained in the provided information.
     
     Company Information:
-    - Name: {company_data.get('name')}
-    - Industry: {company_data.get('industry')}
-    - Location: {company_data.get('locality')}, {company_data.get('region')}, {company_data.get('country')}
-    - Founded: {company_data.get('founded')}
-    - Size: {company_data.get('size')}
+    {self._format_company_fields(company_data)}
     
     Website Content:
-    {website_content[:3000]}  # Limit to 3000 chars for context
-    
+    """)
+    answer_format = compress_prompt("""
     If you cannot determine what the company does from the provided information, respond with only:
     "Unable to determine company information from the provided content."
     
     Otherwise, please provide a 2-3 sentence summary focusing on what the company does and its key characteristics,
     ONLY using the information provided above.
-    """
+    """)
+    return f"{instructions}\n{website_content}\n\n{answer_format}"
 
+  @timed('search_enhancement')
   async def enhance_search(self, search_query: str) -> Optional[Dict]:
     """Enhance search query using AI to extract structured filters."""
     if not search_query:
       return None
-      
+    
+    # Identical concurrent searches share one completion
+    return await single_flight.do(
+      f"filters:{self._normalize_query(search_query)}",
+      lambda: self._enhance_search(search_query)
+    )
+  
+  @staticmethod
+  def _normalize_query(text_query: str) -> str:
+    """Normalize a search query for coalescing identical requests."""
+    return ' '.join(text_query.lower().split())
+  
+  async def _enhance_search(self, search_query: str) -> Optional[Dict]:
+    """Extract structured filters from a search query with one completion."""
     try:
       prompt = self._create_search_enhancement_prompt(search_query)
       
-      response = await self.client.chat.completions.create(
-        model="gpt-3.5-turbo",
+      # Parse the response to extract filters
+      return await self._hedged_completion(
+        'search_filters',
+        model=SEARCH_MODEL,
+        hedge_model=SEARCH_HEDGE_MODEL,
         messages=[{"role": "user", "content": prompt}],
+        parse=lambda response: json.loads(response.choices[0].message.content.strip()),
+        priority=PRIORITY_INTERACTIVE,
         max_tokens=150
       )
-      
-      # Parse the response to extract filters
-      try:
-        return json.loads(response.choices[0].message.content.strip())
-      except:
-        return None
+    except ValueError:
+      return None
     except Exception as e:
       print(f"Error enhancing search: {e}")
       return None
       
   def _create_search_enhancement_prompt(self, search_query: str) -> str:
     """Create prompt for search enhancement."""
-    return f"""
+    return compress_prompt(f"""
     Analyze the following search query and extract relevant filters for company search:
     Query: "{search_query}"
     
@@ -251,7 +1174,7 @@ class AIService:
       "country": "Europe",
       "size": "100+"
     }}
-    """
+    """)
  
   def _validate_sql_query(self, sql_query: str) -> Tuple[bool, Optional[str]]:
     """
@@ -290,6 +1213,7 @@ class AIService:
     
     return True, None
 
+  @timed('sql_generation')
   async def generate_sql_from_text(self, text_query: str, where_conditions: Dict = None) -> Tuple[Optional[str], Optional[str]]:
     """
     Generate SQL query from natural language text.
@@ -301,15 +1225,22 @@ class AIService:
     Returns:
         Tuple of (sql_query, error_message)
     """
-    # Get company fields for context
-    company_fields = self._get_company_fields()
-    
+    # Identical concurrent searches share one completion
+    key = f"sql:{self._normalize_query(text_query)}:{json.dumps(where_conditions or {}, sort_keys=True, default=str)}"
+    return await single_flight.do(key, lambda: self._generate_sql_from_text(text_query, where_conditions))
+  
+  async def _generate_sql_from_text(
+    self,
+    text_query: str,
+    where_conditions: Dict = None
+  ) -> Tuple[Optional[str], Optional[str]]:
+    """Generate a SQL query from natural language with one completion."""
     # Construct prompt for OpenAI
     prompt = f"""
     Convert the following natural language query into a SQL query to search a companies database.
     
     Database schema:
-    {', '.join(company_fields)}
+    {self._get_sql_schema()}
     
     Natural language query: "{text_query}"
     
@@ -335,20 +1266,38 @@ class AIService:
         else:
           prompt += f"\n- {field} ILIKE '{value}'"
     
+    prompt = compress_prompt(prompt)
+    
     if not self.api_key:
       raise ValueError("OpenAI API key not found in environment variables")
     
-    # Call OpenAI API
-    response = await self.client.chat.completions.create(
-      model="gpt-4",
-      messages=[
-        {"role": "system", "content": "You are a SQL expert. Generate only the SQL query without explanations or markdown formatting."},
-        {"role": "user", "content": prompt}
-      ],
-      temperature=0.1,
-      max_tokens=500
-    )
+    # Call OpenAI API, hedging slow answers
+    try:
+      sql_query = await self._hedged_completion(
+        'sql',
+        model=SQL_MODEL,
+        hedge_model=SQL_HEDGE_MODEL,
+        messages=[
+          {"role": "system", "content": "You are a SQL expert. Generate only the SQL query without explanations or markdown formatting."},
+          {"role": "user", "content": prompt}
+        ],
+        parse=self._parse_sql_response,
+        priority=PRIORITY_INTERACTIVE,
+        temperature=0.1,
+        max_tokens=500
+      )
+    except ValueError as e:
+      return None, str(e)
     
+    return sql_query, None
+  
+  def _parse_sql_response(self, response) -> str:
+    """
+    Extract and validate the SQL query of a completion.
+    
+    Raises:
+        ValueError: If the answer is not a valid query
+    """
     # Extract SQL from response
     sql_query = response.choices[0].message.content.strip()
 
@@ -358,17 +1307,46 @@ class AIService:
     # Validate SQL query
     is_valid, error = self._validate_sql_query(sql_query)
     if not is_valid:
-      return None, error
+      raise ValueError(error)
     
-    return sql_query, None
+    return sql_query
   
-  @staticmethod
-  def _get_company_fields() -> List[str]:
+  _sql_schema: Optional[str] = None
+  
+  @classmethod
+  def _get_sql_schema(cls) -> str:
     """
-    Get all filterable fields from the Company model.
+    Get a compact description of the companies table for the SQL prompt.
     
     Returns:
-        List of field names from the Company model
+        Table signature such as "companies(id integer, name text, ...)"
     """
-    # Use SQLAlchemy's inspect to get model columns
-    return [column.name for column in inspect(Company).columns] 
\ No newline at end of file
+    if cls._sql_schema is None:
+      columns = []
+      for column in inspect(Company).columns:
+        if column.name in SQL_SCHEMA_EXCLUDED_COLUMNS:
+          continue
+        python_type = column.type.python_type
+        sql_type = {int: 'integer', float: 'numeric'}.get(python_type, 'timestamp' if python_type.__name__ == 'datetime' else 'text')
+        columns.append(f"{column.name} {sql_type}")
+      cls._sql_schema = f"{Company.__tablename__}({', '.join(columns)})"
+    
+    return cls._sql_schema
+
+_ai_service = None
+_ai_service_lock = threading.Lock()
+
+def get_ai_service() -> AIService:
+  """
+  Get the process-wide AI service, created on first use.
+
+  Returns:
+      Shared AIService
+  """
+  global _ai_service
+
+  with _ai_service_lock:
+    if _ai_service is None:
+      _ai_service = AIService()
+
+  return _ai_service
@@ -1,10 +1,21 @@
+import asyncio
+import os
+import time
 from typing import Dict, List, Optional, Tuple, Any
 
-from sqlalchemy import and_, or_, text, inspect
+from sqlalchemy import and_, func, or_, select, text, inspect
 
 from app import db
 from app.models.company import Company
 from app.services.ai_service import AIService
+from app.services.query_log import get_sql_query_logger
+from app.utils.async_db import async_db
+from app.utils.db_routing import read_replica
+from app.utils.deadline import deadline_scope, remaining as deadline_remaining
+from app.utils.timing import span
+
+# Share of the request deadline SQL generation may use, leaving time for the filter fallback
+SQL_GENERATION_DEADLINE_SHARE = float(os.getenv('SQL_GENERATION_DEADLINE_SHARE', '0.7'))
 
 class CompanyService:
   """Service for company-related operations."""
@@ -44,7 +55,9 @@ class CompanyService:
         where_conditions = CompanyService._generate_where_conditions(filters) if filters else {}
         
         # Generate SQL with filters included
-        sql_query, error = await ai_service.generate_sql_from_text(text_query, where_conditions)
+        left = deadline_remaining()
+        with deadline_scope(left * SQL_GENERATION_DEADLINE_SHARE if left is not None else None):
+          sql_query, error = await ai_service.generate_sql_from_text(text_query, where_conditions)
         if error:
           print(f"Error generating SQL: {error}")
           raise ValueError(f"Error generating SQL: {error}")
@@ -54,10 +67,11 @@ class CompanyService:
         print(f"Final SQL query: {sql_query}")
         
         # Execute the query
-        companies, total, pages, current_page = CompanyService.execute_sql_query(
+        companies, total, pages, current_page = await CompanyService.execute_sql_query_async(
           sql_query=sql_query,
           page=page,
-          per_page=per_page
+          per_page=per_page,
+          natural_query=text_query
         )
         
         # Return results with the generated SQL
@@ -79,7 +93,7 @@ class CompanyService:
         print(f"Error enhancing search: {str(e)}")
     
     # Use standard search with filters and AI filters
-    companies, total, pages, current_page = CompanyService.search_companies(
+    companies, total, pages, current_page = await CompanyService.search_companies_async(
       page=page,
       per_page=per_page,
       filters=filters,
@@ -108,8 +122,79 @@ class CompanyService:
     Returns:
         Tuple of (companies list, total count, total pages, current page)
     """
-    # Start with base query
-    query = Company.query
+    query = Company.query.filter(*CompanyService._search_conditions(filters, ai_filters))
+    
+    # Execute paginated query, search results may lag writes slightly
+    with read_replica(), span('filter_search'):
+      paginated_companies = query.paginate(page=page, per_page=per_page, error_out=False)
+    
+    return (
+      [company.to_dict() for company in paginated_companies.items],
+      paginated_companies.total,
+      paginated_companies.pages,
+      page
+    )
+  
+  @staticmethod
+  async def search_companies_async(
+    page: int = 1,
+    per_page: int = 10,
+    filters: Dict = None,
+    ai_filters: Dict = None
+  ) -> Tuple[List[Dict], int, int, int]:
+    """
+    Search companies with filters without blocking the event loop.
+    
+    The count and page queries run concurrently on the read replica, if configured.
+    Off the persistent worker loop async engines are not pooled, so the pooled
+    sync search runs in a thread instead.
+    
+    Args:
+        page: Page number
+        per_page: Items per page
+        filters: Dictionary of filter conditions
+        ai_filters: Dictionary of AI-enhanced filters
+        
+    Returns:
+        Tuple of (companies list, total count, total pages, current page)
+    """
+    if not async_db.pooled:
+      return await async_db.run_sync(CompanyService.search_companies, page, per_page, filters, ai_filters)
+    
+    conditions = CompanyService._search_conditions(filters, ai_filters)
+    count_statement = select(func.count()).select_from(Company).where(*conditions)
+    page_statement = select(Company).where(*conditions).limit(per_page).offset((page - 1) * per_page)
+    
+    async def fetch_page():
+      async with async_db.session(replica=True) as session:
+        return (await session.scalars(page_statement)).all()
+    
+    with span('filter_search'):
+      total, companies = await asyncio.gather(
+        async_db.scalar(count_statement, replica=True),
+        fetch_page()
+      )
+    
+    return (
+      [company.to_dict() for company in companies],
+      total,
+      (total + per_page - 1) // per_page,
+      page
+    )
+  
+  @staticmethod
+  def _search_conditions(filters: Dict = None, ai_filters: Dict = None) -> List:
+    """
+    Build the WHERE conditions of a filter search.
+    
+    Args:
+        filters: Dictionary of filter conditions, all must match
+        ai_filters: Dictionary of AI-enhanced filters, any may match
+        
+    Returns:
+        List of SQLAlchemy conditions
+    """
+    conditions = []
     
     # Apply standard filters
     if filters:
@@ -127,7 +212,7 @@ class CompanyService:
         filter_conditions.append(Company.founded <= int(founded_to))
           
       if filter_conditions:
-        query = query.filter(and_(*filter_conditions))
+        conditions.append(and_(*filter_conditions))
     
     # Apply AI-enhanced filters
     if ai_filters:
@@ -138,17 +223,9 @@ class CompanyService:
           ai_filter_conditions.append(getattr(Company, field).ilike(f'%{value}%'))
           
       if ai_filter_conditions:
-        query = query.filter(or_(*ai_filter_conditions))
+        conditions.append(or_(*ai_filter_conditions))
     
-    # Execute paginated query
-    paginated_companies = query.paginate(page=page, per_page=per_page, error_out=False)
-    
-    return (
-      [company.to_dict() for company in paginated_companies.items],
-      paginated_companies.total,
-      paginated_companies.pages,
-      page
-    )
+    return conditions
   
   @staticmethod
   def _generate_where_conditions(filters: Dict) -> Dict[str, Any]:
@@ -199,34 +276,59 @@ class CompanyService:
         Company object or None if not found
     """
     return Company.query.get(company_id)
+  
+  @staticmethod
+  async def get_company_async(company_id: int) -> Optional[Company]:
+    """
+    Get company by ID without blocking the event loop.
+    
+    Reads the primary so recently enriched companies are up to date. Off the
+    persistent worker loop async engines are not pooled, so the pooled sync
+    lookup runs in a thread instead of opening a connection per lookup.
+    
+    Args:
+        company_id: Company ID
+        
+    Returns:
+        Company object or None if not found
+    """
+    if not async_db.pooled:
+      return await async_db.run_sync(CompanyService.get_company, company_id)
+    async with async_db.session() as session:
+      return await session.get(Company, company_id)
     
   @staticmethod
   def execute_sql_query(
     sql_query: str,
     page: int = 1,
-    per_page: int = 10
+    per_page: int = 10,
+    natural_query: str = None
   ) -> Tuple[List[Dict], int, int, int]:
     """
     Execute SQL query and return paginated results.
     
+    Each execution is recorded in the SQL query log.
+    
     Args:
         sql_query: SQL query string
         page: Page number
         per_page: Items per page
+        natural_query: Search text the SQL was generated from, for the query log
         
     Returns:
         Tuple of (companies list, total count, total pages, current page)
     """
+    sql_query = CompanyService._prepare_sql_query(sql_query)
+    timings = {}
+    total_items = None
+    paginated_sql = None
     try:
-      sql_query = sql_query.replace("```sql", "").replace("```", "").strip(";")
-      # Ensure the query has an ORDER BY clause for deterministic results
-      if "ORDER BY" not in sql_query.upper():
-        # Add ordering by ID as a default if no ordering is specified
-        sql_query = f"{sql_query} ORDER BY id"
-      
       # Create a text SQL query for counting total results
       count_query = text(f"SELECT COUNT(*) FROM ({sql_query}) as count_query")
-      count_result = db.session.execute(count_query).scalar()
+      started = time.perf_counter()
+      with read_replica(), span('sql_count'):
+        count_result = db.session.execute(count_query).scalar()
+      timings['count_ms'] = (time.perf_counter() - started) * 1000
       
       # Calculate pagination
       total_items = count_result
@@ -244,33 +346,140 @@ class CompanyService:
       paginated_query = text(paginated_sql)
       
       # Execute the paginated query
-      result = db.session.execute(paginated_query)
+      started = time.perf_counter()
+      with read_replica(), span('sql_page'):
+        result = db.session.execute(paginated_query)
       
       # Convert to list of dicts
-      paginated_items = []
-      for row in result:
-        # Check if row is a SQLAlchemy Company object
-        if isinstance(row, Company):
-          paginated_items.append(row.to_dict())
-        # Check if row is a tuple with a single Company element
-        elif isinstance(row, tuple) and len(row) == 1 and isinstance(row[0], Company):
-          paginated_items.append(row[0].to_dict())
-        # Otherwise, check if row has a _mapping attribute (new SQLAlchemy style)
-        elif hasattr(row, '_mapping'):
-          paginated_items.append(dict(row._mapping))
-        # Fallback for older SQLAlchemy versions
-        else:
-          try:
-            # Try to convert row to dict
-            paginated_items.append(dict(row))
-          except Exception:
-            # If that fails, process individual fields
-            item = {}
-            for idx, column in enumerate(result.keys()):
-              item[column] = row[idx]
-            paginated_items.append(item)
+      keys = list(result.keys())
+      paginated_items = [CompanyService._row_to_dict(row, keys) for row in result]
+      timings['page_ms'] = (time.perf_counter() - started) * 1000
+    except Exception as e:
+      get_sql_query_logger().record(
+        sql_query, natural_query, total_rows=total_items, error=str(e), page_sql=paginated_sql, **timings
+      )
+      # Re-raise the exception with more context
+      raise ValueError(f"Error executing SQL query: {str(e)}")
+    
+    get_sql_query_logger().record(
+      sql_query, natural_query, rows_returned=len(paginated_items), total_rows=total_items,
+      page_sql=paginated_sql, **timings
+    )
+    return paginated_items, total_items, total_pages, page
+  
+  @staticmethod
+  async def execute_sql_query_async(
+    sql_query: str,
+    page: int = 1,
+    per_page: int = 10,
+    natural_query: str = None
+  ) -> Tuple[List[Dict], int, int, int]:
+    """
+    Execute SQL query and return paginated results without blocking the event loop.
+    
+    The count and page queries run concurrently on the read replica, if configured.
+    A page past the end is fetched again as the last page once the count is known.
+    Each execution is recorded in the SQL query log. Off the persistent worker
+    loop the pooled sync execution runs in a thread instead.
+    
+    Args:
+        sql_query: SQL query string
+        page: Page number
+        per_page: Items per page
+        natural_query: Search text the SQL was generated from, for the query log
+        
+    Returns:
+        Tuple of (companies list, total count, total pages, current page)
+    """
+    if not async_db.pooled:
+      return await async_db.run_sync(CompanyService.execute_sql_query, sql_query, page, per_page, natural_query)
+    
+    sql_query = CompanyService._prepare_sql_query(sql_query)
+    count_query = text(f"SELECT COUNT(*) FROM ({sql_query}) as count_query")
+    timings = {}
+    page_sql = {}
+    total_items = None
+    
+    async def count():
+      started = time.perf_counter()
+      with span('sql_count'):
+        result = await async_db.scalar(count_query, replica=True)
+      timings['count_ms'] = (time.perf_counter() - started) * 1000
+      return result
+    
+    async def fetch_page(page):
+      page_sql['sql'] = f"{sql_query} LIMIT {per_page} OFFSET {(page - 1) * per_page}"
+      started = time.perf_counter()
+      with span('sql_page'):
+        rows = await async_db.fetch_all(text(page_sql['sql']), replica=True)
+      # A refetch of the last page adds to the first fetch
+      timings['page_ms'] = timings.get('page_ms', 0) + (time.perf_counter() - started) * 1000
+      return rows
+    
+    try:
+      total_items, rows = await asyncio.gather(count(), fetch_page(page))
+      total_pages = (total_items + per_page - 1) // per_page
       
-      return paginated_items, total_items, total_pages, page
+      # Adjust page number if out of range
+      if page > total_pages and total_pages > 0:
+        page = total_pages
+        rows = await fetch_page(page)
     except Exception as e:
+      get_sql_query_logger().record(
+        sql_query, natural_query, total_rows=total_items, error=str(e), page_sql=page_sql.get('sql'), **timings
+      )
       # Re-raise the exception with more context
-      raise ValueError(f"Error executing SQL query: {str(e)}") 
\ No newline at end of file
+      raise ValueError(f"Error executing SQL query: {str(e)}")
+    
+    get_sql_query_logger().record(
+      sql_query, natural_query, rows_returned=len(rows), total_rows=total_items,
+      page_sql=page_sql.get('sql'), **timings
+    )
+    return [dict(row._mapping) for row in rows], total_items, total_pages, page
+  
+  @staticmethod
+  def _prepare_sql_query(sql_query: str) -> str:
+    """
+    Strip Markdown fences from generated SQL and make its ordering deterministic.
+    
+    Args:
+        sql_query: SQL query string
+        
+    Returns:
+        SQL query ready to be counted and paginated
+    """
+    sql_query = sql_query.replace("```sql", "").replace("```", "").strip(";")
+    # Ensure the query has an ORDER BY clause for deterministic results
+    if "ORDER BY" not in sql_query.upper():
+      # Add ordering by ID as a default if no ordering is specified
+      sql_query = f"{sql_query} ORDER BY id"
+    return sql_query
+  
+  @staticmethod
+  def _row_to_dict(row, keys: List[str]) -> Dict:
+    """
+    Convert a result row of a raw SQL query to a dictionary.
+    
+    Args:
+        row: Result row
+        keys: Column names of the result
+        
+    Returns:
+        Dictionary of column values
+    """
+    # Check if row is a SQLAlchemy Company object
+    if isinstance(row, Company):
+      return row.to_dict()
+    # Check if row is a tuple with a single Company element
+    if isinstance(row, tuple) and len(row) == 1 and isinstance(row[0], Company):
+      return row[0].to_dict()
+    # Otherwise, check if row has a _mapping attribute (new SQLAlchemy style)
+    if hasattr(row, '_mapping'):
+      return dict(row._mapping)
+    # Fallback for older SQLAlchemy versions
+    try:
+      # Try to convert row to dict
+      return dict(row)
+    except Exception:
+      # If that fails, process individual fields
+      return {column: row[idx] for idx, column in enumerate(keys)}
@@ -0,0 +1,80 @@
+import threading
+from typing import Dict
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app import db
+
+class PoolMonitor:
+  """Checkout counts and peak usage of one engine's connection pool."""
+
+  def __init__(self, engine: Engine):
+    self._lock = threading.Lock()
+    self.engine = engine
+    self.checkouts = 0
+    self.peak_checked_out = 0
+    # Pool listeners are kept when dispose() replaces the pool
+    event.listen(engine, 'checkout', self._on_checkout)
+
+  def _on_checkout(self, dbapi_connection, connection_record, connection_proxy) -> None:
+    """Count a checkout and update the peak number of connections in use."""
+    checked_out = self.engine.pool.checkedout()
+    with self._lock:
+      self.checkouts += 1
+      self.peak_checked_out = max(self.peak_checked_out, checked_out)
+
+  def to_dict(self) -> Dict:
+    """Get the current pool state and counters as a dictionary."""
+    pool = self.engine.pool
+    # Only QueuePool has a fixed size; other pools report their current usage
+    size = pool.size() if hasattr(pool, 'size') else 0
+    max_overflow = getattr(pool, '_max_overflow', 0)
+    capacity = size + max(max_overflow, 0)
+    checked_out = pool.checkedout() if hasattr(pool, 'checkedout') else 0
+    with self._lock:
+      return {
+        'pool_size': size,
+        'max_overflow': max_overflow,
+        'checked_out': checked_out,
+        'idle': pool.checkedin() if hasattr(pool, 'checkedin') else 0,
+        # QueuePool counts unopened pool slots as negative overflow
+        'overflow': max(pool.overflow(), 0) if hasattr(pool, 'overflow') else 0,
+        'saturation': round(checked_out / capacity, 3) if capacity > 0 else None,
+        'peak_checked_out': self.peak_checked_out,
+        'checkouts': self.checkouts
+      }
+
+_monitors: Dict[str, PoolMonitor] = {}
+_monitors_lock = threading.Lock()
+
+def instrument_pools(app) -> None:
+  """
+  Start monitoring the connection pools of the app's engines.
+
+  Args:
+      app: Flask app with Flask-SQLAlchemy initialized
+  """
+  with app.app_context():
+    engines = dict(db.engines)
+
+  for bind_key, engine in engines.items():
+    monitor_engine(bind_key or 'primary', engine)
+
+def monitor_engine(name: str, engine: Engine) -> None:
+  """
+  Start monitoring the connection pool of an engine.
+
+  Args:
+      name: Name of the pool in the stats
+      engine: Sync engine, or the sync_engine of an async engine
+  """
+  with _monitors_lock:
+    if name not in _monitors or _monitors[name].engine is not engine:
+      _monitors[name] = PoolMonitor(engine)
+
+def get_pool_stats() -> Dict[str, Dict]:
+  """Get the connection pool state per bind ('primary', 'replica', 'async_primary', ...)."""
+  with _monitors_lock:
+    monitors = dict(_monitors)
+  return {name: monitor.to_dict() for name, monitor in monitors.items()}
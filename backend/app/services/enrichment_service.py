@@ -1,25 +1,78 @@
-from typing import Dict, Optional, Tuple, List
+import asyncio
+import os
+import threading
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple, List
 
+from sqlalchemy import and_, tuple_
+
+from app import db
 from app.models.company import Company
-from app.services.ai_service import AIService
+from app.services.ai_service import AIService, SUMMARY_MODEL, SUMMARY_PROMPT_VERSION, UNAVAILABLE_MESSAGE, get_ai_service
+from app.services.rate_limiter import PRIORITY_INTERACTIVE
+from app.services.scrape_cache import ScrapeCache
+from app.services.token_usage import track_usage
+from app.services.write_buffer import CompanyWriteBuffer, get_company_write_buffer
+from app.utils.single_flight import advisory_lock, single_flight
+from app.utils.url_utils import UrlUtils
+
+# Company fields included in the summary prompt
+SUMMARY_COMPANY_FIELDS = ('name', 'industry', 'locality', 'region', 'country', 'founded', 'size')
+
+# Websites scraped concurrently when enriching several companies
+ENRICHMENT_SCRAPE_CONCURRENCY = int(os.getenv('ENRICHMENT_SCRAPE_CONCURRENCY', '8'))
 
 class EnrichmentService:
   """Service for company enrichment operations."""
   
-  def __init__(self, ai_service=None):
+  def __init__(self, ai_service=None, write_buffer: CompanyWriteBuffer = None):
     """Initialize with an AI service or create a new one."""
-    self.ai_service = ai_service or AIService()
+    self.ai_service = ai_service or get_ai_service()
+    self.write_buffer = write_buffer or get_company_write_buffer()
   
-  async def enrich_company(self, company_id: int) -> Tuple[bool, Optional[Dict], str]:
+  async def enrich_company(self, company_id: int, incremental: bool = False) -> Tuple[bool, Optional[Dict], str]:
     """
     Enrich a company with AI-generated summary.
     
+    Concurrent requests for the same company share one enrichment, within the
+    process and across processes through a Postgres advisory lock.
+    
     Args:
         company_id: Company ID
+        incremental: Skip the LLM call if the website content and prompt version are unchanged
         
     Returns:
         Tuple of (success, company dict, error message)
     """
+    try:
+      company_id = int(company_id)
+    except (TypeError, ValueError):
+      return False, None, "Company not found"
+    
+    return await single_flight.do(
+      f"enrich:{company_id}",
+      lambda: self._enrich_company_locked(company_id, lambda: self._enrich_company(company_id, incremental))
+    )
+  
+  async def _enrich_company_locked(
+    self,
+    company_id: int,
+    enrich: Callable[[], Awaitable[Tuple[bool, Optional[Dict], str]]]
+  ) -> Tuple[bool, Optional[Dict], str]:
+    """Run an enrichment unless another process finished it while we waited for the lock."""
+    requested_at = datetime.utcnow()
+    
+    async with advisory_lock(f"enrich:{company_id}") as waited:
+      if waited:
+        db.session.expire_all()
+        company = Company.query.get(company_id)
+        if company and company.enriched_at and company.enriched_at >= requested_at:
+          return True, company.to_dict(), ""
+      
+      return await enrich()
+  
+  async def _enrich_company(self, company_id: int, incremental: bool = False) -> Tuple[bool, Optional[Dict], str]:
+    """Scrape and summarize one company."""
     # Get company
     company = Company.query.get(company_id)
     if not company:
@@ -36,33 +89,348 @@ class EnrichmentService:
       # Handle scraping errors
       if scrape_error:
         # Save error in AI summary
-        company.update(ai_summary=f"Company information unavailable, might not be active.")
-        return True, company.to_dict(), ""
-      
-      # Generate AI summary if content was successfully scraped
-      if website_content:
-        company_data = company.to_dict()
-        ai_summary = await self.ai_service.generate_company_summary(company_data, website_content)
+        updates = {
+          'ai_summary': "Company information unavailable, might not be active.",
+          **self._enrichment_metadata(company, "")
+        }
+      elif website_content:
+        # Generate AI summary if content was successfully scraped
+        metadata = self._enrichment_metadata(company, website_content)
         
-        # Update company with AI summary
-        company.update(ai_summary=ai_summary)
+        # Reuse the stored summary if nothing it was generated from has changed
+        if incremental and self._is_unchanged(company, metadata):
+          updates = {'enriched_at': metadata['enriched_at']}
+        else:
+          company_data = company.to_dict()
+          with track_usage() as usage:
+            ai_summary = await self.ai_service.generate_company_summary(
+              company_data,
+              website_content,
+              priority=PRIORITY_INTERACTIVE
+            )
+          self._log_usage(f"company {company.id}", usage.to_dict())
+          updates = {'ai_summary': ai_summary, **metadata}
       else:
         # Save generic error if no content
-        company.update(ai_summary="Company information unavailable, might not be active")
+        updates = {
+          'ai_summary': "Company information unavailable, might not be active",
+          **self._enrichment_metadata(company, "")
+        }
       
-      return True, company.to_dict(), ""
+      await self.write_buffer.write({company.id: updates})
+      return True, self._company_dict(company, updates), ""
     except Exception as e:
-      # Log error and update company with error message
-      error_msg = str(e)
-      company.update(ai_summary=f"Company information unavailable, might not be active.")
-      return False, company.to_dict(), error_msg
+      return await self._enrichment_failed(company, str(e))
+  
+  async def _enrichment_failed(self, company: Company, error_msg: str) -> Tuple[bool, Optional[Dict], str]:
+    """Store the fallback summary of a failed enrichment and build its outcome."""
+    updates = {'ai_summary': "Company information unavailable, might not be active."}
+    try:
+      await self.write_buffer.write({company.id: updates})
+    except Exception as write_error:
+      print(f"Error saving enrichment failure for company {company.id}: {write_error}")
+    return False, self._company_dict(company, updates), error_msg
+  
+  async def enrich_company_stream(self, company_id: int) -> AsyncIterator[Tuple[str, Dict]]:
+    """
+    Enrich a company, yielding progress and summary text as they happen.
+    
+    Events are (name, data) tuples:
+    - ("stage", {"stage": "fetching" | "extracted" | "summarizing", ...})
+    - ("token", {"text": ...}) for each summary delta
+    - ("result", {"company": ...}) once the summary is stored
+    - ("error", {"message": ...}) if enrichment failed
+    
+    The enrichment is shared with concurrent enrich_company calls and streams
+    for the same company, like enrich_company. Only the caller that runs it
+    receives stage and token events; the others wait for its result.
+    
+    Args:
+        company_id: Company ID
+        
+    Yields:
+        Tuples of (event name, event data)
+    """
+    try:
+      company_id = int(company_id)
+    except (TypeError, ValueError):
+      yield "error", {"message": "Company not found"}
+      return
+    
+    # Progress of the enrichment if this caller runs it, then None once it finished
+    events = asyncio.Queue()
+    call = asyncio.ensure_future(single_flight.do(
+      f"enrich:{company_id}",
+      lambda: self._enrich_company_locked(company_id, lambda: self._stream_company(company_id, events.put_nowait))
+    ))
+    call.add_done_callback(lambda _: events.put_nowait(None))
+    
+    try:
+      while True:
+        event = await events.get()
+        if event is None:
+          break
+        yield event
       
-  async def batch_enrich_companies(self, company_ids: List[int]) -> Tuple[bool, List[Dict], str]:
+      success, company, error = call.result()
+    except Exception as e:
+      yield "error", {"message": str(e)}
+      return
+    finally:
+      if not call.done():
+        call.cancel()
+        await asyncio.gather(call, return_exceptions=True)
+    
+    if success:
+      yield "result", {"company": company}
+    else:
+      yield "error", {"message": error or "Failed to enrich company"}
+  
+  async def _stream_company(
+    self,
+    company_id: int,
+    emit: Callable[[Tuple[str, Dict]], None]
+  ) -> Tuple[bool, Optional[Dict], str]:
+    """
+    Scrape and summarize one company, passing stage and token events to emit.
+    
+    The result is stored through the write buffer like enrich_company.
+    
+    Returns:
+        Tuple of (success, company dict, error message)
+    """
+    company = Company.query.get(company_id)
+    if not company:
+      return False, None, "Company not found"
+    
+    try:
+      website_content = ""
+      scrape_error = None
+      
+      if company.website:
+        emit(("stage", {"stage": "fetching", "url": company.website}))
+        website_content, scrape_error = await self.ai_service.scrape_website(company.website)
+        emit(("stage", {"stage": "extracted", "chars": len(website_content or "")}))
+      
+      if scrape_error or not website_content:
+        updates = {
+          'ai_summary': "Company information unavailable, might not be active.",
+          **self._enrichment_metadata(company, "")
+        }
+      else:
+        metadata = self._enrichment_metadata(company, website_content)
+        emit(("stage", {"stage": "summarizing"}))
+        
+        parts = []
+        with track_usage() as usage:
+          async for delta in self.ai_service.stream_company_summary(
+            company.to_dict(),
+            website_content,
+            priority=PRIORITY_INTERACTIVE
+          ):
+            parts.append(delta)
+            emit(("token", {"text": delta}))
+        self._log_usage(f"company {company.id}", usage.to_dict())
+        
+        summary = ''.join(parts).strip()
+        if not self.ai_service._validate_generated_summary(summary):
+          summary = UNAVAILABLE_MESSAGE
+        updates = {'ai_summary': summary, **metadata}
+      
+      await self.write_buffer.write({company.id: updates})
+      return True, self._company_dict(company, updates), ""
+    except Exception as e:
+      return await self._enrichment_failed(company, str(e))
+  
+  @staticmethod
+  def _log_usage(subject: str, usage: Dict) -> None:
+    """Log the tokens, latency and cost of the summaries generated for an enrichment."""
+    print(
+      f"Summarized {subject}: {usage['tokens_in']} tokens in, {usage['tokens_out']} tokens out, "
+      f"{usage['latency_seconds']:.2f}s, ${usage['cost_usd']:.4f}"
+    )
+  
+  @staticmethod
+  def _company_dict(company: Company, updates: Dict) -> Dict:
+    """Serialize a company as it is after the buffered updates are written."""
+    data = company.to_dict()
+    for name, value in updates.items():
+      if name in data:
+        data[name] = value.isoformat() if isinstance(value, datetime) else value
+    return data
+  
+  @staticmethod
+  def _enrichment_metadata(company: Company, website_content: str) -> Dict:
+    """
+    Build the enrichment metadata stored alongside a summary.
+    
+    Args:
+        company: Company being enriched
+        website_content: Extracted website text, empty if scraping failed
+        
+    Returns:
+        Dictionary of Company enrichment columns
+    """
+    return {
+      'enriched_at': datetime.utcnow(),
+      'enrichment_source_url': UrlUtils.normalize_url(company.website) if company.website else None,
+      'enrichment_content_hash': ScrapeCache.content_hash(website_content) if website_content else None,
+      'enrichment_model': SUMMARY_MODEL,
+      'enrichment_prompt_version': SUMMARY_PROMPT_VERSION
+    }
+  
+  @staticmethod
+  def _is_unchanged(company: Company, metadata: Dict) -> bool:
+    """
+    Check if a company's summary was generated from the same content and prompt.
+    
+    Fallback summaries stored after a failed or rejected generation never
+    count as unchanged, so the next incremental run retries them.
+    """
+    return bool(
+      company.ai_summary
+      and company.ai_summary.rstrip('.') != UNAVAILABLE_MESSAGE
+      and company.enrichment_content_hash
+      and company.enrichment_content_hash == metadata['enrichment_content_hash']
+      and company.enrichment_prompt_version == metadata['enrichment_prompt_version']
+      and company.enrichment_model == metadata['enrichment_model']
+    )
+      
+  @staticmethod
+  def _summary_key(company_data: Dict, content_hash: Optional[str]) -> Tuple:
+    """Identify the inputs of a summary prompt, companies with equal keys get the same summary."""
+    return (content_hash,) + tuple(company_data.get(field) for field in SUMMARY_COMPANY_FIELDS)
+      
+  async def enrich_companies(
+    self,
+    company_ids: List[int],
+    incremental: bool = False,
+    stats: Dict = None
+  ) -> Dict[int, Tuple[bool, Optional[Dict], str]]:
+    """
+    Enrich several companies, sharing LLM completions through batched summarization.
+    
+    Args:
+        company_ids: List of company IDs
+        incremental: Skip the LLM call for companies whose content and prompt version are unchanged
+        stats: Optional dictionary incremented with counters such as summaries_skipped,
+               fetches_saved (scrapes avoided by sharing a domain's content) and the
+               tokens_in, tokens_out, latency_seconds and cost_usd of summary calls
+        
+    Returns:
+        Dictionary of company ID to (success, company dict, error message)
+    """
+    company_ids = [int(company_id) for company_id in company_ids]
+    companies = Company.query.filter(Company.id.in_(company_ids)).all()
+    found = {company.id for company in companies}
+    outcomes = {
+      company_id: (False, None, "Company not found")
+      for company_id in company_ids if company_id not in found
+    }
+    
+    # Scrape each domain once, subsidiaries and duplicate rows share a website
+    domains = {}
+    for company in companies:
+      if company.website:
+        domain = UrlUtils.extract_domain(company.website) or company.website
+        domains.setdefault(domain, company.website)
+    
+    semaphore = asyncio.Semaphore(ENRICHMENT_SCRAPE_CONCURRENCY)
+    
+    async def scrape(website):
+      async with semaphore:
+        return await self.ai_service.scrape_website(website)
+    
+    results = await asyncio.gather(*(scrape(website) for website in domains.values()), return_exceptions=True)
+    scraped_domains = dict(zip(domains.keys(), results))
+    
+    stats = stats if stats is not None else {}
+    fetches = sum(1 for company in companies if company.website)
+    stats['fetches_saved'] = stats.get('fetches_saved', 0) + fetches - len(domains)
+    
+    entries = []
+    summaries = {}
+    metadata = {}
+    failures = {}
+    # Companies with the same metadata and content share one summary
+    summary_keys = {}
+    shared = {}
+    for company in companies:
+      if company.website:
+        result = scraped_domains[UrlUtils.extract_domain(company.website) or company.website]
+      else:
+        result = ("", None)
+      
+      if isinstance(result, Exception):
+        failures[company.id] = str(result)
+        summaries[company.id] = "Company information unavailable, might not be active."
+        continue
+      
+      website_content, scrape_error = result
+      if scrape_error:
+        summaries[company.id] = "Company information unavailable, might not be active."
+        metadata[company.id] = self._enrichment_metadata(company, "")
+        continue
+      
+      metadata[company.id] = self._enrichment_metadata(company, website_content)
+      if incremental and self._is_unchanged(company, metadata[company.id]):
+        summaries[company.id] = company.ai_summary
+        stats['summaries_skipped'] = stats.get('summaries_skipped', 0) + 1
+      else:
+        company_data = company.to_dict()
+        key = self._summary_key(company_data, metadata[company.id]['enrichment_content_hash'])
+        if key in summary_keys:
+          shared[company.id] = summary_keys[key]
+          continue
+        summary_keys[key] = company.id
+        entries.append((company.id, company_data, website_content))
+    
+    try:
+      with track_usage() as usage:
+        summaries.update(await self.ai_service.generate_company_summaries(entries))
+      usage = usage.to_dict()
+      if entries:
+        self._log_usage(f"{len(entries)} companies", usage)
+      for name in ('tokens_in', 'tokens_out', 'latency_seconds', 'cost_usd'):
+        stats[name] = stats.get(name, 0) + usage[name]
+    except Exception as e:
+      for company_id, _, _ in entries:
+        failures[company_id] = str(e)
+        summaries[company_id] = "Company information unavailable, might not be active."
+    
+    for company_id, source_id in shared.items():
+      summaries[company_id] = summaries[source_id]
+      if source_id in failures:
+        failures[company_id] = failures[source_id]
+    
+    # Results are committed together, in bulk with those of concurrent batches
+    updates = {
+      company.id: {'ai_summary': summaries[company.id], **metadata.get(company.id, {})}
+      for company in companies
+    }
+    try:
+      await self.write_buffer.write(updates)
+    except Exception as e:
+      for company in companies:
+        outcomes[company.id] = (False, None, str(e))
+      return outcomes
+    
+    for company in companies:
+      company_data = self._company_dict(company, updates[company.id])
+      if company.id in failures:
+        outcomes[company.id] = (False, company_data, failures[company.id])
+      else:
+        outcomes[company.id] = (True, company_data, "")
+    
+    return outcomes
+      
+  async def batch_enrich_companies(self, company_ids: List[int], stats: Dict = None) -> Tuple[bool, List[Dict], str]:
     """
     Enrich multiple companies with AI-generated summaries.
     
     Args:
         company_ids: List of company IDs
+        stats: Optional dictionary filled with counters such as fetches_saved
         
     Returns:
         Tuple of (success, list of enriched companies, error message)
@@ -73,11 +441,93 @@ class EnrichmentService:
     results = []
     errors = []
     
+    try:
+      company_ids = [int(company_id) for company_id in company_ids]
+    except (TypeError, ValueError):
+      return False, [], "Invalid company IDs: must be numbers"
+    
+    outcomes = await self.enrich_companies(company_ids, stats=stats)
+    
     for company_id in company_ids:
-      success, company_data, error = await self.enrich_company(company_id)
+      success, company_data, error = outcomes[company_id]
       if success:
         results.append(company_data)
       else:
         errors.append(f"Error enriching company {company_id}: {error}")
     
-    return len(errors) == 0, results, ", ".join(errors) if errors else "" 
\ No newline at end of file
+    return len(errors) == 0, results, ", ".join(errors) if errors else ""
+  
+  @staticmethod
+  def get_stale_company_ids(
+    older_than: datetime,
+    limit: int = 100,
+    cursor: Optional[Tuple] = None
+  ) -> Tuple[List[int], Optional[Tuple]]:
+    """
+    Get companies with a website that were never enriched or enriched before a cutoff.
+    
+    Companies are walked in (enriched_at NULLS FIRST, id) order with a keyset
+    cursor so the scan is served by ix_companies_enrichment_staleness.
+    
+    Args:
+        older_than: Companies enriched before this time are stale
+        limit: Maximum number of IDs to return
+        cursor: Cursor returned by the previous call, None to start
+        
+    Returns:
+        Tuple of (company IDs, cursor for the next call or None when done)
+    """
+    query = db.session.query(Company.id, Company.enriched_at).filter(
+      Company.website.isnot(None),
+      Company.website != ''
+    )
+    
+    never_enriched_done = cursor is not None and cursor[0] is not None
+    
+    if not never_enriched_done:
+      # Phase 1: never enriched companies, ordered by id
+      after_id = cursor[1] if cursor else 0
+      rows = (
+        query.filter(Company.enriched_at.is_(None), Company.id > after_id)
+        .order_by(Company.id)
+        .limit(limit)
+        .all()
+      )
+      if rows:
+        return [row.id for row in rows], (None, rows[-1].id)
+      cursor = (datetime.min, 0)
+    
+    # Phase 2: companies enriched before the cutoff, oldest first
+    rows = (
+      query.filter(
+        and_(
+          Company.enriched_at < older_than,
+          tuple_(Company.enriched_at, Company.id) > tuple_(cursor[0], cursor[1])
+        )
+      )
+      .order_by(Company.enriched_at, Company.id)
+      .limit(limit)
+      .all()
+    )
+    if not rows:
+      return [], None
+    
+    return [row.id for row in rows], (rows[-1].enriched_at, rows[-1].id)
+
+_enrichment_service = None
+_enrichment_service_lock = threading.Lock()
+
+def get_enrichment_service() -> EnrichmentService:
+  """
+  Get the process-wide enrichment service, created on first use.
+
+  Returns:
+      Shared EnrichmentService
+  """
+  global _enrichment_service
+
+  with _enrichment_service_lock:
+    if _enrichment_service is None:
+      _enrichment_service = EnrichmentService()
+
+  return _enrichment_service
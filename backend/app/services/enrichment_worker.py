@@ -0,0 +1,103 @@
+import asyncio
+import os
+import signal
+import socket
+import uuid
+
+from app.services.enrichment_service import EnrichmentService
+from app.services.job_service import DEFAULT_VISIBILITY_TIMEOUT, JobQueueService
+
+class EnrichmentWorker:
+  """Runs async workers that process queued enrichment job items."""
+
+  def __init__(
+    self,
+    app,
+    concurrency: int = 4,
+    batch_size: int = 5,
+    poll_interval: float = 2.0,
+    visibility_timeout: int = DEFAULT_VISIBILITY_TIMEOUT,
+    enrichment_service: EnrichmentService = None
+  ):
+    """
+    Initialize the worker pool.
+
+    Args:
+        app: Flask application, used for app contexts
+        concurrency: Number of concurrent async workers
+        batch_size: Items each worker claims at once and summarizes together
+        poll_interval: Seconds to wait when the queue is empty
+        visibility_timeout: Seconds before an unfinished claim expires
+        enrichment_service: EnrichmentService to use, created if not provided
+    """
+    self.app = app
+    self.concurrency = concurrency
+    self.batch_size = batch_size
+    self.poll_interval = poll_interval
+    self.visibility_timeout = visibility_timeout
+    self.enrichment_service = enrichment_service or EnrichmentService()
+    self.worker_prefix = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+    self._stopping = None
+
+  def run(self) -> None:
+    """Run the workers until SIGINT/SIGTERM, letting in-flight items finish."""
+    asyncio.run(self._run())
+
+  async def _run(self) -> None:
+    self._stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+      loop.add_signal_handler(sig, self._stopping.set)
+
+    print(f"Starting {self.concurrency} enrichment workers ({self.worker_prefix})")
+    await asyncio.gather(*(self._worker(f"{self.worker_prefix}:{index}") for index in range(self.concurrency)))
+    print("Enrichment workers stopped")
+
+  async def _worker(self, worker_id: str) -> None:
+    """Claim and process batches of items until asked to stop."""
+    while not self._stopping.is_set():
+      try:
+        with self.app.app_context():
+          items = JobQueueService.claim_items(
+            worker_id,
+            limit=self.batch_size,
+            visibility_timeout=self.visibility_timeout
+          )
+      except Exception as e:
+        print(f"[{worker_id}] Error claiming job items: {e}")
+        items = []
+
+      if not items:
+        try:
+          await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+        except asyncio.TimeoutError:
+          pass
+        continue
+
+      await self._process_items(worker_id, items)
+
+  async def _process_items(self, worker_id: str, items: list) -> None:
+    """Enrich a batch of claimed companies and record each outcome."""
+    with self.app.app_context():
+      try:
+        outcomes = await asyncio.wait_for(
+          self.enrichment_service.enrich_companies([item['company_id'] for item in items]),
+          timeout=self.visibility_timeout
+        )
+      except Exception as e:
+        error = str(e) or e.__class__.__name__
+        outcomes = {item['company_id']: (False, None, error) for item in items}
+
+      for item in items:
+        success, company, error = outcomes[item['company_id']]
+        try:
+          if success:
+            JobQueueService.complete_item(item['id'], worker_id, {
+              'ai_summary': company.get('ai_summary') if company else None
+            })
+          else:
+            print(f"[{worker_id}] Company {item['company_id']} failed (attempt {item['attempts']}): {error}")
+            JobQueueService.fail_item(item['id'], worker_id, error, item['attempts'], item['max_attempts'])
+        except Exception as e:
+          # The lease expires and another worker retries the item
+          print(f"[{worker_id}] Error recording result for item {item['id']}: {e}")
@@ -0,0 +1,113 @@
+import os
+import threading
+from collections import deque
+from typing import Dict, Optional
+
+# Hedge a call when it is slower than this percentile of recent calls
+HEDGE_PERCENTILE = float(os.getenv('OPENAI_HEDGE_PERCENTILE', '0.95'))
+
+# Bounds of the hedge delay in seconds; the maximum is used until enough
+# calls have been seen to estimate the percentile
+HEDGE_MIN_DELAY = float(os.getenv('OPENAI_HEDGE_MIN_DELAY', '2'))
+HEDGE_MAX_DELAY = float(os.getenv('OPENAI_HEDGE_MAX_DELAY', '10'))
+HEDGE_MIN_SAMPLES = 20
+
+# Share of recent calls that may be hedged, limiting the extra load on the API
+HEDGE_MAX_RATE = float(os.getenv('OPENAI_HEDGE_MAX_RATE', '0.1'))
+
+# Recent calls kept per call type
+CALL_HISTORY_SIZE = 500
+
+class CallTracker:
+  """
+  Latency distribution and hedging counters of one type of LLM call,
+  e.g. SQL generation or search filter extraction.
+  """
+
+  def __init__(self, call_type: str):
+    self.call_type = call_type
+    self._lock = threading.Lock()
+    self._latencies = deque(maxlen=CALL_HISTORY_SIZE)
+    self._hedged = deque(maxlen=CALL_HISTORY_SIZE)
+    self._stats = {'calls': 0, 'failures': 0, 'hedged': 0, 'hedge_wins': 0, 'deadline_exceeded': 0}
+
+  def hedge_delay(self) -> Optional[float]:
+    """
+    Get how long to wait for the first request before sending a hedge.
+
+    Returns:
+        Delay in seconds, None if the hedge budget is used up
+    """
+    with self._lock:
+      if self._hedged and sum(self._hedged) / len(self._hedged) >= HEDGE_MAX_RATE:
+        return None
+      if len(self._latencies) < HEDGE_MIN_SAMPLES:
+        return HEDGE_MAX_DELAY
+      latencies = sorted(self._latencies)
+
+    delay = latencies[min(len(latencies) - 1, int(len(latencies) * HEDGE_PERCENTILE))]
+    return min(HEDGE_MAX_DELAY, max(HEDGE_MIN_DELAY, delay))
+
+  def record(
+    self,
+    latency: float,
+    hedged: bool = False,
+    hedge_won: bool = False,
+    failed: bool = False,
+    deadline_exceeded: bool = False
+  ) -> None:
+    """
+    Record one finished call.
+
+    Args:
+        latency: Seconds from the first request to the answer used
+        hedged: Whether a hedge request was sent
+        hedge_won: Whether the hedge request gave the answer
+        failed: Whether no request gave a valid answer
+        deadline_exceeded: Whether the call ran out of time
+    """
+    with self._lock:
+      self._stats['calls'] += 1
+      self._hedged.append(hedged)
+      if hedged:
+        self._stats['hedged'] += 1
+      if hedge_won:
+        self._stats['hedge_wins'] += 1
+      if deadline_exceeded:
+        self._stats['deadline_exceeded'] += 1
+      if failed:
+        self._stats['failures'] += 1
+      else:
+        self._latencies.append(latency)
+
+  def snapshot(self) -> Dict:
+    """Get counters, hedge rate and latency percentiles for the metrics endpoint."""
+    with self._lock:
+      latencies = sorted(self._latencies)
+      recent_hedged = list(self._hedged)
+      stats = dict(self._stats)
+
+    stats['hedge_rate'] = round(sum(recent_hedged) / len(recent_hedged), 4) if recent_hedged else 0.0
+    if latencies:
+      stats['latency_ms'] = {
+        name: round(latencies[min(len(latencies) - 1, int(len(latencies) * quantile))] * 1000, 1)
+        for name, quantile in (('p50', 0.5), ('p90', 0.9), ('p95', 0.95), ('p99', 0.99))
+      }
+      stats['latency_ms']['max'] = round(latencies[-1] * 1000, 1)
+    return stats
+
+_trackers: Dict[str, CallTracker] = {}
+_trackers_lock = threading.Lock()
+
+def get_call_tracker(call_type: str) -> CallTracker:
+  """Get the process-wide tracker of a call type."""
+  with _trackers_lock:
+    if call_type not in _trackers:
+      _trackers[call_type] = CallTracker(call_type)
+    return _trackers[call_type]
+
+def get_call_stats() -> Dict[str, Dict]:
+  """Get the state of every call tracker created so far."""
+  with _trackers_lock:
+    trackers = list(_trackers.values())
+  return {tracker.call_type: tracker.snapshot() for tracker in trackers}
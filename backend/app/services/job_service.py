@@ -0,0 +1,249 @@
+import random
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, text
+
+from app import db
+from app.models.company import Company
+from app.models.job import EnrichmentJob, EnrichmentJobItem
+
+# Seconds a claimed item stays invisible to other workers
+DEFAULT_VISIBILITY_TIMEOUT = 300
+
+# Retry backoff in seconds: base * 2^(attempt - 1), capped, with jitter
+RETRY_BACKOFF_BASE = 10
+RETRY_BACKOFF_MAX = 600
+
+CLAIM_ITEMS_SQL = text("""
+  UPDATE enrichment_job_items AS item
+  SET status = 'running',
+      attempts = item.attempts + 1,
+      locked_by = :worker_id,
+      locked_until = timezone('utc', now()) + make_interval(secs => :visibility_timeout),
+      updated_at = timezone('utc', now())
+  WHERE item.id IN (
+    SELECT id FROM enrichment_job_items
+    WHERE (status = 'pending' AND available_at <= timezone('utc', now()))
+       OR (status = 'running' AND locked_until < timezone('utc', now()) AND attempts < max_attempts)
+    ORDER BY available_at, id
+    LIMIT :limit
+    FOR UPDATE SKIP LOCKED
+  )
+  RETURNING item.id, item.job_id, item.company_id, item.attempts, item.max_attempts
+""")
+
+# Items whose worker died on their final attempt
+REAP_EXPIRED_SQL = text("""
+  UPDATE enrichment_job_items
+  SET status = 'failed',
+      error = COALESCE(error, 'Worker lease expired'),
+      finished_at = timezone('utc', now()),
+      updated_at = timezone('utc', now())
+  WHERE status = 'running' AND locked_until < timezone('utc', now()) AND attempts >= max_attempts
+""")
+
+class JobQueueService:
+  """Service for the Postgres-backed enrichment job queue."""
+
+  @staticmethod
+  def submit_enrichment_job(company_ids: List[int], max_attempts: int = 3) -> Tuple[bool, Optional[Dict], str]:
+    """
+    Queue an enrichment job for a list of companies.
+
+    Args:
+        company_ids: Company IDs to enrich
+        max_attempts: Attempts per company before it is marked failed
+
+    Returns:
+        Tuple of (success, job dict, error message)
+    """
+    if not company_ids:
+      return False, None, "No company IDs provided"
+
+    # Drop duplicates while keeping the submitted order
+    company_ids = list(dict.fromkeys(int(company_id) for company_id in company_ids))
+
+    existing = {
+      company_id for (company_id,) in
+      db.session.query(Company.id).filter(Company.id.in_(company_ids)).all()
+    }
+    missing = [company_id for company_id in company_ids if company_id not in existing]
+    if missing:
+      return False, None, f"Companies not found: {', '.join(str(company_id) for company_id in missing)}"
+
+    try:
+      job = EnrichmentJob(total=len(company_ids), max_attempts=max_attempts)
+      db.session.add(job)
+      db.session.flush()
+
+      now = datetime.utcnow()
+      db.session.bulk_insert_mappings(EnrichmentJobItem, [
+        {
+          'job_id': job.id,
+          'company_id': company_id,
+          'status': EnrichmentJobItem.STATUS_PENDING,
+          'attempts': 0,
+          'max_attempts': max_attempts,
+          'available_at': now,
+          'created_at': now,
+          'updated_at': now
+        }
+        for company_id in company_ids
+      ])
+      db.session.commit()
+      return True, job.to_dict(), ""
+    except Exception as e:
+      db.session.rollback()
+      return False, None, str(e)
+
+  @staticmethod
+  def get_job_status(job_id: int, page: int = 1, per_page: int = 100) -> Optional[Dict]:
+    """
+    Get progress and per-company results for a job.
+
+    Args:
+        job_id: Job ID
+        page: Page of job items
+        per_page: Job items per page
+
+    Returns:
+        Job dictionary with progress counts and items, or None if not found
+    """
+    job = EnrichmentJob.query.get(job_id)
+    if not job:
+      return None
+
+    counts = dict(
+      db.session.query(EnrichmentJobItem.status, func.count(EnrichmentJobItem.id))
+      .filter(EnrichmentJobItem.job_id == job_id)
+      .group_by(EnrichmentJobItem.status)
+      .all()
+    )
+    progress = {
+      status: counts.get(status, 0)
+      for status in (
+        EnrichmentJobItem.STATUS_PENDING,
+        EnrichmentJobItem.STATUS_RUNNING,
+        EnrichmentJobItem.STATUS_SUCCEEDED,
+        EnrichmentJobItem.STATUS_FAILED
+      )
+    }
+    finished = progress[EnrichmentJobItem.STATUS_SUCCEEDED] + progress[EnrichmentJobItem.STATUS_FAILED]
+
+    if finished == job.total:
+      status = 'completed' if not progress[EnrichmentJobItem.STATUS_FAILED] else 'completed_with_errors'
+    elif finished or progress[EnrichmentJobItem.STATUS_RUNNING]:
+      status = 'running'
+    else:
+      status = 'queued'
+
+    items = (
+      job.items.order_by(EnrichmentJobItem.id)
+      .paginate(page=page, per_page=per_page, error_out=False)
+    )
+
+    return {
+      **job.to_dict(),
+      'status': status,
+      'progress': {**progress, 'finished': finished},
+      'items': [item.to_dict() for item in items.items],
+      'items_total': items.total,
+      'items_pages': items.pages,
+      'current_page': page
+    }
+
+  @staticmethod
+  def claim_items(worker_id: str, limit: int = 1, visibility_timeout: int = DEFAULT_VISIBILITY_TIMEOUT) -> List[Dict]:
+    """
+    Claim queued items for a worker with SELECT ... FOR UPDATE SKIP LOCKED.
+
+    Items whose lease expired (the worker crashed) are claimed again.
+
+    Args:
+        worker_id: Identifier of the claiming worker
+        limit: Maximum number of items to claim
+        visibility_timeout: Seconds before an unfinished claim expires
+
+    Returns:
+        List of claimed item dictionaries (id, job_id, company_id, attempts, max_attempts)
+    """
+    try:
+      db.session.execute(REAP_EXPIRED_SQL)
+      rows = db.session.execute(CLAIM_ITEMS_SQL, {
+        'worker_id': worker_id,
+        'limit': limit,
+        'visibility_timeout': visibility_timeout
+      }).mappings().all()
+      db.session.commit()
+      return [dict(row) for row in rows]
+    except Exception:
+      db.session.rollback()
+      raise
+
+  @staticmethod
+  def complete_item(item_id: int, worker_id: str, result: Dict = None) -> bool:
+    """
+    Mark a claimed item as succeeded.
+
+    Args:
+        item_id: Job item ID
+        worker_id: Worker that holds the claim
+        result: Per-company result to store
+
+    Returns:
+        True if the claim was still held, False if it expired meanwhile
+    """
+    return JobQueueService._finish_item(item_id, worker_id, {
+      'status': EnrichmentJobItem.STATUS_SUCCEEDED,
+      'result': result,
+      'error': None,
+      'finished_at': datetime.utcnow()
+    })
+
+  @staticmethod
+  def fail_item(item_id: int, worker_id: str, error: str, attempts: int, max_attempts: int) -> bool:
+    """
+    Record a failed attempt, scheduling a retry with backoff if attempts remain.
+
+    Args:
+        item_id: Job item ID
+        worker_id: Worker that holds the claim
+        error: Error message
+        attempts: Attempts made so far, including this one
+        max_attempts: Maximum attempts for the item
+
+    Returns:
+        True if the claim was still held, False if it expired meanwhile
+    """
+    if attempts >= max_attempts:
+      values = {
+        'status': EnrichmentJobItem.STATUS_FAILED,
+        'error': error,
+        'finished_at': datetime.utcnow()
+      }
+    else:
+      delay = min(RETRY_BACKOFF_MAX, RETRY_BACKOFF_BASE * 2 ** (attempts - 1))
+      values = {
+        'status': EnrichmentJobItem.STATUS_PENDING,
+        'error': error,
+        'available_at': datetime.utcnow() + timedelta(seconds=delay * random.uniform(0.8, 1.2))
+      }
+
+    return JobQueueService._finish_item(item_id, worker_id, values)
+
+  @staticmethod
+  def _finish_item(item_id: int, worker_id: str, values: Dict) -> bool:
+    """Update a claimed item if this worker still holds it."""
+    try:
+      updated = (
+        EnrichmentJobItem.query
+        .filter_by(id=item_id, locked_by=worker_id, status=EnrichmentJobItem.STATUS_RUNNING)
+        .update({**values, 'locked_by': None, 'locked_until': None, 'updated_at': datetime.utcnow()},
+                synchronize_session=False)
+      )
+      db.session.commit()
+      return updated == 1
+    except Exception:
+      db.session.rollback()
+      raise
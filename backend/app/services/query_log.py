@@ -0,0 +1,276 @@
+import hashlib
+import os
+import queue
+import random
+import re
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from flask import current_app
+from sqlalchemy import func, insert, text
+
+from app import db
+from app.models.query_log import SqlQueryLog
+from app.utils.db_routing import REPLICA_BIND_KEY, read_replica
+
+# Log every execution of AI-generated SQL to the sql_query_log table
+SQL_QUERY_LOG_ENABLED = os.getenv('SQL_QUERY_LOG_ENABLED', 'true').lower() == 'true'
+
+# Executions whose count or page query took longer than this are slow
+SQL_SLOW_QUERY_MS = float(os.getenv('SQL_SLOW_QUERY_MS', '500'))
+
+# Share of slow executions whose plan is captured
+SQL_PLAN_SAMPLE_RATE = float(os.getenv('SQL_PLAN_SAMPLE_RATE', '0.2'))
+
+# Capture plans with EXPLAIN (ANALYZE, BUFFERS), which runs the generated SQL again. Only
+# done on the read replica; without one, or when off, plans are the planner's estimates
+SQL_PLAN_ANALYZE = os.getenv('SQL_PLAN_ANALYZE', 'false').lower() == 'true'
+SQL_PLAN_TIMEOUT_MS = int(os.getenv('SQL_PLAN_TIMEOUT_MS', '10000'))
+
+# Entries waiting to be written; more are dropped rather than slowing searches down
+SQL_QUERY_LOG_QUEUE_SIZE = int(os.getenv('SQL_QUERY_LOG_QUEUE_SIZE', '10000'))
+SQL_QUERY_LOG_BATCH_SIZE = 200
+
+STRING_LITERAL_PATTERN = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL_PATTERN = re.compile(r'\b\d+(?:\.\d+)?\b')
+IN_LIST_PATTERN = re.compile(r'\bin\s*\(\s*\?(?:\s*,\s*\?)*\s*\)')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+def normalize_sql(sql: str) -> str:
+  """
+  Normalize SQL for fingerprinting: literals become ?, IN lists collapse and case and whitespace are ignored.
+
+  Args:
+      sql: SQL query
+
+  Returns:
+      Normalized SQL
+  """
+  normalized = STRING_LITERAL_PATTERN.sub('?', sql)
+  normalized = NUMBER_LITERAL_PATTERN.sub('?', normalized)
+  normalized = WHITESPACE_PATTERN.sub(' ', normalized).strip().lower()
+  return IN_LIST_PATTERN.sub('in (?)', normalized)
+
+def fingerprint_sql(sql: str) -> str:
+  """
+  Get the fingerprint of a SQL query, shared by queries that differ only in literal values.
+
+  Args:
+      sql: SQL query
+
+  Returns:
+      16 hex character fingerprint
+  """
+  return hashlib.sha1(normalize_sql(sql).encode('utf-8')).hexdigest()[:16]
+
+class SqlQueryLogger:
+  """
+  Background writer of the AI-generated SQL query log.
+
+  Searches only enqueue entries; a thread captures plans for a sample of slow
+  executions and inserts the entries in batches, so neither adds latency to
+  the request.
+  """
+
+  def __init__(self, max_queue_size: int = SQL_QUERY_LOG_QUEUE_SIZE):
+    self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+    self._lock = threading.Lock()
+    self._app = None
+    self._thread = None
+    self._stats = {'logged': 0, 'dropped': 0, 'plans_captured': 0, 'failed_writes': 0}
+
+  def record(
+    self,
+    sql: str,
+    natural_query: Optional[str] = None,
+    count_ms: Optional[float] = None,
+    page_ms: Optional[float] = None,
+    rows_returned: Optional[int] = None,
+    total_rows: Optional[int] = None,
+    error: Optional[str] = None,
+    page_sql: Optional[str] = None
+  ) -> None:
+    """
+    Log one execution of generated SQL without waiting for the write.
+
+    Args:
+        sql: Executed SQL, without pagination
+        natural_query: Search text the SQL was generated from
+        count_ms: Duration of the COUNT query in milliseconds
+        page_ms: Duration of the page query in milliseconds
+        rows_returned: Rows on the returned page
+        total_rows: Rows matched by the query
+        error: Error message if the execution failed
+        page_sql: Paginated SQL, explained instead of the count when the page was slower
+    """
+    if not SQL_QUERY_LOG_ENABLED:
+      return
+
+    slowest_ms = max(count_ms or 0, page_ms or 0)
+    explain_sql = None
+    if not error and slowest_ms >= SQL_SLOW_QUERY_MS and random.random() < SQL_PLAN_SAMPLE_RATE:
+      if page_sql and (page_ms or 0) >= (count_ms or 0):
+        explain_sql = page_sql
+      else:
+        explain_sql = f"SELECT COUNT(*) FROM ({sql}) as count_query"
+
+    entry = {
+      'created_at': datetime.utcnow(),
+      'fingerprint': fingerprint_sql(sql),
+      'sql_text': sql,
+      'natural_query': natural_query,
+      'count_ms': count_ms,
+      'page_ms': page_ms,
+      'rows_returned': rows_returned,
+      'total_rows': total_rows,
+      'error': error,
+      'plan': None
+    }
+
+    with self._lock:
+      if self._app is None:
+        self._app = current_app._get_current_object()
+      if self._thread is None or not self._thread.is_alive():
+        self._thread = threading.Thread(target=self._run, name='sql-query-log', daemon=True)
+        self._thread.start()
+
+    try:
+      self._queue.put_nowait((entry, explain_sql))
+    except queue.Full:
+      with self._lock:
+        self._stats['dropped'] += 1
+
+  def _run(self) -> None:
+    """Write queued entries in batches."""
+    while True:
+      batch = [self._queue.get()]
+      while len(batch) < SQL_QUERY_LOG_BATCH_SIZE:
+        try:
+          batch.append(self._queue.get_nowait())
+        except queue.Empty:
+          break
+      self._write(batch)
+
+  def _write(self, batch: List) -> None:
+    """Capture sampled plans and insert one batch of entries."""
+    try:
+      with self._app.app_context():
+        rows = []
+        for entry, explain_sql in batch:
+          if explain_sql:
+            entry['plan'] = self._explain(explain_sql)
+          rows.append(entry)
+
+        try:
+          db.session.execute(insert(SqlQueryLog.__table__), rows)
+          db.session.commit()
+        except Exception:
+          db.session.rollback()
+          raise
+    except Exception as e:
+      print(f"Error writing {len(batch)} SQL query log entries: {e}")
+      with self._lock:
+        self._stats['failed_writes'] += 1
+      return
+
+    with self._lock:
+      self._stats['logged'] += len(rows)
+      self._stats['plans_captured'] += sum(1 for row in rows if row['plan'])
+
+  def _explain(self, sql: str) -> Optional[str]:
+    """
+    Explain a statement on the database the search used.
+
+    AI-generated SQL is only executed again, under EXPLAIN (ANALYZE, BUFFERS),
+    when SQL_PLAN_ANALYZE is set and a read replica is configured; the
+    primary only gets a plain EXPLAIN.
+
+    Args:
+        sql: Statement to explain
+
+    Returns:
+        Plan text, None if it could not be captured
+    """
+    if db.engine.dialect.name != 'postgresql':
+      return None
+
+    analyze = SQL_PLAN_ANALYZE and REPLICA_BIND_KEY in db.engines
+    try:
+      with read_replica():
+        # Bound the re-execution, SET LOCAL only lasts until the rollback below
+        db.session.execute(text(f"SET LOCAL statement_timeout = {int(SQL_PLAN_TIMEOUT_MS)}"))
+        explain = 'EXPLAIN (ANALYZE, BUFFERS)' if analyze else 'EXPLAIN'
+        rows = db.session.execute(text(f"{explain} {sql}")).scalars().all()
+      return '\n'.join(rows)
+    except Exception as e:
+      print(f"Error capturing query plan: {e}")
+      return None
+    finally:
+      db.session.rollback()
+
+  def stats(self) -> Dict:
+    """Get logging counters and the queue length."""
+    with self._lock:
+      return dict(self._stats, queued=self._queue.qsize())
+
+def get_worst_fingerprints(since: datetime, limit: int = 20, order_by: str = 'total') -> List[Dict]:
+  """
+  Rank the fingerprints of logged queries by their cost.
+
+  Args:
+      since: Only consider executions after this time
+      limit: Number of fingerprints to return
+      order_by: 'total' (summed time), 'p95', 'max', 'calls' or 'errors'
+
+  Returns:
+      List of fingerprint summaries, worst first
+  """
+  elapsed = func.coalesce(SqlQueryLog.count_ms, 0) + func.coalesce(SqlQueryLog.page_ms, 0)
+  columns = {
+    'calls': func.count(SqlQueryLog.id),
+    'errors': func.count(SqlQueryLog.error),
+    'total': func.sum(elapsed),
+    'mean': func.avg(elapsed),
+    'p95': func.percentile_cont(0.95).within_group(elapsed),
+    'max': func.max(elapsed),
+    'mean_count_ms': func.avg(SqlQueryLog.count_ms),
+    'mean_page_ms': func.avg(SqlQueryLog.page_ms),
+    'mean_total_rows': func.avg(SqlQueryLog.total_rows),
+    'plans': func.count(SqlQueryLog.plan),
+    'sample_sql': func.max(SqlQueryLog.sql_text),
+    'sample_query': func.max(SqlQueryLog.natural_query),
+  }
+  if order_by not in ('total', 'p95', 'max', 'calls', 'errors'):
+    raise ValueError(f"Unknown order: {order_by}")
+
+  rows = (
+    db.session.query(SqlQueryLog.fingerprint, *(column.label(name) for name, column in columns.items()))
+    .filter(SqlQueryLog.created_at >= since)
+    .group_by(SqlQueryLog.fingerprint)
+    .order_by(columns[order_by].desc().nullslast())
+    .limit(limit)
+    .all()
+  )
+  return [dict(row._mapping) for row in rows]
+
+def get_latest_plan(fingerprint: str) -> Optional[SqlQueryLog]:
+  """Get the most recent logged execution of a fingerprint with a captured plan."""
+  return (
+    SqlQueryLog.query
+    .filter(SqlQueryLog.fingerprint == fingerprint, SqlQueryLog.plan.isnot(None))
+    .order_by(SqlQueryLog.created_at.desc())
+    .first()
+  )
+
+_query_logger: Optional[SqlQueryLogger] = None
+_query_logger_lock = threading.Lock()
+
+def get_sql_query_logger() -> SqlQueryLogger:
+  """Get the process-wide SQL query logger."""
+  global _query_logger
+
+  with _query_logger_lock:
+    if _query_logger is None:
+      _query_logger = SqlQueryLogger()
+    return _query_logger
@@ -0,0 +1,241 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+# Request priorities, lower values are served first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 1
+
+# Default per-model limits of the whole deployment, overridable with OPENAI_RATE_LIMITS, e.g.
+# {"gpt-4": {"rpm": 500, "tpm": 10000, "max_concurrency": 8}}
+DEFAULT_MODEL_LIMITS = {
+  'gpt-4': {'rpm': 500, 'tpm': 10000, 'max_concurrency': 8},
+  'gpt-3.5-turbo': {'rpm': 3500, 'tpm': 60000, 'max_concurrency': 32},
+}
+FALLBACK_MODEL_LIMITS = {'rpm': 500, 'tpm': 10000, 'max_concurrency': 8}
+
+# Processes the limits are split between, each enforcing its share: the gunicorn workers by
+# default (WEB_CONCURRENCY, set by gunicorn.conf.py). Count enrichment workers in too
+OPENAI_RATE_LIMIT_PROCESSES = max(1, int(os.getenv('OPENAI_RATE_LIMIT_PROCESSES', os.getenv('WEB_CONCURRENCY', '1'))))
+
+# Latency above which concurrency is reduced like on a 429
+LATENCY_TARGET_SECONDS = float(os.getenv('OPENAI_LATENCY_TARGET', '20'))
+
+# Minimum seconds between two multiplicative decreases
+DECREASE_COOLDOWN_SECONDS = 2.0
+
+# Polling interval while waiting for capacity
+WAIT_INTERVAL_SECONDS = 0.05
+
+def _load_model_limits() -> Dict[str, Dict]:
+  """Merge OPENAI_RATE_LIMITS overrides into the default limits."""
+  limits = {model: dict(values) for model, values in DEFAULT_MODEL_LIMITS.items()}
+  overrides = os.getenv('OPENAI_RATE_LIMITS')
+  if overrides:
+    try:
+      for model, values in json.loads(overrides).items():
+        limits.setdefault(model, dict(FALLBACK_MODEL_LIMITS)).update(values)
+    except (ValueError, AttributeError) as e:
+      print(f"Ignoring invalid OPENAI_RATE_LIMITS: {e}")
+  return limits
+
+class ModelRateLimiter:
+  """
+  Rate limiter for one model combining request and token buckets with
+  adaptive (AIMD) concurrency.
+
+  State is guarded by a thread lock and waiters poll, so a single limiter can
+  be shared by coroutines running on different event loops and threads.
+  """
+
+  def __init__(self, model: str, rpm: int, tpm: int, max_concurrency: int, min_concurrency: int = 1):
+    """Initialize the limiter with full buckets."""
+    self.model = model
+    self.rpm = rpm
+    self.tpm = tpm
+    self.max_concurrency = max_concurrency
+    self.min_concurrency = min_concurrency
+    self.concurrency_limit = float(max_concurrency)
+
+    self._lock = threading.Lock()
+    self._request_tokens = float(rpm)
+    self._token_tokens = float(tpm)
+    self._refilled_at = time.monotonic()
+    self._blocked_until = 0.0
+    self._last_decrease = 0.0
+    self._in_flight = 0
+    self._waiting = {PRIORITY_INTERACTIVE: 0, PRIORITY_BATCH: 0}
+    self._stats = {'requests': 0, 'rate_limited': 0, 'slow_responses': 0, 'tokens_used': 0}
+
+  def _refill(self, now: float) -> None:
+    """Refill both buckets for the time elapsed since the last refill."""
+    elapsed = now - self._refilled_at
+    self._request_tokens = min(self.rpm, self._request_tokens + elapsed * self.rpm / 60)
+    self._token_tokens = min(self.tpm, self._token_tokens + elapsed * self.tpm / 60)
+    self._refilled_at = now
+
+  def _try_acquire(self, tokens: int, priority: int) -> float:
+    """
+    Try to take capacity for one request. Must be called with the lock held.
+
+    Returns:
+        0 if acquired, otherwise seconds to wait before trying again
+    """
+    now = time.monotonic()
+    self._refill(now)
+
+    if now < self._blocked_until:
+      return self._blocked_until - now
+
+    # Batch work yields to waiting interactive calls
+    if priority > PRIORITY_INTERACTIVE and self._waiting[PRIORITY_INTERACTIVE]:
+      return WAIT_INTERVAL_SECONDS
+
+    if self._in_flight >= int(self.concurrency_limit):
+      return WAIT_INTERVAL_SECONDS
+
+    # Requests larger than the whole bucket only wait for a full bucket
+    tokens = min(tokens, self.tpm)
+    if self._request_tokens < 1:
+      return (1 - self._request_tokens) * 60 / self.rpm
+    if self._token_tokens < tokens:
+      return (tokens - self._token_tokens) * 60 / self.tpm
+
+    self._request_tokens -= 1
+    self._token_tokens -= tokens
+    self._in_flight += 1
+    self._stats['requests'] += 1
+    return 0
+
+  async def acquire(self, tokens: int, priority: int = PRIORITY_BATCH) -> None:
+    """
+    Wait until a request with the estimated token count may be sent.
+
+    Args:
+        tokens: Estimated prompt plus completion tokens
+        priority: PRIORITY_INTERACTIVE or PRIORITY_BATCH
+    """
+    with self._lock:
+      delay = self._try_acquire(tokens, priority)
+      if not delay:
+        return
+      self._waiting[priority] += 1
+
+    try:
+      while True:
+        await asyncio.sleep(min(max(delay, WAIT_INTERVAL_SECONDS), 1.0))
+        with self._lock:
+          self._waiting[priority] -= 1
+          delay = self._try_acquire(tokens, priority)
+          if not delay:
+            return
+          self._waiting[priority] += 1
+    except asyncio.CancelledError:
+      with self._lock:
+        self._waiting[priority] -= 1
+      raise
+
+  def release(
+    self,
+    reserved_tokens: int,
+    used_tokens: Optional[int] = None,
+    latency: Optional[float] = None,
+    rate_limited: bool = False,
+    retry_after: Optional[float] = None
+  ) -> None:
+    """
+    Return a request slot and adapt concurrency to the outcome.
+
+    Args:
+        reserved_tokens: Tokens reserved by acquire
+        used_tokens: Tokens actually used, to correct the reservation
+        latency: Request latency in seconds
+        rate_limited: Whether the API answered 429
+        retry_after: Seconds the API asked us to wait
+    """
+    with self._lock:
+      now = time.monotonic()
+      self._in_flight = max(0, self._in_flight - 1)
+
+      if used_tokens is not None:
+        self._token_tokens = min(self.tpm, self._token_tokens + min(reserved_tokens, self.tpm) - used_tokens)
+        self._stats['tokens_used'] += used_tokens
+
+      if retry_after:
+        self._blocked_until = max(self._blocked_until, now + retry_after)
+
+      slow = latency is not None and latency > LATENCY_TARGET_SECONDS
+      if rate_limited:
+        self._stats['rate_limited'] += 1
+      if slow:
+        self._stats['slow_responses'] += 1
+
+      if rate_limited or slow:
+        # Multiplicative decrease, at most once per cooldown window
+        if now - self._last_decrease >= DECREASE_COOLDOWN_SECONDS:
+          self.concurrency_limit = max(self.min_concurrency, self.concurrency_limit / 2)
+          self._last_decrease = now
+      else:
+        # Additive increase of about one slot per window of successful calls
+        self.concurrency_limit = min(
+          self.max_concurrency,
+          self.concurrency_limit + 1 / max(1.0, self.concurrency_limit)
+        )
+
+  def snapshot(self) -> Dict:
+    """Get the current limiter state for the metrics endpoint."""
+    with self._lock:
+      now = time.monotonic()
+      self._refill(now)
+      return {
+        'model': self.model,
+        'rpm': self.rpm,
+        'tpm': self.tpm,
+        'concurrency_limit': round(self.concurrency_limit, 2),
+        'max_concurrency': self.max_concurrency,
+        'in_flight': self._in_flight,
+        'waiting_interactive': self._waiting[PRIORITY_INTERACTIVE],
+        'waiting_batch': self._waiting[PRIORITY_BATCH],
+        'requests_available': int(self._request_tokens),
+        'tokens_available': int(self._token_tokens),
+        'blocked_for_seconds': round(max(0.0, self._blocked_until - now), 2),
+        **self._stats
+      }
+
+_limiters: Dict[str, ModelRateLimiter] = {}
+_limiters_lock = threading.Lock()
+_model_limits = _load_model_limits()
+
+def get_rate_limiter(model: str) -> ModelRateLimiter:
+  """
+  Get the process-wide rate limiter for a model.
+
+  The limiter enforces this process's share of the model limits, split
+  evenly between OPENAI_RATE_LIMIT_PROCESSES processes.
+
+  Args:
+      model: OpenAI model name
+
+  Returns:
+      Shared ModelRateLimiter
+  """
+  with _limiters_lock:
+    if model not in _limiters:
+      limits = _model_limits.get(model, FALLBACK_MODEL_LIMITS)
+      processes = OPENAI_RATE_LIMIT_PROCESSES
+      _limiters[model] = ModelRateLimiter(
+        model,
+        rpm=max(1, limits['rpm'] // processes),
+        tpm=max(1, limits['tpm'] // processes),
+        max_concurrency=max(1, -(-limits['max_concurrency'] // processes))
+      )
+    return _limiters[model]
+
+def get_rate_limiter_stats() -> Dict[str, Dict]:
+  """Get the state of every rate limiter created so far."""
+  with _limiters_lock:
+    limiters = list(_limiters.values())
+  return {limiter.model: limiter.snapshot() for limiter in limiters}
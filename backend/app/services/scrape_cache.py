@@ -0,0 +1,232 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Optional
+
+# Cache location and limits
+SCRAPE_CACHE_ENABLED = os.getenv('SCRAPE_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+SCRAPE_CACHE_PATH = os.getenv(
+  'SCRAPE_CACHE_PATH',
+  os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), '.cache', 'scrape_cache.sqlite3')
+)
+SCRAPE_CACHE_MAX_BYTES = int(os.getenv('SCRAPE_CACHE_MAX_BYTES', str(256 * 1024 * 1024)))
+
+# Entries younger than the fresh TTL are served without touching the network,
+# older ones are revalidated with ETag/Last-Modified, and entries past the
+# max age are fetched again unconditionally
+SCRAPE_CACHE_FRESH_TTL = int(os.getenv('SCRAPE_CACHE_FRESH_TTL', str(24 * 3600)))
+SCRAPE_CACHE_NEGATIVE_TTL = int(os.getenv('SCRAPE_CACHE_NEGATIVE_TTL', str(6 * 3600)))
+SCRAPE_CACHE_MAX_AGE = int(os.getenv('SCRAPE_CACHE_MAX_AGE', str(30 * 24 * 3600)))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scrape_cache (
+  url TEXT PRIMARY KEY,
+  content BLOB NOT NULL,
+  content_hash TEXT NOT NULL,
+  error TEXT,
+  etag TEXT,
+  last_modified TEXT,
+  tier TEXT,
+  fetched_at REAL NOT NULL,
+  validated_at REAL NOT NULL,
+  accessed_at REAL NOT NULL,
+  size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_scrape_cache_accessed_at ON scrape_cache (accessed_at);
+CREATE TABLE IF NOT EXISTS scrape_cache_stats (id INTEGER PRIMARY KEY CHECK (id = 1), total_size INTEGER NOT NULL);
+INSERT OR IGNORE INTO scrape_cache_stats (id, total_size) VALUES (1, 0);
+CREATE TRIGGER IF NOT EXISTS scrape_cache_insert AFTER INSERT ON scrape_cache BEGIN
+  UPDATE scrape_cache_stats SET total_size = total_size + NEW.size WHERE id = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS scrape_cache_delete AFTER DELETE ON scrape_cache BEGIN
+  UPDATE scrape_cache_stats SET total_size = total_size - OLD.size WHERE id = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS scrape_cache_update AFTER UPDATE OF size ON scrape_cache BEGIN
+  UPDATE scrape_cache_stats SET total_size = total_size - OLD.size + NEW.size WHERE id = 1;
+END;
+"""
+
+class ScrapeCache:
+  """Size-bounded LRU cache of extracted website text, stored in SQLite."""
+
+  def __init__(
+    self,
+    path: str = SCRAPE_CACHE_PATH,
+    max_bytes: int = SCRAPE_CACHE_MAX_BYTES,
+    fresh_ttl: int = SCRAPE_CACHE_FRESH_TTL,
+    negative_ttl: int = SCRAPE_CACHE_NEGATIVE_TTL,
+    max_age: int = SCRAPE_CACHE_MAX_AGE
+  ):
+    """Initialize the cache, creating the database file if needed."""
+    self.path = path
+    self.max_bytes = max_bytes
+    self.fresh_ttl = fresh_ttl
+    self.negative_ttl = negative_ttl
+    self.max_age = max_age
+    self._local = threading.local()
+
+    os.makedirs(os.path.dirname(self.path), exist_ok=True)
+    with self._connect() as conn:
+      conn.executescript(SCHEMA)
+
+  def _connect(self) -> sqlite3.Connection:
+    """Get this thread's connection to the cache database."""
+    conn = getattr(self._local, 'conn', None)
+    if conn is None:
+      conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+      conn.row_factory = sqlite3.Row
+      conn.execute('PRAGMA journal_mode=WAL')
+      conn.execute('PRAGMA synchronous=NORMAL')
+      self._local.conn = conn
+    return conn
+
+  @staticmethod
+  def content_hash(content: str) -> str:
+    """Hash extracted text so unchanged pages can be detected."""
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+  def get(self, url: str) -> Optional[Dict]:
+    """
+    Get a cache entry and mark it as recently used.
+
+    Args:
+        url: Normalized website URL
+
+    Returns:
+        Entry dictionary with content, error, validators, state and
+        timestamps, or None if the URL is not cached
+    """
+    conn = self._connect()
+    row = conn.execute('SELECT * FROM scrape_cache WHERE url = ?', (url,)).fetchone()
+    if row is None:
+      return None
+
+    now = time.time()
+    conn.execute('UPDATE scrape_cache SET accessed_at = ? WHERE url = ?', (now, url))
+
+    ttl = self.negative_ttl if row['error'] else self.fresh_ttl
+    if now - row['validated_at'] < ttl:
+      state = 'fresh'
+    elif now - row['fetched_at'] < self.max_age and (row['etag'] or row['last_modified']):
+      state = 'revalidate'
+    else:
+      state = 'expired'
+
+    return {
+      'url': row['url'],
+      'content': zlib.decompress(row['content']).decode('utf-8'),
+      'content_hash': row['content_hash'],
+      'error': row['error'],
+      'etag': row['etag'],
+      'last_modified': row['last_modified'],
+      'tier': row['tier'],
+      'fetched_at': row['fetched_at'],
+      'validated_at': row['validated_at'],
+      'state': state
+    }
+
+  def put(
+    self,
+    url: str,
+    content: str,
+    error: Optional[str] = None,
+    etag: Optional[str] = None,
+    last_modified: Optional[str] = None,
+    tier: Optional[str] = None
+  ) -> None:
+    """
+    Store extracted text for a URL and evict least recently used entries.
+
+    Args:
+        url: Normalized website URL
+        content: Extracted page text
+        error: Scrape error to cache instead of content
+        etag: ETag response header
+        last_modified: Last-Modified response header
+        tier: Fetch tier that served the page
+    """
+    compressed = zlib.compress(content.encode('utf-8'), 6)
+    now = time.time()
+
+    conn = self._connect()
+    conn.execute(
+      """
+      INSERT INTO scrape_cache
+        (url, content, content_hash, error, etag, last_modified, tier, fetched_at, validated_at, accessed_at, size)
+      VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+      ON CONFLICT (url) DO UPDATE SET
+        content = excluded.content, content_hash = excluded.content_hash, error = excluded.error,
+        etag = excluded.etag, last_modified = excluded.last_modified, tier = excluded.tier,
+        fetched_at = excluded.fetched_at, validated_at = excluded.validated_at,
+        accessed_at = excluded.accessed_at, size = excluded.size
+      """,
+      (url, compressed, self.content_hash(content), error, etag, last_modified, tier,
+       now, now, now, len(compressed) + len(url))
+    )
+    self._evict(conn)
+
+  def mark_validated(self, url: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+    """
+    Record a successful revalidation (HTTP 304) for a URL.
+
+    Args:
+        url: Normalized website URL
+        etag: New ETag header, if the server sent one
+        last_modified: New Last-Modified header, if the server sent one
+    """
+    self._connect().execute(
+      """
+      UPDATE scrape_cache
+      SET validated_at = ?, etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified)
+      WHERE url = ?
+      """,
+      (time.time(), etag, last_modified, url)
+    )
+
+  def invalidate(self, url: str) -> None:
+    """Remove a URL from the cache."""
+    self._connect().execute('DELETE FROM scrape_cache WHERE url = ?', (url,))
+
+  def _evict(self, conn: sqlite3.Connection) -> None:
+    """Delete least recently used entries until the cache fits in max_bytes."""
+    total = conn.execute('SELECT total_size FROM scrape_cache_stats WHERE id = 1').fetchone()[0]
+    if total <= self.max_bytes:
+      return
+
+    # Free a little more than needed so eviction does not run on every put
+    to_free = total - int(self.max_bytes * 0.9)
+    conn.execute(
+      """
+      DELETE FROM scrape_cache WHERE url IN (
+        SELECT url FROM (
+          SELECT url, size, SUM(size) OVER (ORDER BY accessed_at, url) AS running
+          FROM scrape_cache
+        ) WHERE running - size < ?
+      )
+      """,
+      (to_free,)
+    )
+
+_scrape_cache = None
+_scrape_cache_lock = threading.Lock()
+
+def get_scrape_cache() -> Optional[ScrapeCache]:
+  """
+  Get the process-wide scrape cache.
+
+  Returns:
+      Shared ScrapeCache, or None if SCRAPE_CACHE_ENABLED is off
+  """
+  global _scrape_cache
+
+  if not SCRAPE_CACHE_ENABLED:
+    return None
+
+  with _scrape_cache_lock:
+    if _scrape_cache is None:
+      _scrape_cache = ScrapeCache()
+
+  return _scrape_cache
@@ -0,0 +1,108 @@
+import contextvars
+import json
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+# USD per 1000 prompt/completion tokens, overridable with OPENAI_TOKEN_PRICES, e.g.
+# {"gpt-4": {"input": 0.03, "output": 0.06}}
+DEFAULT_TOKEN_PRICES = {
+  'gpt-4': {'input': 0.03, 'output': 0.06},
+  'gpt-3.5-turbo': {'input': 0.0005, 'output': 0.0015},
+}
+
+def _load_token_prices() -> Dict[str, Dict]:
+  """Merge OPENAI_TOKEN_PRICES overrides into the default prices."""
+  prices = {model: dict(values) for model, values in DEFAULT_TOKEN_PRICES.items()}
+  overrides = os.getenv('OPENAI_TOKEN_PRICES')
+  if overrides:
+    try:
+      for model, values in json.loads(overrides).items():
+        prices.setdefault(model, {'input': 0.0, 'output': 0.0}).update(values)
+    except (ValueError, AttributeError) as e:
+      print(f"Ignoring invalid OPENAI_TOKEN_PRICES: {e}")
+  return prices
+
+_token_prices = _load_token_prices()
+
+class TokenUsage:
+  """Token, latency and cost totals of a set of OpenAI calls."""
+
+  def __init__(self):
+    self._lock = threading.Lock()
+    self.calls = 0
+    self.tokens_in = 0
+    self.tokens_out = 0
+    self.latency = 0.0
+    self.cost = 0.0
+
+  def add(self, model: str, tokens_in: int, tokens_out: int, latency: float) -> None:
+    """Add one completed call."""
+    prices = _token_prices.get(model, {'input': 0.0, 'output': 0.0})
+    with self._lock:
+      self.calls += 1
+      self.tokens_in += tokens_in
+      self.tokens_out += tokens_out
+      self.latency += latency
+      self.cost += (tokens_in * prices['input'] + tokens_out * prices['output']) / 1000
+
+  def to_dict(self) -> Dict:
+    """Get the totals as a dictionary."""
+    with self._lock:
+      return {
+        'calls': self.calls,
+        'tokens_in': self.tokens_in,
+        'tokens_out': self.tokens_out,
+        'latency_seconds': round(self.latency, 3),
+        'cost_usd': round(self.cost, 6)
+      }
+
+# Usage of the enrichment or request currently running, inherited by tasks it starts
+_current_usage: contextvars.ContextVar[Optional[TokenUsage]] = contextvars.ContextVar('token_usage', default=None)
+
+_model_usage: Dict[str, TokenUsage] = {}
+_model_usage_lock = threading.Lock()
+
+def record_usage(model: str, tokens_in: int, tokens_out: int, latency: float) -> None:
+  """
+  Record the tokens and latency of one completed OpenAI call.
+
+  The call is added to the process-wide totals of the model and to the
+  usage being tracked by the calling context, if any.
+
+  Args:
+      model: OpenAI model name
+      tokens_in: Prompt tokens
+      tokens_out: Completion tokens
+      latency: Request latency in seconds
+  """
+  with _model_usage_lock:
+    usage = _model_usage.setdefault(model, TokenUsage())
+  usage.add(model, tokens_in, tokens_out, latency)
+
+  current = _current_usage.get()
+  if current is not None:
+    current.add(model, tokens_in, tokens_out, latency)
+
+@contextmanager
+def track_usage():
+  """
+  Collect the usage of every OpenAI call made inside the block, including
+  calls made by tasks started from it.
+
+  Yields:
+      TokenUsage filled as calls complete
+  """
+  usage = TokenUsage()
+  token = _current_usage.set(usage)
+  try:
+    yield usage
+  finally:
+    _current_usage.reset(token)
+
+def get_usage_stats() -> Dict[str, Dict]:
+  """Get the process-wide usage totals per model."""
+  with _model_usage_lock:
+    usage = dict(_model_usage)
+  return {model: totals.to_dict() for model, totals in usage.items()}
@@ -0,0 +1,198 @@
+import asyncio
+import concurrent.futures
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+from flask import current_app
+from sqlalchemy import cast, column, update, values
+
+from app import db
+from app.models.company import Company
+
+# Rows written per bulk UPDATE before flushing early
+ENRICHMENT_FLUSH_SIZE = int(os.getenv('ENRICHMENT_FLUSH_SIZE', '200'))
+
+# Seconds a result may wait in the buffer before it is flushed
+ENRICHMENT_FLUSH_INTERVAL = float(os.getenv('ENRICHMENT_FLUSH_INTERVAL', '0.25'))
+
+# Recent flushes kept for the latency and batch size percentiles
+FLUSH_HISTORY_SIZE = 500
+
+class CompanyWriteBuffer:
+  """
+  Write-behind buffer for enrichment results.
+
+  Results from concurrent enrichments are collected and written with one bulk
+  UPDATE ... FROM (VALUES ...) per flush instead of one commit per company.
+  Callers await the flush that contains their rows, so nothing is reported as
+  done (e.g. a queued job item completed) before it is committed.
+
+  Pending rows are guarded by a thread lock and flushed by a background
+  thread, so one buffer serves request handlers on different event loops.
+  """
+
+  def __init__(self, flush_size: int = ENRICHMENT_FLUSH_SIZE, flush_interval: float = ENRICHMENT_FLUSH_INTERVAL):
+    """
+    Initialize an empty buffer.
+
+    Args:
+        flush_size: Pending rows that trigger an immediate flush
+        flush_interval: Maximum seconds a row waits before being flushed
+    """
+    self.flush_size = flush_size
+    self.flush_interval = flush_interval
+
+    self._condition = threading.Condition()
+    self._pending: Dict[int, Dict] = {}
+    self._waiters: List[concurrent.futures.Future] = []
+    self._oldest: Optional[float] = None
+    self._app = None
+    self._thread = None
+    self._flushes = deque(maxlen=FLUSH_HISTORY_SIZE)
+    self._stats = {'flushes': 0, 'rows_written': 0, 'failed_flushes': 0}
+
+  async def write(self, rows: Dict[int, Dict]) -> None:
+    """
+    Buffer column values for companies and wait until they are committed.
+
+    Args:
+        rows: Dictionary of company ID to column values
+
+    Raises:
+        Exception: The database error if the flush failed
+    """
+    if not rows:
+      return
+
+    future = concurrent.futures.Future()
+    with self._condition:
+      if self._app is None:
+        self._app = current_app._get_current_object()
+      self._ensure_thread()
+
+      for company_id, row in rows.items():
+        # Later results for the same company win
+        self._pending.setdefault(company_id, {}).update(row)
+      self._waiters.append(future)
+      if self._oldest is None:
+        self._oldest = time.monotonic()
+      self._condition.notify()
+
+    await asyncio.wrap_future(future)
+
+  def _ensure_thread(self) -> None:
+    """Start the flusher thread. Must be called with the lock held."""
+    if self._thread is None or not self._thread.is_alive():
+      self._thread = threading.Thread(target=self._run, name='company-write-buffer', daemon=True)
+      self._thread.start()
+
+  def _run(self) -> None:
+    """Flush pending rows whenever the size or time threshold is reached."""
+    while True:
+      with self._condition:
+        while True:
+          if self._pending:
+            age = time.monotonic() - self._oldest
+            if len(self._pending) >= self.flush_size or age >= self.flush_interval:
+              break
+            self._condition.wait(self.flush_interval - age)
+          else:
+            self._condition.wait()
+
+        pending, waiters = self._pending, self._waiters
+        self._pending, self._waiters, self._oldest = {}, [], None
+
+      self._flush(pending, waiters)
+
+  def _flush(self, pending: Dict[int, Dict], waiters: List[concurrent.futures.Future]) -> None:
+    """Write one batch of rows in a single transaction and resolve its waiters."""
+    started = time.perf_counter()
+    try:
+      with self._app.app_context():
+        try:
+          for statement in self._build_updates(pending):
+            db.session.execute(statement)
+          db.session.commit()
+        except Exception:
+          db.session.rollback()
+          raise
+    except Exception as e:
+      print(f"Error flushing {len(pending)} enrichment results: {e}")
+      with self._condition:
+        self._stats['failed_flushes'] += 1
+      for future in waiters:
+        future.set_exception(e)
+      return
+
+    latency = time.perf_counter() - started
+    with self._condition:
+      self._stats['flushes'] += 1
+      self._stats['rows_written'] += len(pending)
+      self._flushes.append((latency, len(pending)))
+    for future in waiters:
+      future.set_result(None)
+
+  @staticmethod
+  def _build_updates(pending: Dict[int, Dict]) -> List:
+    """
+    Build one UPDATE ... FROM (VALUES ...) statement per set of updated columns.
+
+    Args:
+        pending: Dictionary of company ID to column values
+
+    Returns:
+        List of update statements
+    """
+    table = Company.__table__
+    groups: Dict[tuple, List[tuple]] = {}
+    for company_id, row in pending.items():
+      names = tuple(sorted(row))
+      groups.setdefault(names, []).append((company_id,) + tuple(row[name] for name in names))
+
+    statements = []
+    for names, data in groups.items():
+      rows = values(
+        column('id', table.c.id.type),
+        *(column(name, table.c[name].type) for name in names),
+        name='v'
+      ).data(data)
+      # VALUES columns are untyped in Postgres, cast them to the target column types
+      statements.append(
+        update(table)
+        .where(table.c.id == rows.c.id)
+        .values({name: cast(rows.c[name], table.c[name].type) for name in names})
+      )
+
+    return statements
+
+  def stats(self) -> Dict:
+    """Get flush counters with latency and batch size percentiles."""
+    with self._condition:
+      flushes = list(self._flushes)
+      stats = dict(self._stats, pending=len(self._pending))
+
+    latencies = sorted(latency * 1000 for latency, _ in flushes)
+    sizes = sorted(size for _, size in flushes)
+    for name, samples in (('flush_ms', latencies), ('batch_size', sizes)):
+      if samples:
+        stats[name] = {
+          'p50': round(samples[len(samples) // 2], 2),
+          'p95': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 2),
+          'max': round(samples[-1], 2)
+        }
+    return stats
+
+_write_buffer: Optional[CompanyWriteBuffer] = None
+_write_buffer_lock = threading.Lock()
+
+def get_company_write_buffer() -> CompanyWriteBuffer:
+  """Get the process-wide enrichment write buffer."""
+  global _write_buffer
+
+  with _write_buffer_lock:
+    if _write_buffer is None:
+      _write_buffer = CompanyWriteBuffer()
+    return _write_buffer
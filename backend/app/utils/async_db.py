@@ -0,0 +1,193 @@
+import asyncio
+import contextvars
+import shlex
+import threading
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+from flask import current_app
+from sqlalchemy.engine import Row, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.utils.db_routing import REPLICA_BIND_KEY
+from app.utils.event_loop import worker_loop
+
+# Async driver used for each database backend
+ASYNC_DRIVERS = {
+  'postgresql': 'postgresql+asyncpg',
+  'sqlite': 'sqlite+aiosqlite',
+}
+
+# Engine options that only apply to pooled engines
+POOL_OPTIONS = ('pool_size', 'max_overflow', 'pool_timeout', 'pool_recycle')
+
+def _async_url(url: str) -> str:
+  """Switch a database URL to the async driver of its backend."""
+  sa_url = make_url(url)
+  driver = ASYNC_DRIVERS.get(sa_url.get_backend_name())
+  if driver is None:
+    raise ValueError(f"No async driver for database backend {sa_url.get_backend_name()}")
+  return sa_url.set(drivername=driver).render_as_string(hide_password=False)
+
+def _async_options(options: Dict, pooled: bool) -> Dict:
+  """
+  Convert the sync engine options of a bind for the async driver.
+
+  libpq `-c name=value` options, such as the statement timeout, are sent as
+  asyncpg server settings instead.
+  """
+  async_options = {key: value for key, value in options.items() if key != 'connect_args'}
+  if not pooled:
+    async_options = {key: value for key, value in async_options.items() if key not in POOL_OPTIONS}
+    async_options['poolclass'] = NullPool
+
+  libpq_options = options.get('connect_args', {}).get('options', '')
+  tokens = shlex.split(libpq_options)
+  server_settings = {}
+  for flag, setting in zip(tokens, tokens[1:]):
+    if flag == '-c' and '=' in setting:
+      name, value = setting.split('=', 1)
+      server_settings[name] = value
+  if server_settings:
+    async_options['connect_args'] = {'server_settings': server_settings}
+  return async_options
+
+class AsyncDatabase:
+  """
+  Async engines for the read paths, created from the app's database config.
+
+  Async connections belong to the event loop that opened them. On the
+  persistent worker loop the engines are pooled and disposed when the worker
+  stops; other loops, such as Flask's loop per async view, get engines
+  without a pool so no connection outlives its loop.
+  """
+
+  def __init__(self):
+    self._loop_engines = threading.local()
+
+  def engine(self, replica: bool = False) -> AsyncEngine:
+    """
+    Get the engine of the running event loop.
+
+    Args:
+        replica: Use the read replica if one is configured
+
+    Returns:
+        AsyncEngine for the primary or replica database
+    """
+    binds = current_app.config.get('SQLALCHEMY_BINDS') or {}
+    bind_key = REPLICA_BIND_KEY if replica and REPLICA_BIND_KEY in binds else None
+
+    state = self._loop_engines
+    loop = asyncio.get_running_loop()
+    if getattr(state, 'loop', None) is not loop:
+      state.loop = loop
+      state.engines = {}
+    if bind_key not in state.engines:
+      state.engines[bind_key] = self._create_engine(bind_key, binds)
+    return state.engines[bind_key]
+
+  def _create_engine(self, bind_key: Optional[str], binds: Dict) -> AsyncEngine:
+    """Create an async engine for a bind of the current app."""
+    config = current_app.config
+    options = dict(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    if bind_key is None:
+      url = config['SQLALCHEMY_DATABASE_URI']
+    else:
+      bind = binds[bind_key]
+      if isinstance(bind, dict):
+        options.update(bind)
+        url = options.pop('url')
+      else:
+        url = bind
+
+    pooled = worker_loop.is_current()
+    engine = create_async_engine(_async_url(url), **_async_options(options, pooled))
+    if pooled:
+      from app.services.db_pools import monitor_engine
+
+      monitor_engine(f"async_{bind_key or 'primary'}", engine.sync_engine)
+      worker_loop.on_shutdown(engine.dispose)
+    return engine
+
+  @asynccontextmanager
+  async def session(self, replica: bool = False):
+    """
+    Open an ORM session on its own connection.
+
+    Concurrent queries need one session each.
+
+    Args:
+        replica: Use the read replica if one is configured
+
+    Yields:
+        AsyncSession
+    """
+    async with AsyncSession(self.engine(replica), expire_on_commit=False) as session:
+      yield session
+
+  async def fetch_all(self, statement, params: Optional[Dict] = None, replica: bool = False) -> List[Row]:
+    """
+    Run a statement on its own connection and fetch every row.
+
+    Args:
+        statement: SQLAlchemy statement or text()
+        params: Bound parameters
+        replica: Use the read replica if one is configured
+
+    Returns:
+        List of rows
+    """
+    async with self.engine(replica).connect() as connection:
+      result = await connection.execute(statement, params or {})
+      return result.all()
+
+  async def scalar(self, statement, params: Optional[Dict] = None, replica: bool = False) -> Any:
+    """
+    Run a statement on its own connection and get the first column of the first row.
+
+    Args:
+        statement: SQLAlchemy statement or text()
+        params: Bound parameters
+        replica: Use the read replica if one is configured
+
+    Returns:
+        Scalar result, None if there are no rows
+    """
+    async with self.engine(replica).connect() as connection:
+      return await connection.scalar(statement, params or {})
+
+  @property
+  def pooled(self) -> bool:
+    """Whether the running event loop gets pooled async engines, i.e. it is the persistent worker loop."""
+    return worker_loop.is_current()
+
+  async def run_sync(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Run a function that queries through the pooled sync session in a thread.
+
+    Used off the persistent worker loop, where async engines open a
+    connection per query. The function runs in a copy of the caller's
+    context, so read_replica() and request timing apply, inside its own app
+    context so it gets its own session.
+
+    Args:
+        func: Function using db.session or model queries
+        *args: Positional arguments of func
+        **kwargs: Keyword arguments of func
+
+    Returns:
+        Result of func
+    """
+    app = current_app._get_current_object()
+    context = contextvars.copy_context()
+
+    def run():
+      with app.app_context():
+        return func(*args, **kwargs)
+
+    return await asyncio.get_running_loop().run_in_executor(None, context.run, run)
+
+# Async database access of this process
+async_db = AsyncDatabase()
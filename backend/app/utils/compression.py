@@ -0,0 +1,136 @@
+import os
+import zlib
+from typing import Iterable, Iterator, Optional
+
+from app.utils.timing import span
+
+try:
+  import brotli
+except ImportError:
+  brotli = None
+
+# Compress responses the client accepts gzip or brotli for
+RESPONSE_COMPRESSION_ENABLED = os.getenv('RESPONSE_COMPRESSION_ENABLED', 'true').lower() == 'true'
+
+# Smaller bodies are sent as is; streamed bodies have no known size and are always compressed
+RESPONSE_COMPRESSION_MIN_BYTES = int(os.getenv('RESPONSE_COMPRESSION_MIN_BYTES', '1024'))
+
+# Levels favour speed, JSON compresses well at low levels
+RESPONSE_GZIP_LEVEL = int(os.getenv('RESPONSE_GZIP_LEVEL', '5'))
+RESPONSE_BROTLI_QUALITY = int(os.getenv('RESPONSE_BROTLI_QUALITY', '4'))
+
+COMPRESSIBLE_MIMETYPES = ('application/json', 'text/plain', 'text/html', 'text/csv')
+
+class _Compressor:
+  """Incremental gzip or brotli compressor."""
+
+  def __init__(self, encoding: str):
+    if encoding == 'br':
+      self._compressor = brotli.Compressor(quality=RESPONSE_BROTLI_QUALITY)
+      self.compress = self._compressor.process
+      self.finish = self._compressor.finish
+    else:
+      # wbits 31 writes the gzip header and trailer
+      self._compressor = zlib.compressobj(RESPONSE_GZIP_LEVEL, zlib.DEFLATED, 31)
+      self.compress = self._compressor.compress
+      self.finish = self._compressor.flush
+
+def compress_bytes(data: bytes, encoding: str) -> bytes:
+  """
+  Compress a complete body.
+
+  Args:
+      data: Body
+      encoding: 'gzip' or 'br'
+
+  Returns:
+      Compressed body
+  """
+  compressor = _Compressor(encoding)
+  return compressor.compress(data) + compressor.finish()
+
+def compress_chunks(chunks: Iterable[bytes], encoding: str) -> Iterator[bytes]:
+  """
+  Compress a streamed body chunk by chunk.
+
+  Output is yielded whenever the compressor emits a block, so the stream is
+  not held in memory.
+
+  Args:
+      chunks: Body chunks
+      encoding: 'gzip' or 'br'
+
+  Yields:
+      Compressed chunks
+  """
+  compressor = _Compressor(encoding)
+  try:
+    for chunk in chunks:
+      if isinstance(chunk, str):
+        chunk = chunk.encode('utf-8')
+      compressed = compressor.compress(chunk)
+      if compressed:
+        yield compressed
+    yield compressor.finish()
+  finally:
+    close = getattr(chunks, 'close', None)
+    if close is not None:
+      close()
+
+def negotiate_encoding(accept_encodings) -> Optional[str]:
+  """
+  Pick the response encoding from the client's Accept-Encoding.
+
+  Args:
+      accept_encodings: Parsed Accept-Encoding header
+
+  Returns:
+      'br', 'gzip' or None to send the body uncompressed
+  """
+  supported = ['br', 'gzip'] if brotli is not None else ['gzip']
+  return accept_encodings.best_match(supported)
+
+def register_response_compression(app) -> None:
+  """
+  Compress JSON and text responses with gzip or brotli as negotiated with the client.
+
+  Bodies under RESPONSE_COMPRESSION_MIN_BYTES, event streams and responses
+  that already carry a Content-Encoding are left alone.
+
+  Args:
+      app: Flask app
+  """
+  if not RESPONSE_COMPRESSION_ENABLED:
+    return
+
+  from flask import request
+
+  @app.after_request
+  def compress_response(response):
+    response.vary.add('Accept-Encoding')
+    if (
+      response.status_code < 200
+      or response.status_code in (204, 304)
+      or request.method == 'HEAD'
+      or 'Content-Encoding' in response.headers
+      or response.direct_passthrough
+      or response.mimetype not in COMPRESSIBLE_MIMETYPES
+    ):
+      return response
+
+    encoding = negotiate_encoding(request.accept_encodings)
+    if encoding is None:
+      return response
+
+    if response.is_streamed:
+      response.response = compress_chunks(response.response, encoding)
+      response.headers.pop('Content-Length', None)
+    else:
+      data = response.get_data()
+      if len(data) < RESPONSE_COMPRESSION_MIN_BYTES:
+        return response
+      with span('compress'):
+        response.set_data(compress_bytes(data, encoding))
+
+    response.headers['Content-Encoding'] = encoding
+    return response
@@ -0,0 +1,35 @@
+import contextvars
+from contextlib import contextmanager
+
+from flask_sqlalchemy.session import Session
+
+# SQLALCHEMY_BINDS key of the read replica
+REPLICA_BIND_KEY = 'replica'
+
+# Whether the current block only reads and may use the replica, inherited by tasks it starts
+_use_replica: contextvars.ContextVar[bool] = contextvars.ContextVar('use_replica', default=False)
+
+@contextmanager
+def read_replica():
+  """
+  Run a block's queries on the read replica, if one is configured.
+
+  Only use this for reads that can tolerate replication lag. Flushes and
+  INSERT/UPDATE/DELETE statements still go to the primary.
+  """
+  token = _use_replica.set(True)
+  try:
+    yield
+  finally:
+    _use_replica.reset(token)
+
+class RoutingSession(Session):
+  """Session that sends queries inside read_replica() blocks to the replica engine."""
+
+  def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+    """Select the replica for reads in a read_replica() block, otherwise the model's engine."""
+    if bind is None and _use_replica.get() and not self._flushing and not getattr(clause, 'is_dml', False):
+      engine = self._db.engines.get(REPLICA_BIND_KEY)
+      if engine is not None:
+        return engine
+    return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
@@ -0,0 +1,86 @@
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Mapping, Optional
+
+# Header clients can send to shorten the server-side deadline, in seconds
+REQUEST_TIMEOUT_HEADER = 'X-Request-Timeout'
+
+class DeadlineExceeded(TimeoutError):
+  """Raised when work cannot finish before the current deadline."""
+
+# Absolute time.monotonic() deadline of the current request, inherited by tasks it starts
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar('deadline', default=None)
+
+@contextmanager
+def deadline_scope(timeout: Optional[float]):
+  """
+  Run a block under a deadline.
+
+  Nested scopes can only shorten the deadline of the enclosing scope.
+
+  Args:
+      timeout: Seconds from now, None to keep the current deadline
+  """
+  current = _deadline.get()
+  deadline = current
+  if timeout is not None:
+    deadline = time.monotonic() + timeout
+    if current is not None:
+      deadline = min(deadline, current)
+
+  token = _deadline.set(deadline)
+  try:
+    yield
+  finally:
+    _deadline.reset(token)
+
+def remaining() -> Optional[float]:
+  """
+  Get the seconds left before the current deadline.
+
+  Returns:
+      Seconds left (0 if passed), None if there is no deadline
+  """
+  deadline = _deadline.get()
+  if deadline is None:
+    return None
+  return max(0.0, deadline - time.monotonic())
+
+def bounded_timeout(timeout: Optional[float]) -> Optional[float]:
+  """
+  Limit a timeout to the time left before the current deadline.
+
+  Args:
+      timeout: Timeout of the operation, None for no timeout of its own
+
+  Returns:
+      The shorter of the timeout and the remaining time
+
+  Raises:
+      DeadlineExceeded: If the deadline has already passed
+  """
+  left = remaining()
+  if left is None:
+    return timeout
+  if left <= 0:
+    raise DeadlineExceeded("Request deadline exceeded")
+  return left if timeout is None else min(timeout, left)
+
+def parse_request_timeout(headers: Mapping, default: float, maximum: float) -> float:
+  """
+  Get the timeout of an HTTP request from the X-Request-Timeout header.
+
+  Args:
+      headers: Request headers
+      default: Timeout used when the header is missing or invalid
+      maximum: Upper bound for client supplied timeouts
+
+  Returns:
+      Timeout in seconds
+  """
+  try:
+    timeout = float(headers.get(REQUEST_TIMEOUT_HEADER, default))
+  except (TypeError, ValueError):
+    return default
+  return min(max(timeout, 0.0), maximum) if timeout > 0 else default
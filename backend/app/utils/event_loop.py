@@ -0,0 +1,187 @@
+import asyncio
+import concurrent.futures
+import contextvars
+import os
+import threading
+import weakref
+from typing import Any, Awaitable, Callable, Coroutine, List, Optional
+
+# Seconds to wait for shutdown callbacks and pending tasks when a worker stops
+SHUTDOWN_TIMEOUT = 10.0
+
+class WorkerEventLoop:
+  """
+  An event loop that runs in a background thread for the lifetime of a worker process.
+
+  Async views submitted from request threads all run on this loop, so async
+  clients and their connection pools are reused across requests instead of
+  being rebuilt for a new loop every time. Clients register cleanup with
+  on_shutdown and are closed when the worker stops.
+  """
+
+  def __init__(self):
+    self._lock = threading.Lock()
+    self._loop: Optional[asyncio.AbstractEventLoop] = None
+    self._thread: Optional[threading.Thread] = None
+    self._pid: Optional[int] = None
+    self._shutdown_callbacks: List[Callable[[], Awaitable]] = []
+
+  @property
+  def loop(self) -> asyncio.AbstractEventLoop:
+    """Get the running loop, starting it on first use."""
+    with self._lock:
+      # A loop inherited through fork has no thread running it
+      if self._loop is None or self._pid != os.getpid():
+        self._start()
+      return self._loop
+
+  def start(self) -> None:
+    """Start the loop if it is not running yet, e.g. from a worker startup hook."""
+    self.loop
+
+  def _start(self) -> None:
+    """Create the loop and its thread. Must be called with the lock held."""
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+
+    def run():
+      asyncio.set_event_loop(loop)
+      loop.call_soon(ready.set)
+      loop.run_forever()
+
+    self._thread = threading.Thread(target=run, name='worker-event-loop', daemon=True)
+    self._thread.start()
+    ready.wait()
+    self._loop = loop
+    self._pid = os.getpid()
+    self._shutdown_callbacks = []
+
+  def is_current(self) -> bool:
+    """Check if the calling code runs on this loop."""
+    try:
+      return asyncio.get_running_loop() is self._loop
+    except RuntimeError:
+      return False
+
+  def run(self, coroutine: Coroutine, timeout: Optional[float] = None) -> Any:
+    """
+    Run a coroutine on the loop and block the calling thread until it finishes.
+
+    The coroutine runs in a copy of the caller's context, so context variables
+    such as Flask's request and app context are visible to it.
+
+    Args:
+        coroutine: Coroutine to run
+        timeout: Seconds to wait for the result, None to wait indefinitely
+
+    Returns:
+        Result of the coroutine
+    """
+    if self.is_current():
+      coroutine.close()
+      raise RuntimeError("Cannot block on the worker event loop from inside it")
+
+    loop = self.loop
+    context = contextvars.copy_context()
+    result = concurrent.futures.Future()
+
+    def start():
+      if not result.set_running_or_notify_cancel():
+        coroutine.close()
+        return
+      task = context.run(loop.create_task, coroutine)
+
+      def done(task):
+        if task.cancelled():
+          result.set_exception(concurrent.futures.CancelledError())
+        elif task.exception() is not None:
+          result.set_exception(task.exception())
+        else:
+          result.set_result(task.result())
+
+      task.add_done_callback(done)
+
+    loop.call_soon_threadsafe(start)
+    return result.result(timeout)
+
+  def on_shutdown(self, callback: Callable[[], Awaitable]) -> None:
+    """
+    Register an async cleanup callback, e.g. a client's aclose, run when the worker stops.
+
+    Args:
+        callback: Coroutine function called on the loop during stop()
+    """
+    with self._lock:
+      self._shutdown_callbacks.append(callback)
+
+  def stop(self, timeout: float = SHUTDOWN_TIMEOUT) -> None:
+    """
+    Run the shutdown callbacks, cancel remaining tasks and stop the loop.
+
+    Args:
+        timeout: Seconds to wait for cleanup
+    """
+    with self._lock:
+      loop, thread = self._loop, self._thread
+      callbacks, self._shutdown_callbacks = self._shutdown_callbacks, []
+      if loop is None or self._pid != os.getpid():
+        return
+      self._loop = self._thread = None
+
+    async def shutdown():
+      for callback in callbacks:
+        try:
+          await callback()
+        except Exception as e:
+          print(f"Error during event loop shutdown: {e}")
+      tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+      for task in tasks:
+        task.cancel()
+      await asyncio.gather(*tasks, return_exceptions=True)
+      await loop.shutdown_asyncgens()
+
+    try:
+      asyncio.run_coroutine_threadsafe(shutdown(), loop).result(timeout)
+    except Exception as e:
+      print(f"Event loop did not shut down cleanly: {e}")
+    finally:
+      loop.call_soon_threadsafe(loop.stop)
+      thread.join(timeout)
+      if not loop.is_running():
+        loop.close()
+
+# Event loop of this worker process
+worker_loop = WorkerEventLoop()
+
+# Cleanup callbacks of short-lived event loops, such as Flask's loop per async view
+_loop_exit_callbacks = weakref.WeakKeyDictionary()
+_loop_exit_lock = threading.Lock()
+
+def on_loop_exit(callback: Callable[[], Awaitable]) -> None:
+  """
+  Register an async cleanup callback, e.g. a client's aclose, for the running event loop.
+
+  On the persistent worker loop the callback runs when the worker stops. On
+  other loops it runs in run_loop_exit_callbacks, which whoever owns the loop
+  awaits before closing it.
+
+  Args:
+      callback: Coroutine function called on the loop
+  """
+  if worker_loop.is_current():
+    worker_loop.on_shutdown(callback)
+    return
+  loop = asyncio.get_running_loop()
+  with _loop_exit_lock:
+    _loop_exit_callbacks.setdefault(loop, []).append(callback)
+
+async def run_loop_exit_callbacks() -> None:
+  """Run the cleanup callbacks registered for the running event loop with on_loop_exit."""
+  loop = asyncio.get_running_loop()
+  with _loop_exit_lock:
+    callbacks = _loop_exit_callbacks.pop(loop, [])
+  for callback in callbacks:
+    try:
+      await callback()
+    except Exception as e:
+      print(f"Error during event loop cleanup: {e}")
@@ -1,6 +1,18 @@
-from typing import Dict, List, Any, Tuple
+import json
+import os
+import time
+import uuid
+from typing import Dict, Iterator, List, Any, Tuple
 
-from flask import jsonify, Response
+from flask import current_app, jsonify, Response
+
+from app.utils.timing import REQUEST_TIMING_ENABLED, span, stage_durations
+
+# Responses whose data holds a list of at least this many items are streamed
+JSON_STREAM_MIN_ITEMS = int(os.getenv('JSON_STREAM_MIN_ITEMS', '50'))
+
+# List items serialized per streamed chunk
+JSON_STREAM_CHUNK_ITEMS = 25
 
 def create_response(
   data: Any = None,
@@ -26,7 +38,55 @@ def create_response(
     "data": data
   }
   
-  return jsonify(response), status_code
+  if isinstance(data, dict):
+    lists = [key for key, value in data.items() if isinstance(value, list) and len(value) >= JSON_STREAM_MIN_ITEMS]
+    if lists:
+      return stream_response(response, max(lists, key=lambda key: len(data[key]))), status_code
+  
+  with span('serialize'):
+    return jsonify(response), status_code
+
+def stream_response(response: Dict, list_key: str) -> Response:
+  """
+  Stream a JSON envelope whose data holds a large list.
+  
+  The envelope is sent first, then the list items in chunks, then the closing
+  brackets, so the full body is never built in memory. Items are serialized
+  after the Server-Timing header is sent, so their serialization time only
+  goes to the stage histogram.
+  
+  Args:
+      response: Envelope with status, message and data
+      list_key: Key of the list in the data to stream
+      
+  Returns:
+      Streamed JSON response
+  """
+  json_provider = current_app.json
+  data = dict(response['data'])
+  items = data.pop(list_key)
+  
+  # Serialize the envelope with a placeholder and split it where the items go
+  placeholder = f"__items_{uuid.uuid4().hex}__"
+  envelope = dict(response, data=dict(data, **{list_key: placeholder}))
+  head, tail = json_provider.dumps_bytes(envelope).split(json_provider.dumps_bytes(placeholder))
+  head += b'['
+  tail = b']' + tail
+  
+  def generate() -> Iterator[bytes]:
+    serialize_seconds = 0.0
+    yield head
+    for start in range(0, len(items), JSON_STREAM_CHUNK_ITEMS):
+      chunk = items[start:start + JSON_STREAM_CHUNK_ITEMS]
+      started = time.perf_counter()
+      encoded = b','.join(json_provider.dumps_bytes(item) for item in chunk)
+      serialize_seconds += time.perf_counter() - started
+      yield encoded if start == 0 else b',' + encoded
+    yield tail
+    if REQUEST_TIMING_ENABLED:
+      stage_durations.observe(('serialize',), serialize_seconds)
+  
+  return Response(generate(), mimetype=json_provider.mimetype)
 
 def error_response(
   message: str = "An error occurred",
@@ -96,4 +156,17 @@ def validate_pagination(page: str, per_page: str) -> Tuple[int, int]:
   page_num = max(1, page_num)
   per_page_num = max(1, min(100, per_page_num))
   
-  return page_num, per_page_num 
\ No newline at end of file
+  return page_num, per_page_num
+
+def format_sse(event: str, data: Any) -> str:
+  """
+  Format a server-sent event.
+  
+  Args:
+      event: Event name
+      data: JSON-serializable event data
+      
+  Returns:
+      Event text, terminated by a blank line
+  """
+  return f"event: {event}\ndata: {json.dumps(data)}\n\n"
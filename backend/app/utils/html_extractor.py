@@ -0,0 +1,218 @@
+import asyncio
+import os
+import re
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Iterator, Optional
+
+# Characters of text extracted per page; enough for the summary prompt with
+# room for the prompt budgeting to choose the most useful parts
+HTML_EXTRACT_CHAR_BUDGET = int(os.getenv('HTML_EXTRACT_CHAR_BUDGET', '8000'))
+
+# Characters of HTML parsed per page, longer pages (e.g. rendered by Playwright) are cut;
+# lxml parses the whole input, so this bounds the parse time
+HTML_EXTRACT_MAX_CHARS = int(os.getenv('HTML_EXTRACT_MAX_CHARS', str(2 * 1024 * 1024)))
+
+# Extraction runs off the event loop in a "thread" or "process" pool
+HTML_EXTRACT_POOL = os.getenv('HTML_EXTRACT_POOL', 'thread')
+HTML_EXTRACT_WORKERS = int(os.getenv('HTML_EXTRACT_WORKERS', str(min(4, os.cpu_count() or 1))))
+
+# Elements whose content is never page text
+SKIPPED_TAGS = {
+  'script', 'style', 'noscript', 'template', 'svg', 'canvas', 'iframe', 'object',
+  'embed', 'head', 'title', 'meta', 'link', 'button', 'select', 'option', 'textarea', 'form'
+}
+
+# Page chrome skipped when extracting text
+BOILERPLATE_TAGS = {'nav', 'footer', 'aside', 'dialog'}
+BOILERPLATE_ROLES = {'navigation', 'banner', 'contentinfo', 'dialog', 'alertdialog', 'complementary', 'search'}
+# Matched against whole id/class tokens split on whitespace, "-" and "_", so classes such as
+# "shareholders" or "hero-banner" are kept; banners are recognized by role="banner"
+BOILERPLATE_TOKENS = frozenset({
+  'cookie', 'cookies', 'consent', 'gdpr', 'popup', 'modal', 'newsletter', 'subscribe', 'social', 'share',
+  'breadcrumb', 'breadcrumbs', 'sidebar', 'menu', 'navbar', 'footer'
+})
+IDENTIFIER_SEPARATOR_PATTERN = re.compile(r'[\s_-]+')
+
+# Elements that start a new line of text
+BLOCK_TAGS = {
+  'address', 'article', 'blockquote', 'br', 'dd', 'div', 'dl', 'dt', 'figcaption', 'figure',
+  'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hr', 'li', 'main', 'ol', 'p', 'pre',
+  'section', 'table', 'td', 'th', 'tr', 'ul'
+}
+HEADING_TAGS = {'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+
+# Prefix marking heading lines in the extracted text
+HEADING_PREFIX = '## '
+
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+def _is_boilerplate(element) -> bool:
+  """Check if an element is navigation, footer, cookie banner or similar chrome."""
+  if element.tag in BOILERPLATE_TAGS:
+    return True
+
+  if element.get('role') in BOILERPLATE_ROLES or element.get('aria-hidden') == 'true':
+    return True
+
+  # Only short identifiers, long class lists are usually utility classes
+  identifiers = f"{element.get('id', '')} {element.get('class', '')}"
+  if len(identifiers) >= 200:
+    return False
+  return not BOILERPLATE_TOKENS.isdisjoint(IDENTIFIER_SEPARATOR_PATTERN.split(identifiers.lower()))
+
+def _find_content_root(document):
+  """Prefer the main content region, falling back to the body."""
+  for xpath in ('//main', '//*[@role="main"]', '//article'):
+    matches = document.xpath(xpath)
+    if matches:
+      # Several articles usually mean a listing, keep their common parent
+      if len(matches) > 1 and xpath == '//article':
+        return matches[0].getparent()
+      return matches[0]
+
+  body = document.find('body')
+  return body if body is not None else document
+
+def _iter_lines(root) -> Iterator[str]:
+  """
+  Walk an element tree in document order and yield normalized lines of text.
+
+  Boilerplate subtrees are skipped without being visited, and the walk is lazy
+  so callers can stop as soon as they have enough text.
+  """
+  pending = []
+  heading = False
+
+  def flush():
+    line = WHITESPACE_PATTERN.sub(' ', ''.join(pending)).strip()
+    pending.clear()
+    if line:
+      return f"{HEADING_PREFIX}{line}" if heading else line
+    return None
+
+  # Explicit stack of (element, entering) to avoid recursion on deep pages
+  stack = [(root, True)]
+  while stack:
+    element, entering = stack.pop()
+    tag = element.tag if isinstance(element.tag, str) else None
+
+    if entering:
+      if tag is None or tag in SKIPPED_TAGS or (element is not root and _is_boilerplate(element)):
+        # Comments, processing instructions and skipped elements keep their tail
+        if element is not root and element.tail:
+          pending.append(element.tail)
+        continue
+
+      if tag in BLOCK_TAGS:
+        line = flush()
+        if line:
+          yield line
+        heading = tag in HEADING_TAGS
+
+      if element.text:
+        pending.append(element.text)
+
+      stack.append((element, False))
+      for child in reversed(element):
+        stack.append((child, True))
+    else:
+      if tag in BLOCK_TAGS:
+        line = flush()
+        if line:
+          yield line
+        heading = False
+      elif tag == 'img' and element.get('alt'):
+        pending.append(f" {element.get('alt')} ")
+
+      if element is not root and element.tail:
+        pending.append(element.tail)
+
+  line = flush()
+  if line:
+    yield line
+
+def extract_text(html: str, char_budget: int = HTML_EXTRACT_CHAR_BUDGET) -> str:
+  """
+  Extract readable text from HTML within a character budget.
+
+  The main content region (main/article) is preferred, navigation, footers
+  and cookie banners are skipped, and the walk of the parsed tree stops once
+  the budget is filled. Parsing itself covers the whole input, which is cut
+  to HTML_EXTRACT_MAX_CHARS first. Headings are kept on their own lines
+  prefixed with "## ".
+
+  Args:
+      html: Raw HTML
+      char_budget: Maximum characters of text to return
+
+  Returns:
+      Extracted text, one block per line
+  """
+  if not html or not html.strip():
+    return ""
+
+  # lxml recovers from the cut-off markup
+  html = html[:HTML_EXTRACT_MAX_CHARS]
+
+  # lxml is only loaded once pages are extracted, keeping app startup fast
+  import lxml.html
+  from lxml import etree
+
+  try:
+    try:
+      document = lxml.html.document_fromstring(html)
+    except ValueError:
+      # Strings with an XML encoding declaration must be parsed as bytes
+      document = lxml.html.document_fromstring(html.encode('utf-8'))
+  except (etree.ParserError, ValueError):
+    return ""
+
+  root = _find_content_root(document)
+  text = _collect_lines(root, char_budget)
+
+  # Fall back to the whole body if the main region held next to no text
+  body = document.find('body')
+  if len(text) < 200 and body is not None and root is not body:
+    text = _collect_lines(body, char_budget)
+
+  return text
+
+def _collect_lines(root, char_budget: int) -> str:
+  """Join lines of text from an element until the character budget is filled."""
+  lines = []
+  size = 0
+  for line in _iter_lines(root):
+    lines.append(line)
+    size += len(line) + 1
+    if size >= char_budget:
+      break
+
+  return '\n'.join(lines)[:char_budget]
+
+_extraction_pool: Optional[Executor] = None
+
+def get_extraction_pool() -> Executor:
+  """Get the shared worker pool used for HTML extraction."""
+  global _extraction_pool
+
+  if _extraction_pool is None:
+    if HTML_EXTRACT_POOL == 'process':
+      _extraction_pool = ProcessPoolExecutor(max_workers=HTML_EXTRACT_WORKERS)
+    else:
+      _extraction_pool = ThreadPoolExecutor(max_workers=HTML_EXTRACT_WORKERS, thread_name_prefix='html-extract')
+
+  return _extraction_pool
+
+async def extract_text_async(html: str, char_budget: int = HTML_EXTRACT_CHAR_BUDGET) -> str:
+  """
+  Extract text from HTML in the extraction pool, keeping the event loop free.
+
+  Args:
+      html: Raw HTML
+      char_budget: Maximum characters of text to return
+
+  Returns:
+      Extracted text
+  """
+  loop = asyncio.get_running_loop()
+  return await loop.run_in_executor(get_extraction_pool(), extract_text, html, char_budget)
@@ -0,0 +1,57 @@
+from typing import Any, Union
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+  import orjson
+except ImportError:
+  orjson = None
+
+class FastJSONProvider(DefaultJSONProvider):
+  """
+  Flask JSON provider that encodes with orjson when it is installed.
+
+  Output matches the default provider: keys are sorted, and dates, decimals
+  and other types orjson does not handle are passed to the default hook.
+  Without orjson the standard library encoder is used.
+  """
+
+  def dumps_bytes(self, obj: Any, indent: bool = False) -> bytes:
+    """
+    Serialize data as UTF-8 JSON.
+
+    Args:
+        obj: Data to serialize
+        indent: Pretty-print with two spaces
+
+    Returns:
+        JSON bytes
+    """
+    if orjson is None:
+      kwargs = {'indent': 2} if indent else {'separators': (',', ':')}
+      return super().dumps(obj, **kwargs).encode('utf-8')
+
+    option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+    if self.sort_keys:
+      option |= orjson.OPT_SORT_KEYS
+    if indent:
+      option |= orjson.OPT_INDENT_2
+    return orjson.dumps(obj, default=self.default, option=option)
+
+  def dumps(self, obj: Any, **kwargs: Any) -> str:
+    """Serialize data as a JSON string, with the standard encoder if json.dumps options are given."""
+    if orjson is None or set(kwargs) - {'indent', 'separators'}:
+      return super().dumps(obj, **kwargs)
+    return self.dumps_bytes(obj, indent=bool(kwargs.get('indent'))).decode('utf-8')
+
+  def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+    """Deserialize JSON."""
+    if orjson is None or kwargs:
+      return super().loads(s, **kwargs)
+    return orjson.loads(s)
+
+  def response(self, *args: Any, **kwargs: Any):
+    """Serialize data to a JSON response without an intermediate string."""
+    obj = self._prepare_response_obj(args, kwargs)
+    indent = (self.compact is None and self._app.debug) or self.compact is False
+    return self._app.response_class(self.dumps_bytes(obj, indent=indent), mimetype=self.mimetype)
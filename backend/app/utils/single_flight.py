@@ -0,0 +1,181 @@
+import asyncio
+import concurrent.futures
+import os
+import threading
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict
+
+from flask import has_app_context
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+
+from app import db
+
+# Namespace for advisory locks taken by this application
+ADVISORY_LOCK_NAMESPACE = 4242
+
+# Seconds to wait for another process before doing the work anyway
+ADVISORY_LOCK_TIMEOUT = float(os.getenv('ADVISORY_LOCK_TIMEOUT', '120'))
+ADVISORY_LOCK_POLL_INTERVAL = 0.2
+
+# Connections per process for holding locks, separate from the query pools
+ADVISORY_LOCK_POOL_SIZE = int(os.getenv('ADVISORY_LOCK_POOL_SIZE', '4'))
+# Seconds to wait for a lock connection before proceeding without the lock
+ADVISORY_LOCK_CONNECT_TIMEOUT = float(os.getenv('ADVISORY_LOCK_CONNECT_TIMEOUT', '2'))
+
+class _LeaderCancelled(Exception):
+  """Result of a call whose leader was cancelled; its followers run the work again."""
+
+class SingleFlight:
+  """
+  Coalesces concurrent calls with the same key into one execution.
+
+  The first caller runs the work and every caller that arrives while it is in
+  flight awaits the same result. Results are shared through
+  concurrent.futures.Future, so callers on different threads and event loops
+  (one per request under Flask) are coalesced too. If the leader is
+  cancelled, e.g. when a streaming client disconnects, its followers are not:
+  one of them takes over the work.
+  """
+
+  def __init__(self):
+    self._lock = threading.Lock()
+    self._calls: Dict[str, concurrent.futures.Future] = {}
+
+  async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Run fn once for all concurrent callers with the same key.
+
+    Args:
+        key: Identity of the work, e.g. "enrich:42"
+        fn: Coroutine function doing the work
+
+    Returns:
+        Result of fn, shared by all coalesced callers
+    """
+    while True:
+      with self._lock:
+        future = self._calls.get(key)
+        leader = future is None
+        if leader:
+          future = concurrent.futures.Future()
+          self._calls[key] = future
+
+      if leader:
+        break
+      try:
+        # Shield so a cancelled follower does not cancel the shared call
+        return await asyncio.shield(asyncio.wrap_future(future))
+      except _LeaderCancelled:
+        continue
+
+    try:
+      result = await fn()
+    except BaseException as e:
+      # The key is released first so followers retrying after a cancellation start a new call
+      self._release(key, future)
+      future.set_exception(_LeaderCancelled() if isinstance(e, asyncio.CancelledError) else e)
+      raise
+    self._release(key, future)
+    future.set_result(result)
+    return result
+
+  def _release(self, key: str, future: concurrent.futures.Future) -> None:
+    """Forget the in-flight call of a key."""
+    with self._lock:
+      if self._calls.get(key) is future:
+        del self._calls[key]
+
+  def in_flight(self) -> int:
+    """Number of keys currently being executed."""
+    with self._lock:
+      return len(self._calls)
+
+# Shared instance, keys are prefixed by the kind of work
+single_flight = SingleFlight()
+
+_lock_engines: Dict[str, Engine] = {}
+_lock_engines_lock = threading.Lock()
+
+def _lock_engine() -> Engine:
+  """
+  Get the engine of lock connections for the current app's database.
+
+  Locks are held for a whole scrape or enrichment, so they get their own
+  small pool; held locks can then never exhaust the pool queries need.
+  """
+  url = db.engine.url
+  key = url.render_as_string(hide_password=False)
+  with _lock_engines_lock:
+    engine = _lock_engines.get(key)
+    if engine is None:
+      engine = _lock_engines[key] = create_engine(
+        url,
+        pool_size=ADVISORY_LOCK_POOL_SIZE,
+        max_overflow=0,
+        pool_timeout=ADVISORY_LOCK_CONNECT_TIMEOUT,
+        pool_pre_ping=True,
+        isolation_level='AUTOCOMMIT'
+      )
+      from app.services.db_pools import monitor_engine
+      monitor_engine('advisory_locks', engine)
+    return engine
+
+@asynccontextmanager
+async def advisory_lock(key: str, timeout: float = ADVISORY_LOCK_TIMEOUT):
+  """
+  Hold a Postgres session advisory lock to coalesce work across processes.
+
+  The lock connection comes from a small dedicated pool and every database
+  call runs in a thread, so neither waiting for a connection nor polling
+  pg_try_advisory_lock blocks the event loop. If no lock connection is free
+  within ADVISORY_LOCK_CONNECT_TIMEOUT the work proceeds without the lock.
+  Outside an app context or on other databases this is a no-op.
+
+  Args:
+      key: Lock key, hashed with hashtext()
+      timeout: Seconds to wait before giving up and proceeding without the lock
+
+  Yields:
+      True if another process held the lock and we had to wait, False otherwise
+  """
+  if not has_app_context() or db.engine.dialect.name != 'postgresql':
+    yield False
+    return
+
+  loop = asyncio.get_running_loop()
+  params = {'namespace': ADVISORY_LOCK_NAMESPACE, 'key': key}
+  try:
+    connection = await loop.run_in_executor(None, _lock_engine().connect)
+  except Exception as e:
+    print(f"Proceeding without advisory lock {key}: {e}")
+    connection = None
+
+  if connection is None:
+    yield False
+    return
+
+  def try_lock():
+    return connection.execute(text("SELECT pg_try_advisory_lock(:namespace, hashtext(:key))"), params).scalar()
+
+  def release(acquired: bool):
+    try:
+      if acquired:
+        connection.execute(text("SELECT pg_advisory_unlock(:namespace, hashtext(:key))"), params)
+    finally:
+      connection.close()
+
+  acquired = False
+  waited = False
+  try:
+    deadline = loop.time() + timeout
+    while True:
+      acquired = await loop.run_in_executor(None, try_lock)
+      if acquired or loop.time() >= deadline:
+        break
+      waited = True
+      await asyncio.sleep(ADVISORY_LOCK_POLL_INTERVAL)
+
+    yield waited
+  finally:
+    await loop.run_in_executor(None, release, acquired)
@@ -0,0 +1,58 @@
+import asyncio
+from typing import AsyncIterator, Iterator, TypeVar
+
+from app.utils.event_loop import run_loop_exit_callbacks
+
+T = TypeVar('T')
+
+_DONE = object()
+
+def iterate_async(iterator: AsyncIterator[T]) -> Iterator[T]:
+  """
+  Consume an async iterator from synchronous code, e.g. a streamed Flask response.
+
+  The iterator runs as one task on a private event loop, so context variables
+  set inside it behave as in a normal coroutine. The loop only runs while the
+  consumer waits for the next item and is closed, with the clients opened on
+  it, when iteration ends or the consumer stops early (such as a client
+  disconnecting).
+
+  Args:
+      iterator: Async iterator to consume
+
+  Yields:
+      Items of the async iterator
+  """
+  loop = asyncio.new_event_loop()
+
+  async def pump(queue: asyncio.Queue):
+    try:
+      async for item in iterator:
+        await queue.put((item, None))
+    except Exception as e:
+      await queue.put((None, e))
+    else:
+      await queue.put((_DONE, None))
+
+  async def start():
+    queue = asyncio.Queue()
+    return queue, asyncio.ensure_future(pump(queue))
+
+  queue, task = loop.run_until_complete(start())
+  try:
+    while True:
+      item, error = loop.run_until_complete(queue.get())
+      if error is not None:
+        raise error
+      if item is _DONE:
+        return
+      yield item
+  finally:
+    try:
+      task.cancel()
+      loop.run_until_complete(asyncio.gather(task, return_exceptions=True))
+      # Close the clients opened on the loop while it still runs
+      loop.run_until_complete(run_loop_exit_callbacks())
+      loop.run_until_complete(loop.shutdown_asyncgens())
+    finally:
+      loop.close()
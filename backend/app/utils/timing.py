@@ -0,0 +1,210 @@
+import contextvars
+import functools
+import os
+import threading
+import time
+from contextlib import nullcontext
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Per-stage timing of requests; when off, spans cost one flag check
+REQUEST_TIMING_ENABLED = os.getenv('REQUEST_TIMING_ENABLED', 'true').lower() == 'true'
+
+# Upper bounds in seconds of the Prometheus histogram buckets
+HISTOGRAM_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+METRIC_PREFIX = 'searcher'
+
+class Histogram:
+  """Cumulative bucket counts, sum and count of durations per label set, in Prometheus layout."""
+
+  def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...], buckets: Tuple[float, ...] = HISTOGRAM_BUCKETS):
+    self.name = name
+    self.help_text = help_text
+    self.label_names = label_names
+    self.buckets = buckets
+    self._lock = threading.Lock()
+    # Label values -> [count per bucket..., count in +Inf, sum]
+    self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+  def observe(self, labels: Tuple[str, ...], value: float) -> None:
+    """Record one duration in seconds."""
+    index = len(self.buckets)
+    for i, bound in enumerate(self.buckets):
+      if value <= bound:
+        index = i
+        break
+
+    with self._lock:
+      series = self._series.get(labels)
+      if series is None:
+        series = self._series[labels] = [0] * (len(self.buckets) + 2)
+      series[index] += 1
+      series[-1] += value
+
+  def render(self) -> List[str]:
+    """Render the histogram in the Prometheus text format."""
+    with self._lock:
+      series = {labels: list(values) for labels, values in self._series.items()}
+
+    lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+    for labels, values in sorted(series.items()):
+      label_text = ','.join(f'{name}="{_escape_label(value)}"' for name, value in zip(self.label_names, labels))
+      separator = ',' if label_text else ''
+      cumulative = 0
+      for bound, count in zip(self.buckets + (float('inf'),), values[:-1]):
+        cumulative += count
+        le = '+Inf' if bound == float('inf') else repr(bound)
+        lines.append(f'{self.name}_bucket{{{label_text}{separator}le="{le}"}} {cumulative}')
+      lines.append(f'{self.name}_sum{{{label_text}}} {values[-1]:.6f}')
+      lines.append(f'{self.name}_count{{{label_text}}} {cumulative}')
+    return lines
+
+def _escape_label(value: str) -> str:
+  """Escape a Prometheus label value."""
+  return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+stage_durations = Histogram(
+  f'{METRIC_PREFIX}_stage_duration_seconds',
+  'Duration of request stages such as SQL generation, queries, scrapes and serialization.',
+  ('stage',)
+)
+request_durations = Histogram(
+  f'{METRIC_PREFIX}_request_duration_seconds',
+  'Duration of HTTP requests.',
+  ('endpoint', 'method', 'status')
+)
+
+# (stage, seconds) spans of the current request, shared with the tasks it starts
+_request_spans: contextvars.ContextVar[Optional[List[Tuple[str, float]]]] = contextvars.ContextVar('request_spans', default=None)
+
+def record_span(stage: str, seconds: float) -> None:
+  """
+  Record the duration of a stage in the stage histogram and the current request.
+
+  Args:
+      stage: Stage name, e.g. sql_generation
+      seconds: Duration in seconds
+  """
+  stage_durations.observe((stage,), seconds)
+  spans = _request_spans.get()
+  if spans is not None:
+    spans.append((stage, seconds))
+
+class _Span:
+  """Context manager recording the duration of its block."""
+
+  __slots__ = ('stage', 'started')
+
+  def __init__(self, stage: str):
+    self.stage = stage
+
+  def __enter__(self):
+    self.started = time.perf_counter()
+    return self
+
+  def __exit__(self, *exc_info):
+    record_span(self.stage, time.perf_counter() - self.started)
+    return False
+
+# Shared no-op span used while timing is disabled
+_NULL_SPAN = nullcontext()
+
+def span(stage: str):
+  """
+  Time a block as a stage of the current request.
+
+  Args:
+      stage: Stage name, e.g. sql_count
+
+  Returns:
+      Context manager
+  """
+  if not REQUEST_TIMING_ENABLED:
+    return _NULL_SPAN
+  return _Span(stage)
+
+def timed(stage: str) -> Callable:
+  """
+  Time every call of a coroutine function as a stage of the current request.
+
+  Args:
+      stage: Stage name, e.g. scrape
+  """
+  def decorator(func):
+    if not REQUEST_TIMING_ENABLED:
+      return func
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+      started = time.perf_counter()
+      try:
+        return await func(*args, **kwargs)
+      finally:
+        record_span(stage, time.perf_counter() - started)
+
+    return wrapper
+
+  return decorator
+
+def register_request_timing(app) -> None:
+  """
+  Collect the stage spans of each request into a Server-Timing header and
+  the request duration histogram.
+
+  Args:
+      app: Flask app
+  """
+  if not REQUEST_TIMING_ENABLED:
+    return
+
+  from flask import g, request
+
+  @app.before_request
+  def start_request_timing():
+    g.request_started = time.perf_counter()
+    g.request_spans = []
+    g.request_spans_token = _request_spans.set(g.request_spans)
+
+  @app.after_request
+  def add_server_timing(response):
+    started = g.pop('request_started', None)
+    spans = g.pop('request_spans', None)
+    token = g.pop('request_spans_token', None)
+    if token is not None:
+      _request_spans.reset(token)
+    if started is None:
+      return response
+
+    total = time.perf_counter() - started
+    request_durations.observe((request.endpoint or 'unknown', request.method, str(response.status_code)), total)
+    response.headers['Server-Timing'] = format_server_timing(spans or [], total)
+    return response
+
+def format_server_timing(spans: List[Tuple[str, float]], total: float) -> str:
+  """
+  Format spans as a Server-Timing header, summing repeated stages.
+
+  Args:
+      spans: (stage, seconds) pairs in the order they finished
+      total: Request duration in seconds
+
+  Returns:
+      Header value, e.g. "sql_generation;dur=812.4, sql_count;dur=3.1, total;dur=830.2"
+  """
+  totals: Dict[str, List[float]] = {}
+  for stage, seconds in spans:
+    entry = totals.setdefault(stage, [0.0, 0])
+    entry[0] += seconds
+    entry[1] += 1
+
+  entries = []
+  for stage, (seconds, count) in totals.items():
+    description = f';desc="{count} calls"' if count > 1 else ''
+    entries.append(f"{stage};dur={seconds * 1000:.1f}{description}")
+  entries.append(f"total;dur={total * 1000:.1f}")
+  return ', '.join(entries)
+
+def render_prometheus() -> str:
+  """Render the stage and request histograms in the Prometheus text format."""
+  lines = stage_durations.render() + request_durations.render()
+  return '\n'.join(lines) + '\n'
@@ -0,0 +1,192 @@
+import re
+from functools import lru_cache
+from typing import List, Optional
+
+from app.utils.html_extractor import HEADING_PREFIX
+
+# Characters per token used when no tokenizer is available
+CHARS_PER_TOKEN = 4
+
+# Lines that carry no information about what a company does
+BOILERPLATE_LINE_PATTERN = re.compile(
+  r'^(?:©|\(c\)|copyright\b)|all rights reserved|\bcookies?\b|privacy policy|terms (?:of|and) (?:use|service|conditions)'
+  r'|^(?:home|menu|search|log ?in|sign ?in|sign ?up|skip to (?:main )?content|back to top|read more|learn more)$',
+  re.IGNORECASE
+)
+
+WHITESPACE_PATTERN = re.compile(r'[ \t\f\v]+')
+
+@lru_cache(maxsize=None)
+def _get_encoding(model: str):
+  """Get the tiktoken encoding of a model, None if it cannot be loaded."""
+  try:
+    import tiktoken
+  except ImportError:
+    return None
+
+  try:
+    return tiktoken.encoding_for_model(model)
+  except KeyError:
+    return tiktoken.get_encoding('cl100k_base')
+  except Exception as e:
+    # Encodings are downloaded on first use and may be unavailable offline
+    print(f"Token counting falls back to estimates for {model}: {e}")
+    return None
+
+def count_tokens(text: str, model: str) -> int:
+  """
+  Count the tokens of a text for a model.
+
+  Uses the model's tiktoken encoding when tiktoken is installed, otherwise
+  estimates about four characters per token.
+
+  Args:
+      text: Text to count
+      model: OpenAI model name
+
+  Returns:
+      Number of tokens
+  """
+  if not text:
+    return 0
+
+  encoding = _get_encoding(model)
+  if encoding is None:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+  return len(encoding.encode(text, disallowed_special=()))
+
+def truncate_to_tokens(text: str, max_tokens: int, model: str) -> str:
+  """
+  Cut a text to at most max_tokens tokens.
+
+  Args:
+      text: Text to cut
+      max_tokens: Maximum number of tokens
+      model: OpenAI model name
+
+  Returns:
+      Text prefix within the limit
+  """
+  if max_tokens <= 0:
+    return ""
+
+  encoding = _get_encoding(model)
+  if encoding is None:
+    return text[:max_tokens * CHARS_PER_TOKEN]
+
+  tokens = encoding.encode(text, disallowed_special=())
+  if len(tokens) <= max_tokens:
+    return text
+  return encoding.decode(tokens[:max_tokens])
+
+def compress_prompt(prompt: str) -> str:
+  """
+  Strip indentation and blank lines from a prompt template.
+
+  Args:
+      prompt: Prompt text, usually an indented triple-quoted string
+
+  Returns:
+      Prompt with one stripped line per non-empty line
+  """
+  lines = (WHITESPACE_PATTERN.sub(' ', line).strip() for line in prompt.splitlines())
+  return '\n'.join(line for line in lines if line)
+
+def compress_text(text: str) -> List[str]:
+  """
+  Normalize extracted website text into lines without boilerplate.
+
+  Whitespace is collapsed, and repeated lines and lines such as copyright or
+  cookie notices are dropped.
+
+  Args:
+      text: Extracted website text, one block per line
+
+  Returns:
+      List of remaining lines
+  """
+  lines = []
+  seen = set()
+  for line in text.splitlines():
+    line = WHITESPACE_PATTERN.sub(' ', line).strip()
+    if not line or line in seen:
+      continue
+    body = line[len(HEADING_PREFIX):] if line.startswith(HEADING_PREFIX) else line
+    if len(body) < 120 and BOILERPLATE_LINE_PATTERN.search(body):
+      continue
+    seen.add(line)
+    lines.append(line)
+  return lines
+
+def fit_text(text: str, max_tokens: int, model: str) -> str:
+  """
+  Select the most informative parts of website text within a token budget.
+
+  Text is split into sections at "## " headings. Headings and the first
+  paragraph of each section are taken first, in page order, then the
+  remaining paragraphs fill what is left of the budget. The selection is
+  returned in page order.
+
+  Args:
+      text: Extracted website text
+      max_tokens: Token budget for the returned text
+      model: OpenAI model name used to count tokens
+
+  Returns:
+      Selected text, one block per line
+  """
+  lines = compress_text(text or "")
+  if not lines or max_tokens <= 0:
+    return ""
+
+  joined = '\n'.join(lines)
+  if count_tokens(joined, model) <= max_tokens:
+    return joined
+
+  # Rank lines: headings and first paragraphs before the rest of each section
+  first_pass = []
+  second_pass = []
+  paragraphs_in_section = 0
+  for index, line in enumerate(lines):
+    if line.startswith(HEADING_PREFIX):
+      first_pass.append(index)
+      paragraphs_in_section = 0
+    elif paragraphs_in_section == 0:
+      first_pass.append(index)
+      paragraphs_in_section = 1
+    else:
+      second_pass.append(index)
+
+  selected = {}
+  remaining = max_tokens
+  for index in first_pass + second_pass:
+    if remaining <= 0:
+      break
+    # One extra token for the newline joining the lines
+    tokens = count_tokens(lines[index], model) + 1
+    if tokens <= remaining:
+      selected[index] = lines[index]
+      remaining -= tokens
+    elif not lines[index].startswith(HEADING_PREFIX) and remaining > 20:
+      # Keep the beginning of a long paragraph rather than skipping it
+      selected[index] = truncate_to_tokens(lines[index], remaining - 1, model)
+      remaining = 0
+
+  return '\n'.join(selected[index] for index in sorted(selected))
+
+def format_fields(fields: List[tuple]) -> str:
+  """
+  Format labelled values as prompt lines, leaving out empty values.
+
+  Args:
+      fields: List of (label, value) tuples
+
+  Returns:
+      Lines of "- label: value"
+  """
+  return '\n'.join(f"- {label}: {value}" for label, value in fields if value not in (None, '', 'None'))
+
+def join_nonempty(values: List[Optional[str]], separator: str = ', ') -> str:
+  """Join the values that are not empty."""
+  return separator.join(str(value) for value in values if value not in (None, ''))
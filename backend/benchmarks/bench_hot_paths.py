@@ -0,0 +1,216 @@
+"""
+Microbenchmarks of the backend hot paths.
+
+Loads synthetic companies (see synthetic_companies.py) into the configured
+database if it holds fewer than --rows, then times filter searches, generated
+SQL execution, serialization of a 100 company page, HTML extraction, URL
+helpers and request argument parsing. Results are written as JSON; with
+--baseline the run is compared with an earlier one and exits with status 1
+when a case regressed by more than --max-regression.
+
+Usage: python benchmarks/bench_hot_paths.py --rows 1000000 --baseline benchmarks/results/hot_paths-<timestamp>.json
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+# Query log writes would run alongside the measured queries
+os.environ.setdefault('SQL_QUERY_LOG_ENABLED', 'false')
+
+from common import compare_results, summarize, write_results
+from bench_html_extraction import SYNTHETIC_SIZES, synthetic_page
+from synthetic_companies import SYNTHETIC_DOMAIN, generate_companies, load_synthetic_companies
+
+# Filter combinations of GET /api/companies/search: (filters, AI filters, page)
+SEARCH_CASES = {
+  'industry': ({'industry': 'software'}, None, 1),
+  'country_size': ({'country': 'united kingdom', 'size': '11-50'}, None, 1),
+  'name': ({'name': 'acme'}, None, 1),
+  'founded_range': ({'founded_from': '2015', 'founded_to': '2020'}, None, 1),
+  'industry_country_founded': ({'industry': 'health', 'country': 'united states', 'founded_from': '2010'}, None, 1),
+  'locality_rare': ({'locality': 'gothenburg'}, None, 1),
+  'industry_deep_page': ({'industry': 'software'}, None, 50),
+  'ai_filters': (None, {'industry': 'software', 'country': 'germany'}, 1),
+}
+
+# SQL in the shape the SQL generation prompt produces
+SQL_CASES = {
+  'ilike_and': "SELECT * FROM companies WHERE industry ILIKE '%software%' AND country ILIKE '%united states%'",
+  'range_in_order': "SELECT * FROM companies WHERE founded >= 2018 AND size IN ('1-10', '11-50') ORDER BY founded DESC",
+  'or_group': "SELECT * FROM companies WHERE (industry ILIKE '%health%' OR industry ILIKE '%biotech%') AND locality ILIKE '%boston%'",
+  'name_order': "SELECT * FROM companies WHERE name ILIKE '%labs%' ORDER BY name",
+  'large_size': "SELECT * FROM companies WHERE size IN ('5001-10000', '10001+') AND founded < 1990",
+}
+
+FILTER_FIELDS = ['name', 'industry', 'country', 'region', 'size', 'locality', 'founded_from', 'founded_to']
+
+def measure(func, runs: int, warmup: int = 1):
+  """Time runs calls of func after warmup untimed calls."""
+  for _ in range(warmup):
+    func()
+  timings = []
+  for _ in range(runs):
+    started = time.perf_counter()
+    func()
+    timings.append(time.perf_counter() - started)
+  return timings
+
+def report(results: dict, group: str, case: str, timings, **extra) -> None:
+  """Summarize one case into the results and print it."""
+  results.setdefault(group, {})[case] = {**summarize(timings), **extra}
+  summary = results[group][case]
+  print(f"{group:>14} {case:<28} p50 {summary['p50_ms']:9.3f} ms  p95 {summary['p95_ms']:9.3f} ms")
+
+def sample_urls(count: int, rng: random.Random):
+  """URLs in the forms found in company data: bare domains, www, schemes, paths and trailing slashes."""
+  urls = []
+  for company in generate_companies(count, seed=7):
+    domain = company['website'].replace(SYNTHETIC_DOMAIN, rng.choice(['com', 'io', 'co.uk', 'de']))
+    form = rng.randrange(5)
+    if form == 0:
+      urls.append(domain)
+    elif form == 1:
+      urls.append(f"www.{domain}")
+    elif form == 2:
+      urls.append(f"https://www.{domain.upper()}/")
+    elif form == 3:
+      urls.append(f"http://{domain}/about/team/?ref=home#contact")
+    else:
+      urls.append(f"  https://{domain}/products  ")
+  return urls
+
+def sample_request_args(count: int, rng: random.Random):
+  """Query strings of search requests, including empty and malformed values."""
+  from werkzeug.datastructures import MultiDict
+
+  samples = []
+  for _ in range(count):
+    args = MultiDict()
+    if rng.random() < 0.7:
+      args['page'] = rng.choice(['1', '2', '17', '0', '-3', 'abc', ''])
+    if rng.random() < 0.5:
+      args['per_page'] = rng.choice(['10', '25', '100', '500', 'x'])
+    for field in rng.sample(FILTER_FIELDS, rng.randint(0, 4)):
+      args[field] = rng.choice(['software', 'united states', '', '2015', 'london'])
+    args['q'] = rng.choice(['', 'fintech startups in london'])
+    samples.append(args)
+  return samples
+
+def bench_search(results: dict, runs: int) -> None:
+  from app.services.company_service import CompanyService
+
+  for case, (filters, ai_filters, page) in SEARCH_CASES.items():
+    total = CompanyService.search_companies(page=page, per_page=10, filters=filters, ai_filters=ai_filters)[1]
+    timings = measure(
+      lambda: CompanyService.search_companies(page=page, per_page=10, filters=filters, ai_filters=ai_filters),
+      runs
+    )
+    report(results, 'search', case, timings, matches=total)
+
+def bench_sql(results: dict, runs: int) -> None:
+  from app.services.company_service import CompanyService
+
+  for case, sql in SQL_CASES.items():
+    total = CompanyService.execute_sql_query(sql, page=1, per_page=10)[1]
+    timings = measure(lambda: CompanyService.execute_sql_query(sql, page=1, per_page=10), runs)
+    report(results, 'execute_sql', case, timings, matches=total)
+
+def bench_serialization(app, results: dict, runs: int) -> None:
+  from app.models import Company
+  from app.utils.helpers import create_response
+
+  companies = Company.query.filter(Company.website.like(f'%.{SYNTHETIC_DOMAIN}')).limit(100).all()
+  dicts = [company.to_dict() for company in companies]
+  report(results, 'serialize', 'to_dict_x100', measure(lambda: [company.to_dict() for company in companies], runs * 10))
+
+  def respond():
+    response, _ = create_response({'companies': dicts, 'total': 1000000, 'pages': 10000, 'current_page': 1})
+    return response.get_data()
+
+  with app.test_request_context():
+    report(results, 'serialize', 'jsonify_x100', measure(respond, runs * 10), bytes=len(respond()))
+
+def bench_html(results: dict, runs: int) -> None:
+  from app.services.ai_service import AIService
+
+  ai_service = AIService(api_key='benchmark')
+  rng = random.Random(42)
+  for size in SYNTHETIC_SIZES:
+    html = synthetic_page(size, rng)
+    report(results, 'html', f"process_html_{size // 1000}kb", measure(lambda: ai_service._process_html_content(html), runs))
+
+def bench_url_utils(results: dict, runs: int, count: int) -> None:
+  from app.utils.url_utils import UrlUtils
+
+  urls = sample_urls(count, random.Random(42))
+  pairs = list(zip(urls, reversed(urls)))
+  cases = {
+    'validate_url': lambda: [UrlUtils.validate_url(url) for url in urls],
+    'normalize_url': lambda: [UrlUtils.normalize_url(url) for url in urls],
+    'extract_domain': lambda: [UrlUtils.extract_domain(url) for url in urls],
+    'get_base_url': lambda: [UrlUtils.get_base_url(url) for url in urls],
+    'is_same_domain': lambda: [UrlUtils.is_same_domain(first, second) for first, second in pairs],
+  }
+  for case, func in cases.items():
+    report(results, 'url_utils', f"{case}_x{count}", measure(func, runs))
+
+def bench_request_args(results: dict, runs: int, count: int) -> None:
+  from app.utils.helpers import parse_request_args, validate_pagination
+
+  samples = sample_request_args(count, random.Random(42))
+  cases = {
+    'validate_pagination': lambda: [validate_pagination(args.get('page'), args.get('per_page')) for args in samples],
+    'parse_request_args': lambda: [parse_request_args(args, FILTER_FIELDS) for args in samples],
+  }
+  for case, func in cases.items():
+    report(results, 'request_args', f"{case}_x{count}", measure(func, runs))
+
+GROUPS = ('search', 'execute_sql', 'serialize', 'html', 'url_utils', 'request_args')
+
+def main(args):
+  from app import create_app
+
+  groups = args.only or GROUPS
+  app = create_app()
+  results = {}
+  with app.app_context():
+    if {'search', 'execute_sql', 'serialize'} & set(groups):
+      load_synthetic_companies(args.rows, seed=args.seed)
+
+    if 'search' in groups:
+      bench_search(results, args.runs)
+    if 'execute_sql' in groups:
+      bench_sql(results, args.runs)
+    if 'serialize' in groups:
+      bench_serialization(app, results, args.runs)
+    if 'html' in groups:
+      bench_html(results, args.runs)
+    if 'url_utils' in groups:
+      bench_url_utils(results, args.runs, args.bulk)
+    if 'request_args' in groups:
+      bench_request_args(results, args.runs, args.bulk)
+
+  path = write_results('hot_paths', {
+    'config': {key: value for key, value in vars(args).items() if key not in ('output', 'baseline')},
+    'cases': results
+  }, args.output)
+  print(f"Results written to {path}")
+
+  if args.baseline:
+    regressions = compare_results(args.baseline, path, args.max_regression)
+    if regressions:
+      sys.exit(1)
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description='Microbenchmark the backend hot paths.')
+  parser.add_argument('--rows', type=int, default=1_000_000, help='Synthetic companies the database should hold.')
+  parser.add_argument('--seed', type=int, default=42, help='Random seed of the synthetic companies.')
+  parser.add_argument('--runs', type=int, default=20, help='Timed runs per case.')
+  parser.add_argument('--bulk', type=int, default=10000, help='Inputs per run of the URL and request argument cases.')
+  parser.add_argument('--only', nargs='+', choices=GROUPS, default=None, help='Only run these groups.')
+  parser.add_argument('--baseline', type=str, default=None, help='Results file to compare with.')
+  parser.add_argument('--max-regression', type=float, default=0.2, help='Allowed p50 slowdown against the baseline, 0.2 = 20%%.')
+  parser.add_argument('--output', type=str, default=None, help='Path of the JSON results file.')
+  main(parser.parse_args())
@@ -0,0 +1,114 @@
+"""
+Benchmark HTML text extraction on a corpus of saved pages.
+
+Compares the previous BeautifulSoup/html.parser extraction with the bounded
+lxml extractor. Without --corpus a synthetic corpus of pages from 50 KB to
+5 MB is generated.
+
+Usage: python benchmarks/bench_html_extraction.py --corpus path/to/html --runs 5
+"""
+import argparse
+import glob
+import os
+import random
+import time
+
+from common import summarize, write_results
+
+from app.utils.html_extractor import extract_text
+
+SYNTHETIC_SIZES = [50_000, 500_000, 2_000_000, 5_000_000]
+
+WORDS = (
+  "our company builds software solutions for customers in logistics retail healthcare finance "
+  "team mission products services platform cloud data analytics industry clients founded global"
+).split()
+
+def legacy_extract(html: str) -> str:
+  """Extraction as done before the bounded extractor (full parse with html.parser)."""
+  from bs4 import BeautifulSoup
+  
+  soup = BeautifulSoup(html, 'html.parser')
+  for script in soup(["script", "style"]):
+    script.decompose()
+  text = soup.get_text()
+  lines = (line.strip() for line in text.splitlines())
+  chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+  return ' '.join(chunk for chunk in chunks if chunk)
+
+def synthetic_page(size: int, rng: random.Random) -> str:
+  """Generate a company page of roughly the given size with realistic page chrome."""
+  def sentence():
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(8, 20))).capitalize() + '.'
+  
+  parts = [
+    '<!doctype html><html><head><title>Company</title>',
+    '<script>' + 'var tracking = {};' * 200 + '</script>',
+    '<style>' + '.c{color:red}' * 200 + '</style></head><body>',
+    '<nav class="navbar">' + ''.join(f'<a href="/p{i}">Link {i}</a>' for i in range(50)) + '</nav>',
+    '<div id="cookie-banner">We use cookies to improve your experience.</div>',
+    '<main>'
+  ]
+  length = sum(len(part) for part in parts)
+  section = 0
+  while length < size:
+    block = f'<section><h2>Section {section}</h2>' + ''.join(f'<p>{sentence()}</p>' for _ in range(5)) + '</section>'
+    block += '<script>' + 'x();' * 100 + '</script>'
+    parts.append(block)
+    length += len(block)
+    section += 1
+  parts.append('</main><footer>' + '<p>Copyright</p>' * 20 + '</footer></body></html>')
+  return ''.join(parts)
+
+def load_corpus(corpus_dir: str = None):
+  """Load saved pages, or generate the synthetic corpus."""
+  if corpus_dir:
+    pages = []
+    for path in sorted(glob.glob(os.path.join(corpus_dir, '**', '*.htm*'), recursive=True)):
+      with open(path, 'r', errors='replace') as f:
+        pages.append((os.path.relpath(path, corpus_dir), f.read()))
+    return pages
+  
+  rng = random.Random(42)
+  return [(f"synthetic-{size // 1000}kb.html", synthetic_page(size, rng)) for size in SYNTHETIC_SIZES]
+
+def time_extractor(extractor, html: str, runs: int):
+  timings = []
+  text = ""
+  for _ in range(runs):
+    start = time.perf_counter()
+    text = extractor(html)
+    timings.append(time.perf_counter() - start)
+  return timings, len(text)
+
+def main(corpus_dir: str, runs: int, output: str = None):
+  pages = load_corpus(corpus_dir)
+  
+  try:
+    import bs4  # noqa: F401
+    extractors = {'legacy_html_parser': legacy_extract, 'bounded_lxml': extract_text}
+  except ImportError:
+    print("beautifulsoup4 not installed, only benchmarking the bounded extractor")
+    extractors = {'bounded_lxml': extract_text}
+  
+  results = {}
+  totals = {name: [] for name in extractors}
+  for name, html in pages:
+    results[name] = {'bytes': len(html)}
+    for extractor_name, extractor in extractors.items():
+      timings, chars = time_extractor(extractor, html, runs)
+      totals[extractor_name].extend(timings)
+      results[name][extractor_name] = {**summarize(timings), 'chars': chars}
+      print(f"{name:>28} {extractor_name:>20}: p50 {results[name][extractor_name]['p50_ms']:9.2f} ms, {chars} chars")
+  
+  results['all_pages'] = {extractor_name: summarize(timings) for extractor_name, timings in totals.items()}
+  print(f"Results written to {write_results('html_extraction', results, output)}")
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description='Benchmark HTML text extraction.')
+  parser.add_argument('--corpus', type=str, default=None, help='Directory of saved .html files.')
+  parser.add_argument('--runs', type=int, default=5, help='Extractions per page and extractor.')
+  parser.add_argument('--output', type=str, default=None, help='Path of the JSON results file.')
+  args = parser.parse_args()
+  
+  main(args.corpus, args.runs, args.output)
@@ -0,0 +1,52 @@
+"""
+Compare the Playwright render profiles on the local fixture site.
+
+Usage: python benchmarks/bench_render_profiles.py --runs 5
+"""
+import argparse
+import asyncio
+import time
+
+from common import summarize, write_results
+from fixture_site import start_fixture_site
+
+from app.services.ai_service import AIService, RENDER_PROFILES
+
+async def run_profile(ai_service: AIService, base_url: str, profile: str, runs: int):
+  """Render the fixture page repeatedly with one profile."""
+  timings = []
+  chars = []
+  errors = 0
+  
+  for i in range(runs):
+    start = time.perf_counter()
+    text, error, _ = await ai_service._fetch_rendered(f"{base_url}/company-{i}", profile)
+    timings.append(time.perf_counter() - start)
+    chars.append(len(text))
+    if error:
+      errors += 1
+  
+  return {**summarize(timings), 'errors': errors, 'min_chars': min(chars), 'max_chars': max(chars)}
+
+async def main(runs: int, output: str = None):
+  server = start_fixture_site()
+  base_url = f"http://127.0.0.1:{server.server_address[1]}"
+  ai_service = AIService(api_key='benchmark')
+  
+  results = {}
+  try:
+    for profile in RENDER_PROFILES:
+      results[profile] = await run_profile(ai_service, base_url, profile, runs)
+      print(f"{profile:>5}: {results[profile]}")
+  finally:
+    server.shutdown()
+  
+  print(f"Results written to {write_results('render_profiles', results, output)}")
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description='Benchmark Playwright render profiles.')
+  parser.add_argument('--runs', type=int, default=5, help='Renders per profile.')
+  parser.add_argument('--output', type=str, default=None, help='Path of the JSON results file.')
+  args = parser.parse_args()
+  
+  asyncio.run(main(args.runs, args.output))
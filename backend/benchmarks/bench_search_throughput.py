@@ -0,0 +1,160 @@
+"""
+Compare concurrent search throughput with per-request and persistent event loops.
+
+Runs offline against the fake OpenAI API. Each mode serves the app and keeps
+--concurrency clients sending /api/companies/search requests back to back
+for --duration seconds after --warmup seconds of unmeasured requests.
+Queries are unique so single-flight coalescing does not merge them, and the
+OpenAI rate limits are raised (unless OPENAI_RATE_LIMITS is set) so the
+serving mode, not the limiter, is measured.
+
+Modes:
+  per-request  Flask's default, a new event loop per async view (threaded dev server)
+  persistent   PERSISTENT_EVENT_LOOP, one event loop for the process (threaded dev server)
+  gunicorn     gunicorn.conf.py with --workers preforked workers
+
+Usage: python benchmarks/bench_search_throughput.py --concurrency 32 --duration 15
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+from common import summarize, write_results
+from fake_openai import LatencyProfile, start_fake_openai
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODES = ('per-request', 'persistent', 'gunicorn')
+BENCHMARK_RATE_LIMITS = {
+  model: {'rpm': 1000000, 'tpm': 100000000, 'max_concurrency': 512}
+  for model in ('gpt-4', 'gpt-3.5-turbo')
+}
+
+async def drive(base_url: str, concurrency: int, duration: float, warmup: float) -> dict:
+  """Keep concurrency clients searching for warmup + duration seconds, measuring after the warm-up."""
+  import httpx
+
+  counter = itertools.count()
+  latencies = []
+  errors = {}
+  measure_from = time.perf_counter() + warmup
+  deadline = measure_from + duration
+
+  async def client_loop(client):
+    while time.perf_counter() < deadline:
+      started = time.perf_counter()
+      try:
+        response = await client.get(f"/api/companies/search?q=software companies {next(counter)}&per_page=10")
+        error = str(response.status_code) if response.status_code >= 400 else None
+      except Exception as e:
+        error = e.__class__.__name__
+      # Requests sent while workers import modules and open connections are not counted
+      if started < measure_from:
+        continue
+      if error:
+        errors[error] = errors.get(error, 0) + 1
+      else:
+        latencies.append(time.perf_counter() - started)
+
+  limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+  async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+    await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+  elapsed = time.perf_counter() - measure_from
+
+  return {**summarize(latencies), 'throughput_rps': round(len(latencies) / elapsed, 2), 'errors': errors}
+
+def run_in_process(mode: str, concurrency: int, duration: float, warmup: float) -> dict:
+  """Serve the app with the threaded dev server in one event loop mode."""
+  from werkzeug.serving import make_server
+  import threading
+
+  from app import create_app
+
+  app = create_app()
+  app.config['PERSISTENT_EVENT_LOOP'] = mode == 'persistent'
+  server = make_server('127.0.0.1', 0, app, threaded=True)
+  threading.Thread(target=server.serve_forever, daemon=True).start()
+  try:
+    return asyncio.run(drive(f"http://127.0.0.1:{server.server_port}", concurrency, duration, warmup))
+  finally:
+    server.shutdown()
+    if mode == 'persistent':
+      from app.utils.event_loop import worker_loop
+      worker_loop.stop()
+
+def run_gunicorn(workers: int, threads: int, concurrency: int, duration: float, warmup: float) -> dict:
+  """Serve the app with gunicorn.conf.py in a subprocess."""
+  with socket.socket() as sock:
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+
+  env = dict(
+    os.environ,
+    FLASK_CONFIG='app.config.DevelopmentConfig',
+    PERSISTENT_EVENT_LOOP='true',
+    GUNICORN_BIND=f"127.0.0.1:{port}",
+    WEB_CONCURRENCY=str(workers),
+    GUNICORN_THREADS=str(threads),
+    GUNICORN_ACCESS_LOG='/dev/null'
+  )
+  process = subprocess.Popen(
+    [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'],
+    cwd=BACKEND_DIR,
+    env=env,
+    stdout=subprocess.DEVNULL
+  )
+  try:
+    # Wait for the workers to accept connections
+    for _ in range(100):
+      try:
+        socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+        break
+      except OSError:
+        time.sleep(0.1)
+    time.sleep(1)
+    return asyncio.run(drive(f"http://127.0.0.1:{port}", concurrency, duration, warmup))
+  finally:
+    process.terminate()
+    process.wait(30)
+
+def main(args):
+  profile = LatencyProfile(args.llm_latency, args.llm_jitter)
+  openai_server = start_fake_openai(profile=profile)
+  os.environ['OPENAI_BASE_URL'] = f"http://127.0.0.1:{openai_server.server_address[1]}/v1"
+  os.environ['OPENAI_API_KEY'] = 'benchmark'
+  os.environ.setdefault('OPENAI_RATE_LIMITS', json.dumps(BENCHMARK_RATE_LIMITS))
+
+  results = {}
+  try:
+    for mode in [mode.strip() for mode in args.modes.split(',') if mode.strip()]:
+      if mode == 'gunicorn':
+        results[mode] = run_gunicorn(args.workers, args.threads, args.concurrency, args.duration, args.warmup)
+      else:
+        results[mode] = run_in_process(mode, args.concurrency, args.duration, args.warmup)
+      print(f"{mode:>11}: {results[mode]}")
+  finally:
+    openai_server.shutdown()
+
+  path = write_results('search_throughput', {
+    'config': {key: value for key, value in vars(args).items() if key != 'output'},
+    'modes': results
+  }, args.output)
+  print(f"Results written to {path}")
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description='Benchmark concurrent search throughput per serving mode.')
+  parser.add_argument('--modes', type=str, default=','.join(MODES), help='Comma separated modes to run.')
+  parser.add_argument('--concurrency', type=int, default=32, help='Concurrent clients.')
+  parser.add_argument('--duration', type=float, default=15, help='Seconds per mode.')
+  parser.add_argument('--warmup', type=float, default=3, help='Seconds of unmeasured requests before each mode.')
+  parser.add_argument('--workers', type=int, default=4, help='Gunicorn workers.')
+  parser.add_argument('--threads', type=int, default=16, help='Gunicorn threads per worker.')
+  parser.add_argument('--llm-latency', type=float, default=0.3, help='Fake OpenAI latency in seconds.')
+  parser.add_argument('--llm-jitter', type=float, default=0.05, help='Fake OpenAI latency jitter in seconds.')
+  parser.add_argument('--output', type=str, default=None, help='Path of the JSON results file.')
+  main(parser.parse_args())
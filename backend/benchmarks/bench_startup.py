@@ -0,0 +1,116 @@
+"""
+Benchmark cold start: time and RSS of importing the app, create_app() and the first request.
+
+Each run starts a fresh interpreter that imports the app, creates it, optionally
+runs the production warm-up, and serves GET /api/companies/<id> through the test
+client. Heavy modules already loaded after create_app() are listed so lazy
+imports that regress are easy to spot.
+
+Usage: python benchmarks/bench_startup.py --runs 10 --warmup
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from common import write_results
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that should only be loaded when first needed
+HEAVY_MODULES = ('openai', 'httpx', 'playwright', 'lxml', 'tiktoken', 'alembic', 'bs4', 'asyncpg')
+
+CHILD_SCRIPT = '''
+import json, sys, time
+
+def rss_mb():
+  with open('/proc/self/status') as f:
+    for line in f:
+      if line.startswith('VmRSS:'):
+        return round(int(line.split()[1]) / 1024, 1)
+
+result = {}
+started = time.perf_counter()
+from app import create_app
+result['import_ms'] = (time.perf_counter() - started) * 1000
+result['import_rss_mb'] = rss_mb()
+
+started = time.perf_counter()
+app = create_app()
+result['create_app_ms'] = (time.perf_counter() - started) * 1000
+result['create_app_rss_mb'] = rss_mb()
+result['loaded'] = [name for name in HEAVY_MODULES if name in sys.modules]
+
+if WARMUP:
+  from app import warm_up
+  started = time.perf_counter()
+  warm_up(app)
+  result['warm_up_ms'] = (time.perf_counter() - started) * 1000
+  result['warm_up_rss_mb'] = rss_mb()
+
+started = time.perf_counter()
+response = app.test_client().get('/api/companies/COMPANY_ID')
+result['first_request_ms'] = (time.perf_counter() - started) * 1000
+result['first_request_status'] = response.status_code
+result['first_request_rss_mb'] = rss_mb()
+
+if WARMUP and app.config.get('PERSISTENT_EVENT_LOOP'):
+  from app.utils.event_loop import worker_loop
+  worker_loop.stop()
+
+print(json.dumps(result))
+'''
+
+def run_once(warmup: bool, company_id: int) -> dict:
+  """Measure one cold start in a fresh interpreter."""
+  script = (
+    CHILD_SCRIPT
+    .replace('HEAVY_MODULES', repr(HEAVY_MODULES))
+    .replace('WARMUP', repr(warmup))
+    .replace('COMPANY_ID', str(company_id))
+  )
+  output = subprocess.run(
+    [sys.executable, '-c', script],
+    cwd=BACKEND_DIR,
+    capture_output=True,
+    text=True,
+    check=True
+  ).stdout
+  return json.loads(output.strip().splitlines()[-1])
+
+def aggregate(runs: list) -> dict:
+  """Median of each numeric measurement across runs."""
+  summary = {}
+  for key, value in runs[0].items():
+    if isinstance(value, (int, float)) and not isinstance(value, bool) and not key.endswith('_status'):
+      summary[key] = round(statistics.median(run[key] for run in runs), 1)
+    else:
+      summary[key] = value
+  return summary
+
+def main(args):
+  modes = {'cold': False}
+  if args.warmup:
+    modes['warm_up'] = True
+
+  results = {}
+  for mode, warmup in modes.items():
+    runs = [run_once(warmup, args.company_id) for _ in range(args.runs)]
+    results[mode] = aggregate(runs)
+    print(f"{mode:>8}: {results[mode]}")
+
+  path = write_results('startup', {
+    'config': {key: value for key, value in vars(args).items() if key != 'output'},
+    'modes': results
+  }, args.output)
+  print(f"Results written to {path}")
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description='Benchmark app startup time and memory.')
+  parser.add_argument('--runs', type=int, default=10, help='Fresh interpreters per mode.')
+  parser.add_argument('--warmup', action='store_true', help='Also measure with the production warm-up.')
+  parser.add_argument('--company-id', type=int, default=1, help='Company requested as the first request.')
+  parser.add_argument('--output', type=str, default=None, help='Path of the JSON results file.')
+  main(parser.parse_args())
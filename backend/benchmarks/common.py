@@ -0,0 +1,125 @@
+"""Shared helpers for the benchmark scripts."""
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Dict, List
+
+# Add parent directory to path to import app
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+def summarize(samples: List[float]) -> Dict:
+  """
+  Summarize a list of timings in seconds.
+  
+  Args:
+      samples: Timings in seconds
+      
+  Returns:
+      Dictionary of count, mean, min, p50, p95, p99 and max in milliseconds
+  """
+  if not samples:
+    return {'count': 0}
+  
+  ordered = sorted(samples)
+  
+  def percentile(p):
+    index = min(len(ordered) - 1, max(0, math.ceil(p / 100 * len(ordered)) - 1))
+    return ordered[index] * 1000
+  
+  return {
+    'count': len(ordered),
+    'mean_ms': round(statistics.fmean(ordered) * 1000, 3),
+    'min_ms': round(ordered[0] * 1000, 3),
+    'p50_ms': round(percentile(50), 3),
+    'p95_ms': round(percentile(95), 3),
+    'p99_ms': round(percentile(99), 3),
+    'max_ms': round(ordered[-1] * 1000, 3)
+  }
+
+def write_results(name: str, results: Dict, path: str = None) -> str:
+  """
+  Write benchmark results as JSON with some environment details.
+  
+  Args:
+      name: Benchmark name, used for the default file name
+      results: Results dictionary
+      path: Output path, defaults to results/<name>-<timestamp>.json
+      
+  Returns:
+      Path of the written file
+  """
+  if not path:
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+  
+  payload = {
+    'benchmark': name,
+    'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    'python': platform.python_version(),
+    'platform': platform.platform(),
+    'cpu_count': os.cpu_count(),
+    'results': results
+  }
+  
+  with open(path, 'w') as f:
+    json.dump(payload, f, indent=2)
+  
+  return path
+
+def _timing_summaries(results: Dict, prefix: str = '') -> Dict[str, Dict]:
+  """Flatten nested results into path -> timing summary."""
+  summaries = {}
+  for key, value in results.items():
+    if not isinstance(value, dict):
+      continue
+    path = f"{prefix}/{key}" if prefix else key
+    if 'p50_ms' in value:
+      summaries[path] = value
+    else:
+      summaries.update(_timing_summaries(value, path))
+  return summaries
+
+def compare_results(
+  baseline_path: str,
+  current_path: str,
+  max_regression: float = 0.2,
+  metric: str = 'p50_ms',
+  min_delta_ms: float = 0.05
+) -> List[str]:
+  """
+  Compare the timings of two results files of the same benchmark and print the changes.
+  
+  Args:
+      baseline_path: Earlier results file
+      current_path: New results file
+      max_regression: Allowed relative slowdown, 0.2 = 20%
+      metric: Summary field to compare
+      min_delta_ms: Smaller absolute slowdowns are treated as noise
+      
+  Returns:
+      Paths of the cases that regressed
+  """
+  with open(baseline_path) as f:
+    baseline = _timing_summaries(json.load(f)['results'])
+  with open(current_path) as f:
+    current = _timing_summaries(json.load(f)['results'])
+  
+  regressions = []
+  for path, summary in current.items():
+    if path not in baseline or not baseline[path].get(metric):
+      continue
+    before, after = baseline[path][metric], summary[metric]
+    change = (after - before) / before
+    regressed = change > max_regression and after - before > min_delta_ms
+    if regressed:
+      regressions.append(path)
+    print(f"{path:<48} {before:10.3f} -> {after:10.3f} ms {change:+8.1%}{'  REGRESSION' if regressed else ''}")
+  
+  print(f"{len(regressions)} of {len(current)} cases regressed by more than {max_regression:.0%} ({metric})")
+  return regressions
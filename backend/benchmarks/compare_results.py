@@ -0,0 +1,23 @@
+"""
+Compare two results files of the same benchmark and flag regressions.
+
+Exits with status 1 when a case is slower than the baseline by more than
+--max-regression.
+
+Usage: python benchmarks/compare_results.py results/hot_paths-old.json results/hot_paths-new.json
+"""
+import argparse
+import sys
+
+from common import compare_results
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description='Compare two benchmark results files.')
+  parser.add_argument('baseline', help='Earlier results file.')
+  parser.add_argument('current', help='New results file.')
+  parser.add_argument('--max-regression', type=float, default=0.2, help='Allowed slowdown, 0.2 = 20%%.')
+  parser.add_argument('--metric', default='p50_ms', help='Summary field to compare, e.g. p95_ms.')
+  args = parser.parse_args()
+  
+  if compare_results(args.baseline, args.current, args.max_regression, args.metric):
+    sys.exit(1)
@@ -0,0 +1,182 @@
+"""
+Local stand-in for the OpenAI chat completions API.
+
+Answers POST /v1/chat/completions with canned SQL, filter, summary and
+batched summary responses after a configurable latency, including streamed
+responses. Point the app at it with OPENAI_BASE_URL=http://host:port/v1.
+Run directly to serve it on a fixed port.
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CANNED_SQL = "SELECT * FROM companies WHERE industry ILIKE '%software%'"
+CANNED_FILTERS = {'industry': 'software', 'country': 'united states'}
+CANNED_SUMMARY = (
+  "The company builds autonomous warehouse systems for logistics customers. "
+  "It serves manufacturing, retail and healthcare clients with products that reduce picking errors."
+)
+
+class LatencyProfile:
+  """Response latency: a base delay with jitter and an occasional slow tail."""
+
+  def __init__(self, latency: float = 0.2, jitter: float = 0.05, tail_rate: float = 0.0, tail_latency: float = 5.0):
+    self.latency = latency
+    self.jitter = jitter
+    self.tail_rate = tail_rate
+    self.tail_latency = tail_latency
+
+  def sample(self) -> float:
+    """Draw the delay of one response in seconds."""
+    if self.tail_rate and random.random() < self.tail_rate:
+      return self.tail_latency
+    return max(0.0, self.latency + random.uniform(-self.jitter, self.jitter))
+
+def canned_answer(body: dict) -> str:
+  """
+  Pick a canned answer for a chat completion request.
+
+  Args:
+      body: Request body
+
+  Returns:
+      Completion content
+  """
+  messages = body.get('messages', [])
+  prompt = messages[-1].get('content', '') if messages else ''
+  system = ' '.join(message.get('content', '') for message in messages if message.get('role') == 'system')
+
+  if 'SQL' in system:
+    return CANNED_SQL
+  if (body.get('response_format') or {}).get('type') == 'json_object':
+    ids = [int(match) for match in re.findall(r'Company id: (\d+)', prompt)]
+    return json.dumps({'summaries': [{'id': index, 'summary': CANNED_SUMMARY} for index in ids]})
+  if 'extract relevant filters' in prompt:
+    return json.dumps(CANNED_FILTERS)
+  return CANNED_SUMMARY
+
+def make_handler(profile: LatencyProfile, stats: dict):
+  """Create a request handler class bound to a latency profile and counters."""
+
+  class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    """Serve canned chat completions."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+      length = int(self.headers.get('Content-Length') or 0)
+      try:
+        body = json.loads(self.rfile.read(length) or b'{}')
+      except ValueError:
+        self._send_json(400, {'error': {'message': 'Invalid JSON body'}})
+        return
+
+      if not self.path.rstrip('/').endswith('/chat/completions'):
+        self._send_json(404, {'error': {'message': f'Unknown path {self.path}'}})
+        return
+
+      stats['requests'] += 1
+      time.sleep(profile.sample())
+
+      content = canned_answer(body)
+      model = body.get('model', 'gpt-3.5-turbo')
+      prompt_tokens = sum(len(message.get('content', '')) for message in body.get('messages', [])) // 4 + 1
+      completion_tokens = len(content) // 4 + 1
+
+      if body.get('stream'):
+        self._stream(model, content)
+        return
+
+      self._send_json(200, {
+        'id': f'chatcmpl-{uuid.uuid4().hex}',
+        'object': 'chat.completion',
+        'created': int(time.time()),
+        'model': model,
+        'choices': [{
+          'index': 0,
+          'message': {'role': 'assistant', 'content': content},
+          'finish_reason': 'stop'
+        }],
+        'usage': {
+          'prompt_tokens': prompt_tokens,
+          'completion_tokens': completion_tokens,
+          'total_tokens': prompt_tokens + completion_tokens
+        }
+      })
+
+    def _stream(self, model: str, content: str):
+      """Send the answer as server-sent chunks of a few words."""
+      self.send_response(200)
+      self.send_header('Content-Type', 'text/event-stream')
+      self.send_header('Connection', 'close')
+      self.end_headers()
+
+      completion_id = f'chatcmpl-{uuid.uuid4().hex}'
+      words = content.split(' ')
+      for start in range(0, len(words), 3):
+        delta = ' '.join(words[start:start + 3]) + ('' if start + 3 >= len(words) else ' ')
+        chunk = {
+          'id': completion_id,
+          'object': 'chat.completion.chunk',
+          'created': int(time.time()),
+          'model': model,
+          'choices': [{'index': 0, 'delta': {'content': delta}, 'finish_reason': None}]
+        }
+        self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        self.wfile.flush()
+        time.sleep(0.01)
+      self.wfile.write(b"data: [DONE]\n\n")
+      self.close_connection = True
+
+    def _send_json(self, status: int, payload: dict):
+      body = json.dumps(payload).encode()
+      self.send_response(status)
+      self.send_header('Content-Type', 'application/json')
+      self.send_header('Content-Length', str(len(body)))
+      self.end_headers()
+      self.wfile.write(body)
+
+    def log_message(self, format, *args):
+      """Silence per-request logging."""
+      return None
+
+  return FakeOpenAIHandler
+
+def start_fake_openai(host: str = '127.0.0.1', port: int = 0, profile: LatencyProfile = None) -> ThreadingHTTPServer:
+  """
+  Start the fake OpenAI server in a daemon thread.
+
+  Args:
+      host: Interface to bind
+      port: Port to bind, 0 picks a free one
+      profile: Response latency, defaults to LatencyProfile()
+
+  Returns:
+      Running server with a stats dictionary, call shutdown() to stop it
+  """
+  stats = {'requests': 0}
+  server = ThreadingHTTPServer((host, port), make_handler(profile or LatencyProfile(), stats))
+  server.daemon_threads = True
+  server.stats = stats
+  threading.Thread(target=server.serve_forever, daemon=True).start()
+  return server
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description='Serve a fake OpenAI chat completions API.')
+  parser.add_argument('--host', type=str, default='127.0.0.1')
+  parser.add_argument('--port', type=int, default=8766)
+  parser.add_argument('--latency', type=float, default=0.2, help='Base response latency in seconds.')
+  parser.add_argument('--jitter', type=float, default=0.05, help='Uniform jitter around the latency in seconds.')
+  parser.add_argument('--tail-rate', type=float, default=0.0, help='Share of responses using the tail latency.')
+  parser.add_argument('--tail-latency', type=float, default=5.0, help='Latency of tail responses in seconds.')
+  args = parser.parse_args()
+
+  profile = LatencyProfile(args.latency, args.jitter, args.tail_rate, args.tail_latency)
+  server = ThreadingHTTPServer((args.host, args.port), make_handler(profile, {'requests': 0}))
+  print(f"Fake OpenAI API on http://{args.host}:{args.port}/v1")
+  server.serve_forever()
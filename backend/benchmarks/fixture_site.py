@@ -0,0 +1,150 @@
+"""
+Local fixture website for scraping benchmarks.
+
+Pages render their company text with JavaScript and reference slow images,
+fonts and a tracker that keeps polling, so the browser never reaches network
+idle quickly. Pages under /static/ are plain HTML served by the HTTP tier,
+for load tests that should not start a browser. Run directly to serve it on
+a fixed port.
+"""
+import argparse
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+ASSET_DELAY = 1.5
+BEACON_INTERVAL_MS = 400
+
+PARAGRAPH = (
+  "Acme Robotics builds autonomous warehouse systems for logistics customers. "
+  "Our company was founded in 2012 and our team serves clients in manufacturing, "
+  "retail and healthcare with products that reduce picking errors and shipping times. "
+)
+
+def render_page(name: str, paragraphs: int = 40) -> str:
+  """
+  Render a JS-gated company page.
+  
+  Args:
+      name: Page name, used in the title and text
+      paragraphs: Number of text paragraphs injected by the script
+      
+  Returns:
+      HTML document
+  """
+  images = ''.join(f'<img src="/asset/img-{i}.png?delay={ASSET_DELAY}">' for i in range(20))
+  return f"""<!doctype html>
+<html>
+<head>
+  <title>{name}</title>
+  <link rel="stylesheet" href="/asset/site.css?delay={ASSET_DELAY}">
+  <style>@font-face {{ font-family: Brand; src: url(/asset/brand.woff2?delay={ASSET_DELAY}); }}</style>
+</head>
+<body>
+  <noscript>Please enable JavaScript to view this site.</noscript>
+  <div id="root"></div>
+  {images}
+  <script>
+    document.addEventListener('DOMContentLoaded', function () {{
+      var root = document.getElementById('root');
+      var html = '<h1>About us - {name}</h1>';
+      for (var i = 0; i < {paragraphs}; i++) {{
+        html += '<p>{PARAGRAPH}</p>';
+      }}
+      root.innerHTML = html;
+    }});
+    setInterval(function () {{ fetch('/beacon?delay=0.3'); }}, {BEACON_INTERVAL_MS});
+  </script>
+</body>
+</html>"""
+
+def render_static_page(name: str, paragraphs: int = 20) -> str:
+  """
+  Render a plain HTML company page with navigation and footer boilerplate.
+  
+  Args:
+      name: Page name, used in the title and text
+      paragraphs: Number of text paragraphs
+      
+  Returns:
+      HTML document
+  """
+  text = ''.join(f'<p>{PARAGRAPH}</p>' for _ in range(paragraphs))
+  return f"""<!doctype html>
+<html>
+<head><title>{name}</title></head>
+<body>
+  <nav><a href="/">Home</a> <a href="/about">About</a> <a href="/contact">Contact</a></nav>
+  <main>
+    <h1>About us - {name}</h1>
+    {text}
+    <h2>Products</h2>
+    <p>Our products include picking robots, fleet software and analytics services for warehouse operators.</p>
+  </main>
+  <footer>&copy; 2024 {name}. All rights reserved.</footer>
+</body>
+</html>"""
+
+class FixtureHandler(BaseHTTPRequestHandler):
+  """Serve fixture pages, delayed assets and the tracking beacon."""
+  
+  def do_GET(self):
+    parsed = urlparse(self.path)
+    params = parse_qs(parsed.query)
+    
+    if parsed.path.startswith('/asset/') or parsed.path == '/beacon':
+      time.sleep(float(params.get('delay', ['0'])[0]))
+      self._send(200, b'', 'application/octet-stream')
+      return
+    
+    if parsed.path.startswith('/static/'):
+      name = parsed.path[len('/static/'):].strip('/') or 'home'
+      etag = f'"{name}"'
+      if self.headers.get('If-None-Match') == etag:
+        self._send(304, b'', 'text/html; charset=utf-8')
+        return
+      self._send(200, render_static_page(name).encode(), 'text/html; charset=utf-8', {'ETag': etag})
+      return
+    
+    name = parsed.path.strip('/') or 'home'
+    self._send(200, render_page(name).encode(), 'text/html; charset=utf-8')
+  
+  def _send(self, status: int, body: bytes, content_type: str, headers: dict = None):
+    self.send_response(status)
+    self.send_header('Content-Type', content_type)
+    for header, value in (headers or {}).items():
+      self.send_header(header, value)
+    self.send_header('Content-Length', str(len(body)))
+    self.end_headers()
+    self.wfile.write(body)
+  
+  def log_message(self, format, *args):
+    """Silence per-request logging."""
+    return None
+
+def start_fixture_site(host: str = '127.0.0.1', port: int = 0) -> ThreadingHTTPServer:
+  """
+  Start the fixture site in a daemon thread.
+  
+  Args:
+      host: Interface to bind
+      port: Port to bind, 0 picks a free one
+      
+  Returns:
+      Running server, call shutdown() to stop it
+  """
+  server = ThreadingHTTPServer((host, port), FixtureHandler)
+  server.daemon_threads = True
+  threading.Thread(target=server.serve_forever, daemon=True).start()
+  return server
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description='Serve the scraping fixture site.')
+  parser.add_argument('--host', type=str, default='127.0.0.1')
+  parser.add_argument('--port', type=int, default=8765)
+  args = parser.parse_args()
+  
+  server = ThreadingHTTPServer((args.host, args.port), FixtureHandler)
+  print(f"Fixture site on http://{args.host}:{args.port}/")
+  server.serve_forever()
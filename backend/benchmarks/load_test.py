@@ -0,0 +1,243 @@
+"""
+Offline end-to-end load test of the search and enrichment endpoints.
+
+Starts the fake OpenAI API and the fixture site, seeds fixture companies,
+serves the app in-process and sends requests to each scenario at a target
+rate (open loop: requests are sent on schedule whether or not earlier ones
+have finished). Reports latency percentiles, throughput and error rates, and
+exits with status 1 when a --max-* threshold is exceeded so it can gate CI.
+
+Needs the configured DATABASE_URL; seeded companies are removed afterwards.
+
+Usage: python benchmarks/load_test.py --rps 10 --duration 20
+       python benchmarks/load_test.py --scenarios search --max-p95-ms 800 --max-error-rate 0.01
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+from common import summarize, write_results
+from fake_openai import LatencyProfile, start_fake_openai
+from fixture_site import start_fixture_site
+
+SCENARIOS = ('search', 'enrich', 'batch')
+SEED_PREFIX = 'loadtest-'
+SEARCH_QUERIES = [
+  'software companies in the united states',
+  'logistics startups founded after 2015',
+  'robotics companies with 51-200 employees',
+  'healthcare software in germany',
+]
+
+def configure_environment(openai_url: str, scrape_cache: bool) -> None:
+  """Point the app at the local stand-ins, must run before the app is imported."""
+  os.environ['OPENAI_BASE_URL'] = openai_url
+  os.environ['OPENAI_API_KEY'] = 'load-test'
+  os.environ['SCRAPE_CACHE_ENABLED'] = 'true' if scrape_cache else 'false'
+  os.environ['SCRAPE_CACHE_PATH'] = os.path.join(tempfile.mkdtemp(prefix='loadtest-cache-'), 'cache.sqlite3')
+
+def seed_companies(app, site_url: str, count: int, distinct_hosts: bool) -> list:
+  """
+  Insert fixture companies whose websites are served by the fixture site.
+
+  Args:
+      app: Flask application
+      site_url: Fixture site base URL
+      count: Number of companies
+      distinct_hosts: Give each company its own 127.x.y.z host so batches cannot share scrapes
+
+  Returns:
+      List of company IDs
+  """
+  from app import db
+  from app.models.company import Company
+
+  port = site_url.rsplit(':', 1)[1]
+  with app.app_context():
+    companies = []
+    for index in range(count):
+      host = f"127.0.{index // 250}.{index % 250 + 1}" if distinct_hosts else '127.0.0.1'
+      companies.append(Company(
+        name=f"{SEED_PREFIX}{index}",
+        website=f"http://{host}:{port}/static/company-{index}",
+        industry='software',
+        country='united states',
+        size='51-200',
+        founded=2012
+      ))
+    db.session.add_all(companies)
+    db.session.commit()
+    return [company.id for company in companies]
+
+def remove_seeded_companies(app) -> None:
+  """Delete the companies inserted by seed_companies."""
+  from app import db
+  from app.models.company import Company
+
+  with app.app_context():
+    Company.query.filter(Company.name.like(f"{SEED_PREFIX}%")).delete(synchronize_session=False)
+    db.session.commit()
+
+def start_app_server(app):
+  """Serve the app with a threaded WSGI server on a free port."""
+  from werkzeug.serving import make_server
+
+  server = make_server('127.0.0.1', 0, app, threaded=True)
+  threading.Thread(target=server.serve_forever, daemon=True).start()
+  return server
+
+def build_request(scenario: str, company_ids: list, batch_size: int) -> tuple:
+  """Build the (method, path, json body) of one request for a scenario."""
+  if scenario == 'search':
+    return 'GET', f"/api/companies/search?q={random.choice(SEARCH_QUERIES)}&per_page=10", None
+  if scenario == 'enrich':
+    return 'POST', f"/api/enrichment/company/{random.choice(company_ids)}", None
+  return 'POST', '/api/enrichment/batch', {'company_ids': random.sample(company_ids, min(batch_size, len(company_ids)))}
+
+async def run_scenario(
+  client,
+  scenario: str,
+  rps: float,
+  duration: float,
+  company_ids: list,
+  batch_size: int,
+  timeout: float
+) -> dict:
+  """
+  Send requests for one scenario at a fixed rate and measure them.
+
+  Returns:
+      Latency summary with throughput and error rate
+  """
+  latencies = []
+  errors = {}
+
+  async def send(method, path, body):
+    started = time.perf_counter()
+    try:
+      response = await client.request(method, path, json=body, timeout=timeout)
+      if response.status_code >= 400:
+        errors[str(response.status_code)] = errors.get(str(response.status_code), 0) + 1
+    except Exception as e:
+      errors[e.__class__.__name__] = errors.get(e.__class__.__name__, 0) + 1
+    latencies.append(time.perf_counter() - started)
+
+  total = max(1, int(rps * duration))
+  loop = asyncio.get_running_loop()
+  started = loop.time()
+  tasks = []
+  for index in range(total):
+    delay = started + index / rps - loop.time()
+    if delay > 0:
+      await asyncio.sleep(delay)
+    tasks.append(asyncio.ensure_future(send(*build_request(scenario, company_ids, batch_size))))
+  sent_in = loop.time() - started
+
+  await asyncio.gather(*tasks)
+  elapsed = loop.time() - started
+  failed = sum(errors.values())
+
+  return {
+    **summarize(latencies),
+    'target_rps': rps,
+    'sent_rps': round(total / sent_in, 2) if sent_in else None,
+    'throughput_rps': round((total - failed) / elapsed, 2),
+    'error_rate': round(failed / total, 4),
+    'errors': errors
+  }
+
+async def drive(base_url: str, scenarios: list, args, company_ids: list) -> dict:
+  """Run every selected scenario in turn against the app."""
+  import httpx
+
+  limits = httpx.Limits(max_connections=1000, max_keepalive_connections=100)
+  results = {}
+  async with httpx.AsyncClient(base_url=base_url, limits=limits) as client:
+    for scenario in scenarios:
+      rps = args.batch_rps if scenario == 'batch' else args.rps
+      print(f"Running {scenario} at {rps} req/s for {args.duration}s...")
+      results[scenario] = await run_scenario(
+        client, scenario, rps, args.duration, company_ids, args.batch_size, args.timeout
+      )
+      print(f"{scenario:>7}: {results[scenario]}")
+  return results
+
+def check_thresholds(results: dict, max_p95_ms: float = None, max_error_rate: float = None) -> list:
+  """List the scenarios exceeding the configured thresholds."""
+  failures = []
+  for scenario, result in results.items():
+    if max_p95_ms is not None and result.get('p95_ms', 0) > max_p95_ms:
+      failures.append(f"{scenario}: p95 {result['p95_ms']}ms > {max_p95_ms}ms")
+    if max_error_rate is not None and result['error_rate'] > max_error_rate:
+      failures.append(f"{scenario}: error rate {result['error_rate']} > {max_error_rate}")
+  return failures
+
+def main(args) -> int:
+  profile = LatencyProfile(args.llm_latency, args.llm_jitter, args.llm_tail_rate, args.llm_tail_latency)
+  openai_server = start_fake_openai(profile=profile)
+  site_server = start_fixture_site(host='0.0.0.0' if args.distinct_hosts else '127.0.0.1')
+  configure_environment(f"http://127.0.0.1:{openai_server.server_address[1]}/v1", args.scrape_cache)
+
+  from app import create_app
+
+  app = create_app()
+  app_server = None
+  try:
+    company_ids = seed_companies(
+      app,
+      f"http://127.0.0.1:{site_server.server_address[1]}",
+      args.companies,
+      args.distinct_hosts
+    )
+    app_server = start_app_server(app)
+    base_url = f"http://127.0.0.1:{app_server.server_port}"
+
+    scenarios = [scenario.strip() for scenario in args.scenarios.split(',') if scenario.strip()]
+    results = asyncio.run(drive(base_url, scenarios, args, company_ids))
+  finally:
+    if app_server:
+      app_server.shutdown()
+    remove_seeded_companies(app)
+    openai_server.shutdown()
+    site_server.shutdown()
+
+  results['llm_requests'] = openai_server.stats['requests']
+  path = write_results('load_test', {
+    'config': {key: value for key, value in vars(args).items() if key != 'output'},
+    'scenarios': results
+  }, args.output)
+  print(f"Results written to {path}")
+
+  failures = check_thresholds(
+    {scenario: result for scenario, result in results.items() if scenario in SCENARIOS},
+    args.max_p95_ms,
+    args.max_error_rate
+  )
+  for failure in failures:
+    print(f"FAILED {failure}")
+  return 1 if failures else 0
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description='Offline load test of search and enrichment endpoints.')
+  parser.add_argument('--scenarios', type=str, default=','.join(SCENARIOS), help='Comma separated: search,enrich,batch.')
+  parser.add_argument('--rps', type=float, default=10, help='Target requests per second for search and enrich.')
+  parser.add_argument('--batch-rps', type=float, default=1, help='Target requests per second for batch.')
+  parser.add_argument('--batch-size', type=int, default=10, help='Companies per batch request.')
+  parser.add_argument('--duration', type=float, default=20, help='Seconds per scenario.')
+  parser.add_argument('--timeout', type=float, default=60, help='Client timeout per request in seconds.')
+  parser.add_argument('--companies', type=int, default=200, help='Fixture companies to seed.')
+  parser.add_argument('--distinct-hosts', action='store_true', help='Serve each company from its own 127.x address (Linux).')
+  parser.add_argument('--scrape-cache', action='store_true', help='Keep the scrape cache enabled.')
+  parser.add_argument('--llm-latency', type=float, default=0.3, help='Fake OpenAI base latency in seconds.')
+  parser.add_argument('--llm-jitter', type=float, default=0.1, help='Fake OpenAI latency jitter in seconds.')
+  parser.add_argument('--llm-tail-rate', type=float, default=0.0, help='Share of fake OpenAI responses that are slow.')
+  parser.add_argument('--llm-tail-latency', type=float, default=5.0, help='Latency of slow fake OpenAI responses.')
+  parser.add_argument('--max-p95-ms', type=float, default=None, help='Fail if any scenario has a higher p95.')
+  parser.add_argument('--max-error-rate', type=float, default=None, help='Fail if any scenario has a higher error rate.')
+  parser.add_argument('--output', type=str, default=None, help='Path of the JSON results file.')
+  sys.exit(main(parser.parse_args()))
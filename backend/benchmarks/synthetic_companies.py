@@ -0,0 +1,176 @@
+"""
+Generate synthetic companies with realistic value distributions.
+
+Values follow the layout of the seed dataset (lowercase industries and
+locations, LinkedIn size ranges). Industries and countries are Zipf-skewed,
+small companies dominate and founding years lean recent, so filter selectivity
+resembles production. Generated rows have websites under SYNTHETIC_DOMAIN and
+can be removed with --drop.
+
+Usage: python benchmarks/synthetic_companies.py --count 1000000
+"""
+import argparse
+import itertools
+import random
+import time
+from typing import Dict, Iterator
+
+import common  # noqa: F401  (adds the backend directory to sys.path)
+
+SYNTHETIC_DOMAIN = 'bench.example'
+
+INDUSTRIES = [
+  'information technology and services', 'computer software', 'marketing and advertising', 'construction',
+  'real estate', 'hospital & health care', 'financial services', 'management consulting', 'retail',
+  'education management', 'internet', 'automotive', 'accounting', 'food & beverages', 'restaurants',
+  'health, wellness and fitness', 'design', 'staffing and recruiting', 'telecommunications', 'logistics and supply chain',
+  'mechanical or industrial engineering', 'architecture & planning', 'legal services', 'biotechnology',
+  'renewables & environment', 'oil & energy', 'insurance', 'electrical/electronic manufacturing',
+  'consumer goods', 'hospitality', 'entertainment', 'apparel & fashion', 'civil engineering',
+  'pharmaceuticals', 'medical devices', 'venture capital & private equity', 'banking', 'airlines/aviation',
+  'e-learning', 'computer games'
+]
+
+# (country, regions, localities) in rough order of company counts
+LOCATIONS = [
+  ('united states', ['california', 'new york', 'texas', 'florida', 'illinois', 'massachusetts', 'washington'],
+   ['san francisco', 'new york', 'austin', 'miami', 'chicago', 'boston', 'seattle', 'los angeles', 'dallas']),
+  ('united kingdom', ['england', 'scotland', 'wales'], ['london', 'manchester', 'edinburgh', 'bristol', 'cardiff']),
+  ('india', ['karnataka', 'maharashtra', 'delhi', 'tamil nadu'], ['bangalore', 'mumbai', 'new delhi', 'chennai', 'pune']),
+  ('canada', ['ontario', 'british columbia', 'quebec'], ['toronto', 'vancouver', 'montreal', 'ottawa']),
+  ('france', ['ile-de-france', 'auvergne-rhone-alpes'], ['paris', 'lyon', 'grenoble']),
+  ('germany', ['berlin', 'bavaria', 'hamburg'], ['berlin', 'munich', 'hamburg']),
+  ('brazil', ['sao paulo', 'rio de janeiro'], ['sao paulo', 'rio de janeiro', 'campinas']),
+  ('australia', ['new south wales', 'victoria'], ['sydney', 'melbourne']),
+  ('netherlands', ['north holland', 'south holland'], ['amsterdam', 'rotterdam', 'the hague']),
+  ('spain', ['madrid', 'catalonia'], ['madrid', 'barcelona']),
+  ('italy', ['lombardy', 'lazio'], ['milan', 'rome']),
+  ('sweden', ['stockholm', 'vastra gotaland'], ['stockholm', 'gothenburg']),
+  ('singapore', ['singapore'], ['singapore']),
+  ('israel', ['tel aviv', 'jerusalem'], ['tel aviv', 'jerusalem']),
+  ('mexico', ['mexico city', 'jalisco'], ['mexico city', 'guadalajara']),
+]
+
+# (size range, share of companies)
+SIZES = [
+  ('1-10', 0.58), ('11-50', 0.24), ('51-200', 0.1), ('201-500', 0.04), ('501-1000', 0.018),
+  ('1001-5000', 0.015), ('5001-10000', 0.004), ('10001+', 0.003)
+]
+
+NAME_PREFIXES = [
+  'acme', 'blue', 'bright', 'north', 'summit', 'apex', 'nova', 'green', 'silver', 'prime', 'urban', 'vertex',
+  'pioneer', 'atlas', 'quantum', 'red', 'harbor', 'evergreen', 'stellar', 'iron', 'clear', 'true', 'next', 'open'
+]
+NAME_SUFFIXES = [
+  'labs', 'solutions', 'systems', 'group', 'partners', 'technologies', 'consulting', 'digital', 'works',
+  'media', 'health', 'capital', 'logistics', 'studio', 'networks', 'analytics', 'foods', 'energy', 'design', 'co'
+]
+
+def _zipf_weights(count: int, exponent: float = 1.1):
+  """Weights of a Zipf distribution over count ranked values."""
+  return [1 / (rank ** exponent) for rank in range(1, count + 1)]
+
+def generate_companies(count: int, seed: int = 42, start: int = 0) -> Iterator[Dict]:
+  """
+  Generate synthetic company rows.
+
+  Args:
+      count: Number of companies
+      seed: Random seed, the same seed yields the same companies
+      start: Index of the first company, used in names and websites
+
+  Yields:
+      Dictionaries of Company column values
+  """
+  rng = random.Random(seed + start)
+  industry_cum = list(itertools.accumulate(_zipf_weights(len(INDUSTRIES))))
+  location_cum = list(itertools.accumulate(_zipf_weights(len(LOCATIONS), 1.4)))
+  size_cum = list(itertools.accumulate(share for _, share in SIZES))
+
+  for index in range(start, start + count):
+    country, regions, localities = rng.choices(LOCATIONS, cum_weights=location_cum)[0]
+    name = f"{rng.choice(NAME_PREFIXES)} {rng.choice(NAME_SUFFIXES)} {index}"
+    slug = name.replace(' ', '-')
+    # Founding years lean recent, some companies have none
+    founded = None if rng.random() < 0.3 else min(2025, int(2026 - rng.expovariate(1 / 15)))
+
+    yield {
+      'name': name,
+      'website': f"{slug}.{SYNTHETIC_DOMAIN}",
+      'founded': founded,
+      'size': rng.choices(SIZES, cum_weights=size_cum)[0][0],
+      'locality': rng.choice(localities) if rng.random() < 0.85 else None,
+      'region': rng.choice(regions) if rng.random() < 0.9 else None,
+      'country': country,
+      'industry': rng.choices(INDUSTRIES, cum_weights=industry_cum)[0],
+      'linkedin_url': f"linkedin.com/company/{slug}"
+    }
+
+def count_synthetic_companies() -> int:
+  """Count the synthetic companies in the database of the current app."""
+  from app import db
+  from app.models import Company
+
+  return db.session.query(Company.id).filter(Company.website.like(f'%.{SYNTHETIC_DOMAIN}')).count()
+
+def load_synthetic_companies(count: int, seed: int = 42, batch_size: int = 10000) -> int:
+  """
+  Insert synthetic companies until the database holds count of them.
+
+  Args:
+      count: Number of synthetic companies wanted
+      seed: Random seed
+      batch_size: Rows per INSERT
+
+  Returns:
+      Number of companies inserted
+  """
+  from sqlalchemy import insert
+
+  from app import db
+  from app.models import Company
+
+  existing = count_synthetic_companies()
+  missing = max(0, count - existing)
+  inserted = 0
+  started = time.perf_counter()
+  rows = generate_companies(missing, seed=seed, start=existing)
+  while inserted < missing:
+    batch = list(itertools.islice(rows, batch_size))
+    db.session.execute(insert(Company.__table__), batch)
+    db.session.commit()
+    inserted += len(batch)
+    print(f"Inserted {inserted}/{missing} synthetic companies ({inserted / (time.perf_counter() - started):.0f} rows/s)")
+
+  if inserted:
+    # Fresh statistics so plans match a steady-state database
+    if db.engine.dialect.name == 'postgresql':
+      with db.engine.begin() as connection:
+        connection.exec_driver_sql('ANALYZE companies')
+  return inserted
+
+def drop_synthetic_companies() -> int:
+  """Delete the synthetic companies, returning how many were deleted."""
+  from app import db
+  from app.models import Company
+
+  deleted = Company.query.filter(Company.website.like(f'%.{SYNTHETIC_DOMAIN}')).delete(synchronize_session=False)
+  db.session.commit()
+  return deleted
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description='Load synthetic companies into the configured database.')
+  parser.add_argument('--count', type=int, default=1_000_000, help='Synthetic companies the database should hold.')
+  parser.add_argument('--seed', type=int, default=42, help='Random seed.')
+  parser.add_argument('--batch-size', type=int, default=10000, help='Rows per INSERT.')
+  parser.add_argument('--drop', action='store_true', help='Delete the synthetic companies instead.')
+  args = parser.parse_args()
+
+  from app import create_app
+
+  app = create_app()
+  with app.app_context():
+    if args.drop:
+      print(f"Deleted {drop_synthetic_companies()} synthetic companies")
+    else:
+      print(f"Inserted {load_synthetic_companies(args.count, args.seed, args.batch_size)} synthetic companies")
@@ -0,0 +1,66 @@
+"""
+Gunicorn settings for production serving.
+
+Usage: gunicorn -c gunicorn.conf.py wsgi:app
+
+Each preforked worker serves requests from a thread pool and runs async
+views on one persistent event loop (PERSISTENT_EVENT_LOOP), started when
+the worker boots and closed, with its async clients, when it exits.
+"""
+import multiprocessing
+import os
+
+bind = os.getenv('GUNICORN_BIND', f"0.0.0.0:{os.getenv('PORT', '5001')}")
+# Few threaded workers: requests mostly wait on OpenAI and the database, and every
+# worker holds its own database pools (see DATABASE_CONNECTION_BUDGET)
+workers = int(os.getenv('WEB_CONCURRENCY', str(min(multiprocessing.cpu_count() * 2 + 1, 4))))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', '16'))
+
+# The app sizes its database pools from these
+os.environ['WEB_CONCURRENCY'] = str(workers)
+os.environ['GUNICORN_THREADS'] = str(threads)
+
+# Searches and enrichment wait on OpenAI, and enrichment progress is streamed
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '120'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = 5
+
+# Recycle workers now and then to bound memory growth
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '5000'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', '500'))
+
+preload_app = os.getenv('GUNICORN_PRELOAD', 'false').lower() == 'true'
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+
+def post_fork(server, worker):
+  """Drop database connections inherited from the master when the app is preloaded."""
+  if preload_app:
+    from app import db
+    
+    with worker.app.wsgi().app_context():
+      db.engine.dispose(close=False)
+
+def post_worker_init(worker):
+  """Start the worker's event loop and warm up the app before it accepts requests."""
+  from app import warm_up
+  from app.utils.event_loop import worker_loop
+  
+  worker_loop.start()
+  app = worker.app.wsgi()
+  if app.config.get('WARMUP_ON_START'):
+    # A failed warm-up only costs the first requests their speed
+    try:
+      warm_up(app)
+    except Exception as e:
+      worker.log.warning(f"Worker warm-up failed: {e}")
+
+def worker_exit(server, worker):
+  """Close async clients and stop the event loop, then close database connections."""
+  from app import db
+  from app.utils.event_loop import worker_loop
+  
+  worker_loop.stop()
+  with worker.app.wsgi().app_context():
+    db.engine.dispose()
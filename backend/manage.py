@@ -2,10 +2,7 @@
 import click
 from flask.cli import FlaskGroup
 from app import create_app, db
-from flask_migrate import Migrate
 
-app = create_app()
-migrate = Migrate(app, db)
 cli = FlaskGroup(create_app=create_app)
 
 @cli.command('init_db')
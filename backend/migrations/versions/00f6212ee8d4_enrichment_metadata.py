@@ -0,0 +1,47 @@
+"""enrichment metadata
+
+Enrichment metadata of companies used by incremental re-enrichment, and the
+index of stale-company scans. Columns and index that already exist are kept.
+
+Revision ID: 00f6212ee8d4
+Revises: 51ede579c7ec
+Create Date: 2026-10-19 06:26:16.752247
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '00f6212ee8d4'
+down_revision = '51ede579c7ec'
+branch_labels = None
+depends_on = None
+
+
+def enrichment_columns():
+    return [
+        sa.Column('enriched_at', sa.DateTime(), nullable=True),
+        sa.Column('enrichment_source_url', sa.String(length=255), nullable=True),
+        sa.Column('enrichment_content_hash', sa.String(length=64), nullable=True),
+        sa.Column('enrichment_model', sa.String(length=50), nullable=True),
+        sa.Column('enrichment_prompt_version', sa.String(length=20), nullable=True),
+    ]
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    columns = {column['name'] for column in inspector.get_columns('companies')}
+    for column in enrichment_columns():
+        if column.name not in columns:
+            op.add_column('companies', column)
+
+    indexes = {index['name'] for index in inspector.get_indexes('companies')}
+    if 'ix_companies_enrichment_staleness' not in indexes:
+        op.create_index('ix_companies_enrichment_staleness', 'companies', ['enriched_at', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_companies_enrichment_staleness', table_name='companies')
+    for column in reversed(enrichment_columns()):
+        op.drop_column('companies', column.name)
@@ -0,0 +1,63 @@
+"""enrichment jobs
+
+Background enrichment job queue. Skipped where `flask init-db` already
+created the tables.
+
+Revision ID: 09acbc937019
+Revises: 00f6212ee8d4
+Create Date: 2026-10-19 06:26:15.373899
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '09acbc937019'
+down_revision = '00f6212ee8d4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    tables = sa.inspect(op.get_bind()).get_table_names()
+    if 'enrichment_jobs' not in tables:
+        op.create_table(
+            'enrichment_jobs',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('total', sa.Integer(), nullable=False),
+            sa.Column('max_attempts', sa.Integer(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+    if 'enrichment_job_items' not in tables:
+        op.create_table(
+            'enrichment_job_items',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('job_id', sa.Integer(), nullable=False),
+            sa.Column('company_id', sa.Integer(), nullable=False),
+            sa.Column('status', sa.String(length=20), nullable=False),
+            sa.Column('attempts', sa.Integer(), nullable=False),
+            sa.Column('max_attempts', sa.Integer(), nullable=False),
+            sa.Column('available_at', sa.DateTime(), nullable=False),
+            sa.Column('locked_until', sa.DateTime(), nullable=True),
+            sa.Column('locked_by', sa.String(length=100), nullable=True),
+            sa.Column('error', sa.Text(), nullable=True),
+            sa.Column('result', sa.JSON(), nullable=True),
+            sa.Column('finished_at', sa.DateTime(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['company_id'], ['companies.id']),
+            sa.ForeignKeyConstraint(['job_id'], ['enrichment_jobs.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_enrichment_job_items_claim', 'enrichment_job_items', ['status', 'available_at'])
+        op.create_index('ix_enrichment_job_items_job_status', 'enrichment_job_items', ['job_id', 'status'])
+
+
+def downgrade():
+    op.drop_index('ix_enrichment_job_items_job_status', table_name='enrichment_job_items')
+    op.drop_index('ix_enrichment_job_items_claim', table_name='enrichment_job_items')
+    op.drop_table('enrichment_job_items')
+    op.drop_table('enrichment_jobs')
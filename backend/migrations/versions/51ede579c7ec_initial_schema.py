@@ -0,0 +1,58 @@
+"""initial schema
+
+Tables as created by `flask init-db` before migrations were added. Existing
+tables are left alone, so databases created with init-db can be upgraded.
+
+Revision ID: 51ede579c7ec
+Revises: 
+Create Date: 2026-10-19 06:26:14.133704
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '51ede579c7ec'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    tables = sa.inspect(op.get_bind()).get_table_names()
+    if 'companies' not in tables:
+        op.create_table(
+            'companies',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('website', sa.String(length=255), nullable=True),
+            sa.Column('name', sa.String(length=255), nullable=False),
+            sa.Column('founded', sa.Integer(), nullable=True),
+            sa.Column('size', sa.String(length=50), nullable=True),
+            sa.Column('locality', sa.String(length=255), nullable=True),
+            sa.Column('region', sa.String(length=255), nullable=True),
+            sa.Column('country', sa.String(length=255), nullable=True),
+            sa.Column('industry', sa.String(length=255), nullable=True),
+            sa.Column('linkedin_url', sa.String(length=255), nullable=True),
+            sa.Column('ai_summary', sa.Text(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+    if 'saved_companies' not in tables:
+        op.create_table(
+            'saved_companies',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('company_id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('notes', sa.Text(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['company_id'], ['companies.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+
+def downgrade():
+    op.drop_table('saved_companies')
+    op.drop_table('companies')
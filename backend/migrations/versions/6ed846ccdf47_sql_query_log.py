@@ -0,0 +1,47 @@
+"""sql query log
+
+Log of AI-generated SQL executions and sampled plans. Skipped where
+`flask init-db` already created the table.
+
+Revision ID: 6ed846ccdf47
+Revises: 09acbc937019
+Create Date: 2026-10-19 06:26:18.095277
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6ed846ccdf47'
+down_revision = '09acbc937019'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if 'sql_query_log' in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table(
+        'sql_query_log',
+        sa.Column('id', sa.BigInteger(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('fingerprint', sa.String(length=16), nullable=False),
+        sa.Column('sql_text', sa.Text(), nullable=False),
+        sa.Column('natural_query', sa.Text(), nullable=True),
+        sa.Column('count_ms', sa.Float(), nullable=True),
+        sa.Column('page_ms', sa.Float(), nullable=True),
+        sa.Column('rows_returned', sa.Integer(), nullable=True),
+        sa.Column('total_rows', sa.Integer(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('plan', sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_sql_query_log_fingerprint_created', 'sql_query_log', ['fingerprint', 'created_at'])
+    op.create_index('ix_sql_query_log_created', 'sql_query_log', ['created_at'])
+
+
+def downgrade():
+    op.drop_index('ix_sql_query_log_created', table_name='sql_query_log')
+    op.drop_index('ix_sql_query_log_fingerprint_created', table_name='sql_query_log')
+    op.drop_table('sql_query_log')
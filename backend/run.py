@@ -1,6 +1,8 @@
 #!/usr/bin/env python
 import os
 
+import click
+
 from app import create_app, db
 
 app = create_app(os.getenv('FLASK_CONFIG', 'app.config.DevelopmentConfig'))
@@ -11,7 +13,110 @@ def init_db():
   db.create_all()
   print('Initialized the database.')
 
+@app.cli.command('enrichment-worker')
+@click.option('--concurrency', default=4, show_default=True, help='Number of concurrent async workers.')
+@click.option('--batch-size', default=5, show_default=True, help='Companies each worker claims and summarizes together.')
+@click.option('--poll-interval', default=2.0, show_default=True, help='Seconds to wait when the queue is empty.')
+@click.option('--visibility-timeout', default=300, show_default=True, help='Seconds before an unfinished claim is retried.')
+def enrichment_worker(concurrency, batch_size, poll_interval, visibility_timeout):
+  """Process queued enrichment jobs."""
+  from app.services.enrichment_worker import EnrichmentWorker
+  
+  EnrichmentWorker(
+    app,
+    concurrency=concurrency,
+    batch_size=batch_size,
+    poll_interval=poll_interval,
+    visibility_timeout=visibility_timeout
+  ).run()
+
+@app.cli.command('reenrich-stale')
+@click.option('--older-than-days', default=30, show_default=True, help='Re-enrich companies enriched longer ago than this.')
+@click.option('--limit', default=1000, show_default=True, help='Maximum number of companies to process.')
+@click.option('--batch-size', default=20, show_default=True, help='Companies enriched together.')
+@click.option('--incremental/--full', default=True, show_default=True, help='Skip the LLM call when content and prompt version are unchanged.')
+def reenrich_stale(older_than_days, limit, batch_size, incremental):
+  """Re-enrich companies that were never enriched or whose enrichment is stale."""
+  import asyncio
+  from datetime import datetime, timedelta
+  from app.services.enrichment_service import EnrichmentService
+  
+  cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+  enrichment_service = EnrichmentService()
+  
+  async def run():
+    processed = failed = 0
+    stats = {}
+    cursor = None
+    
+    while processed < limit:
+      company_ids, cursor = EnrichmentService.get_stale_company_ids(
+        cutoff,
+        limit=min(batch_size, limit - processed),
+        cursor=cursor
+      )
+      if not company_ids:
+        break
+      
+      outcomes = await enrichment_service.enrich_companies(company_ids, incremental=incremental, stats=stats)
+      processed += len(company_ids)
+      failed += sum(1 for success, _, _ in outcomes.values() if not success)
+      print(f"Processed {processed} companies...")
+      
+      if cursor is None:
+        break
+    
+    return processed, failed, stats
+  
+  processed, failed, stats = asyncio.run(run())
+  print(
+    f"Re-enriched {processed} companies ({failed} failed, "
+    f"{stats.get('summaries_skipped', 0)} unchanged summaries reused, "
+    f"{stats.get('fetches_saved', 0)} fetches saved by domain deduplication)."
+  )
+  if processed:
+    print(
+      f"Summary tokens: {stats.get('tokens_in', 0)} in, {stats.get('tokens_out', 0)} out "
+      f"({stats.get('tokens_in', 0) / processed:.0f}/{stats.get('tokens_out', 0) / processed:.0f} per company), "
+      f"cost ${stats.get('cost_usd', 0):.4f}."
+    )
+
+@app.cli.command('query-report')
+@click.option('--since-days', default=7, show_default=True, help='Only consider queries logged in the last this many days.')
+@click.option('--limit', default=20, show_default=True, help='Number of fingerprints to list.')
+@click.option('--order-by', type=click.Choice(['total', 'p95', 'max', 'calls', 'errors']), default='total', show_default=True, help='Ranking of the fingerprints.')
+@click.option('--fingerprint', default=None, help='Show the latest captured plan of this fingerprint instead.')
+def query_report(since_days, limit, order_by, fingerprint):
+  """Rank AI-generated SQL by cost from the slow-query log."""
+  from datetime import datetime, timedelta
+  from app.services.query_log import get_latest_plan, get_worst_fingerprints
+  
+  if fingerprint:
+    entry = get_latest_plan(fingerprint)
+    if entry is None:
+      print(f"No plan captured for fingerprint {fingerprint}.")
+      return
+    print(f"Fingerprint {entry.fingerprint}, logged {entry.created_at.isoformat()}")
+    print(f"Query: {entry.natural_query}")
+    print(f"Count {entry.count_ms or 0:.1f} ms, page {entry.page_ms or 0:.1f} ms, {entry.total_rows} rows")
+    print(f"\n{entry.sql_text}\n\n{entry.plan}")
+    return
+  
+  rows = get_worst_fingerprints(datetime.utcnow() - timedelta(days=since_days), limit=limit, order_by=order_by)
+  if not rows:
+    print(f"No queries logged in the last {since_days} days.")
+    return
+  
+  print(f"{'fingerprint':<16} {'calls':>6} {'errors':>6} {'total ms':>10} {'mean ms':>9} {'p95 ms':>9} {'max ms':>9} {'plans':>5}  query")
+  for row in rows:
+    print(
+      f"{row['fingerprint']:<16} {row['calls']:>6} {row['errors']:>6} {row['total']:>10.1f} "
+      f"{row['mean']:>9.1f} {row['p95']:>9.1f} {row['max']:>9.1f} {row['plans']:>5}  "
+      f"{(row['sample_query'] or row['sample_sql'])[:60]}"
+    )
+
 if __name__ == '__main__':
+  # Development server only; production runs gunicorn -c gunicorn.conf.py wsgi:app
   with app.app_context():
     db.create_all()
   app.run(debug=app.config['DEBUG'], port=5001) 
\ No newline at end of file
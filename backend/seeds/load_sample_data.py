@@ -1,7 +1,14 @@
 import argparse
+import io
+import itertools
 import json
+import mmap
 import os
 import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
 
 # Add parent directory to path to import app
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -11,6 +18,51 @@ from tqdm import tqdm
 from app import create_app, db
 from app.models import Company
 
+try:
+  import orjson
+except ImportError:
+  orjson = None
+
+# Columns written by the COPY loader, in the order of each COPY line
+COPY_COLUMNS = (
+  'name', 'website', 'founded', 'size', 'locality', 'region', 'country', 'industry', 'linkedin_url',
+  'created_at', 'updated_at'
+)
+
+# Rows sent per COPY statement and commit
+COPY_CHUNK_ROWS = 100000
+
+# Bytes of the JSONL file parsed per task in parallel mode
+PARSE_CHUNK_BYTES = 32 * 1024 * 1024
+
+# Escapes of the COPY text format
+COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+def parse_company(row):
+  """
+  Get the Company column values of a dataset row.
+
+  Missing fields default to empty strings and `founded` is kept only if it is a
+  number of digits, as in the original loader.
+
+  Args:
+      row: Parsed JSON object of one dataset line
+
+  Returns:
+      Dictionary of column values
+  """
+  return {
+    'name': row.get('name', ''),
+    'website': row.get('website', ''),
+    'founded': int(row.get('founded', 0)) if row.get('founded') and str(row.get('founded')).isdigit() else None,
+    'size': row.get('size', ''),
+    'locality': row.get('locality', ''),
+    'region': row.get('region', ''),
+    'country': row.get('country', ''),
+    'industry': row.get('industry', ''),
+    'linkedin_url': row.get('linkedin_url', '')
+  }
+
 def load_sample_companies(file_path, limit=1000000):
   """Load sample companies into the database from JSONL file."""
   print(f"Loading up to {limit} sample companies from {file_path}...")
@@ -28,17 +80,7 @@ def load_sample_companies(file_path, limit=1000000):
         try:
           row = json.loads(line)
           
-          company = Company(
-            name=row.get('name', ''),
-            website=row.get('website', ''),
-            founded=int(row.get('founded', 0)) if row.get('founded') and str(row.get('founded')).isdigit() else None,
-            size=row.get('size', ''),
-            locality=row.get('locality', ''),
-            region=row.get('region', ''),
-            country=row.get('country', ''),
-            industry=row.get('industry', ''),
-            linkedin_url=row.get('linkedin_url', '')
-          )
+          company = Company(**parse_company(row))
           
           batch.append(company)
           count += 1
@@ -65,10 +107,304 @@ def load_sample_companies(file_path, limit=1000000):
     db.session.rollback()
     print(f"Error loading sample data: {e}")
 
+def encode_copy_value(value):
+  """Encode one value in the COPY text format."""
+  if value is None:
+    return '\\N'
+  if isinstance(value, str):
+    # translate() is slow, most values have nothing to escape
+    if '\\' in value or '\t' in value or '\n' in value or '\r' in value:
+      return value.translate(COPY_ESCAPES)
+    return value
+  return str(value)
+
+def encode_copy_rows(companies, timestamp):
+  """
+  Encode companies as COPY text format lines.
+
+  Args:
+      companies: Column values from parse_company
+      timestamp: created_at and updated_at of the rows, ISO formatted
+
+  Returns:
+      COPY data with one line per company
+  """
+  lines = []
+  for company in companies:
+    values = [encode_copy_value(company[column]) for column in COPY_COLUMNS[:-2]]
+    values += [timestamp, timestamp]
+    lines.append('\t'.join(values) + '\n')
+  return ''.join(lines)
+
+def read_copy_chunks(file_path, limit=1000000, chunk_rows=COPY_CHUNK_ROWS):
+  """
+  Parse a JSONL file into chunks of COPY data.
+
+  Args:
+      file_path: Path to the JSONL file
+      limit: Maximum number of companies
+      chunk_rows: Companies per chunk
+
+  Yields:
+      Tuples of (COPY data, number of companies)
+  """
+  timestamp = datetime.utcnow().isoformat()
+  count = 0
+  companies = []
+
+  with open(file_path, 'r') as f:
+    for line in f:
+      if count >= limit:
+        break
+
+      try:
+        companies.append(parse_company(json.loads(line)))
+      except json.JSONDecodeError:
+        print(f"Skipping invalid JSON line: {line[:100]}...")
+        continue
+      count += 1
+
+      if len(companies) >= chunk_rows:
+        yield encode_copy_rows(companies, timestamp), len(companies)
+        companies = []
+
+  if companies:
+    yield encode_copy_rows(companies, timestamp), len(companies)
+
+def split_file(file_path, chunk_bytes=PARSE_CHUNK_BYTES):
+  """
+  Split a file into byte ranges of about chunk_bytes that end after a newline.
+
+  Args:
+      file_path: Path to the JSONL file
+      chunk_bytes: Target size of each range
+
+  Returns:
+      List of (start, end) byte offsets
+  """
+  ranges = []
+  with open(file_path, 'rb') as f:
+    if os.fstat(f.fileno()).st_size == 0:
+      return ranges
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+      start = 0
+      while start < len(mapped):
+        newline = mapped.find(b'\n', min(start + chunk_bytes, len(mapped)) - 1)
+        end = len(mapped) if newline == -1 else newline + 1
+        ranges.append((start, end))
+        start = end
+  return ranges
+
+def parse_copy_chunk(file_path, start, end, timestamp):
+  """
+  Parse the lines of a byte range of a JSONL file into COPY data.
+
+  Runs in the worker processes of the parallel mode, decoding with orjson
+  when it is installed.
+
+  Args:
+      file_path: Path to the JSONL file
+      start: Offset of the first line
+      end: Offset after the last line
+      timestamp: created_at and updated_at of the rows, ISO formatted
+
+  Returns:
+      Tuple of (COPY data, number of companies, invalid lines, parse seconds)
+  """
+  started = time.perf_counter()
+  loads = orjson.loads if orjson is not None else json.loads
+  with open(file_path, 'rb') as f:
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+      lines = mapped[start:end].split(b'\n')
+  if lines and not lines[-1]:
+    lines.pop()
+
+  companies = []
+  invalid = []
+  for line in lines:
+    try:
+      companies.append(parse_company(loads(line)))
+    except json.JSONDecodeError:
+      invalid.append(line[:100].decode('utf-8', errors='replace'))
+
+  data = encode_copy_rows(companies, timestamp).encode('utf-8')
+  return data, len(companies), invalid, time.perf_counter() - started
+
+def read_copy_chunks_parallel(file_path, limit=1000000, workers=4, chunk_bytes=PARSE_CHUNK_BYTES, stats=None):
+  """
+  Parse a JSONL file into chunks of COPY data with a pool of processes.
+
+  The file is split into newline-aligned byte ranges that workers parse
+  independently. Chunks are yielded in file order and at most two per worker
+  are in flight, so memory stays bounded when the writer is slower.
+
+  Args:
+      file_path: Path to the JSONL file
+      limit: Maximum number of companies
+      workers: Parser processes
+      chunk_bytes: Bytes parsed per task
+      stats: Dictionary receiving parse and wait times
+
+  Yields:
+      Tuples of (COPY data, number of companies)
+  """
+  stats = stats if stats is not None else {}
+  stats.update({'bytes': 0, 'parse_seconds': 0.0, 'wait_seconds': 0.0})
+  timestamp = datetime.utcnow().isoformat()
+  ranges = iter(split_file(file_path, chunk_bytes))
+  count = 0
+
+  executor = ProcessPoolExecutor(max_workers=workers)
+  pending = deque()
+  try:
+    for start, end in itertools.islice(ranges, workers * 2):
+      pending.append((executor.submit(parse_copy_chunk, file_path, start, end, timestamp), end - start))
+
+    while pending and count < limit:
+      future, size = pending.popleft()
+      started = time.perf_counter()
+      data, rows, invalid, parse_seconds = future.result()
+      stats['wait_seconds'] += time.perf_counter() - started
+      stats['parse_seconds'] += parse_seconds
+      stats['bytes'] += size
+
+      for start, end in itertools.islice(ranges, 1):
+        pending.append((executor.submit(parse_copy_chunk, file_path, start, end, timestamp), end - start))
+
+      for line in invalid:
+        print(f"Skipping invalid JSON line: {line}...")
+
+      if count + rows > limit:
+        rows = limit - count
+        data = b''.join(data.splitlines(keepends=True)[:rows])
+      count += rows
+      yield data, rows
+  finally:
+    executor.shutdown(cancel_futures=True)
+
+def _drop_secondary_indexes(cursor):
+  """Drop the companies indexes that do not back a constraint, returning their definitions."""
+  cursor.execute("""
+    SELECT index_class.relname, pg_get_indexdef(index_class.oid)
+    FROM pg_index
+    JOIN pg_class index_class ON index_class.oid = pg_index.indexrelid
+    WHERE pg_index.indrelid = 'companies'::regclass
+      AND NOT EXISTS (SELECT 1 FROM pg_constraint WHERE pg_constraint.conindid = pg_index.indexrelid)
+  """)
+  indexes = cursor.fetchall()
+  for name, _ in indexes:
+    cursor.execute(f'DROP INDEX IF EXISTS "{name}"')
+  return indexes
+
+def copy_companies(chunks, defer_indexes=True):
+  """
+  Write chunks of COPY data to the companies table with COPY FROM STDIN.
+
+  Secondary indexes are dropped first and rebuilt once all rows are loaded,
+  then the table is analyzed. Each chunk is committed on its own.
+
+  Args:
+      chunks: Iterable of (COPY data as str or bytes, number of companies)
+      defer_indexes: Drop secondary indexes during the load
+
+  Returns:
+      Dictionary of rows loaded and seconds spent per stage
+  """
+  if db.engine.dialect.name != 'postgresql':
+    raise ValueError("The COPY loader requires PostgreSQL")
+
+  stats = {'rows': 0, 'copy_seconds': 0.0, 'index_seconds': 0.0, 'analyze_seconds': 0.0}
+  copy_sql = f"COPY companies ({', '.join(COPY_COLUMNS)}) FROM STDIN"
+  # Dropping indexes waits for every open transaction on the table, including this session's
+  db.session.close()
+  connection = db.engine.raw_connection()
+  try:
+    cursor = connection.cursor()
+    # Index rebuilds of a full load outlast the configured statement timeout
+    cursor.execute("SET statement_timeout = 0")
+    # Seed data can be reloaded, so losing the last commits in a crash is acceptable
+    cursor.execute("SET synchronous_commit = off")
+    indexes = _drop_secondary_indexes(cursor) if defer_indexes else []
+    connection.commit()
+
+    try:
+      with tqdm(desc="Loading companies", unit=' rows') as progress:
+        for data, rows in chunks:
+          started = time.perf_counter()
+          cursor.copy_expert(copy_sql, io.BytesIO(data) if isinstance(data, bytes) else io.StringIO(data))
+          connection.commit()
+          stats['copy_seconds'] += time.perf_counter() - started
+          stats['rows'] += rows
+          progress.update(rows)
+    finally:
+      connection.rollback()
+      started = time.perf_counter()
+      for name, definition in indexes:
+        print(f"Rebuilding index {name}...")
+        cursor.execute(definition)
+        connection.commit()
+      stats['index_seconds'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    cursor.execute("ANALYZE companies")
+    connection.commit()
+    stats['analyze_seconds'] = time.perf_counter() - started
+  finally:
+    connection.close()
+
+  return stats
+
+def bulk_load_sample_companies(
+  file_path,
+  limit=1000000,
+  chunk_rows=COPY_CHUNK_ROWS,
+  defer_indexes=True,
+  workers=1,
+  chunk_bytes=PARSE_CHUNK_BYTES
+):
+  """
+  Load sample companies from a JSONL file with COPY and report the throughput.
+
+  With more than one worker the file is parsed by a process pool, otherwise
+  line by line in this process.
+  """
+  print(f"Bulk loading up to {limit} sample companies from {file_path}...")
+
+  parse_stats = {}
+  if workers > 1:
+    chunks = read_copy_chunks_parallel(file_path, limit, workers, chunk_bytes, parse_stats)
+  else:
+    chunks = read_copy_chunks(file_path, limit, chunk_rows)
+
+  started = time.perf_counter()
+  stats = copy_companies(chunks, defer_indexes)
+  elapsed = time.perf_counter() - started
+
+  print(
+    f"Successfully loaded {stats['rows']} companies in {elapsed:.1f}s ({stats['rows'] / elapsed:.0f} rows/s; "
+    f"COPY {stats['copy_seconds']:.1f}s, index rebuild {stats['index_seconds']:.1f}s, ANALYZE {stats['analyze_seconds']:.1f}s)"
+  )
+  if parse_stats.get('parse_seconds'):
+    print(
+      f"Parsing: {parse_stats['bytes'] / 1e6:.0f} MB in {parse_stats['parse_seconds']:.1f} worker-seconds "
+      f"({stats['rows'] / parse_stats['parse_seconds']:.0f} rows/s and "
+      f"{parse_stats['bytes'] / 1e6 / parse_stats['parse_seconds']:.1f} MB/s per worker, {workers} workers); "
+      f"writer waited {parse_stats['wait_seconds']:.1f}s for parsed chunks"
+    )
+  if stats['copy_seconds']:
+    print(f"COPY: {stats['rows'] / stats['copy_seconds']:.0f} rows/s")
+  return dict(stats, **parse_stats)
+
 if __name__ == '__main__':
   app = create_app()
   parser = argparse.ArgumentParser(description='Load sample companies into the database.')
   parser.add_argument('--file', type=str, default='/Users/vasudua/Downloads/free_company_dataset.jsonl.json', help='Path to the JSONL file containing company data.')
+  parser.add_argument('--limit', type=int, default=1000000, help='Maximum number of companies to load.')
+  parser.add_argument('--mode', choices=['orm', 'copy'], default='orm', help='orm adds Company objects in batches of 1000, copy streams rows with COPY FROM STDIN (PostgreSQL only).')
+  parser.add_argument('--chunk-rows', type=int, default=COPY_CHUNK_ROWS, help='Rows per COPY statement in copy mode.')
+  parser.add_argument('--keep-indexes', action='store_true', help='Keep secondary indexes during a copy mode load.')
+  parser.add_argument('--workers', type=int, default=1, help='Processes parsing the file in copy mode, 0 for one per CPU.')
+  parser.add_argument('--chunk-mb', type=int, default=PARSE_CHUNK_BYTES // (1024 * 1024), help='MB of the file parsed per task with several workers.')
   args = parser.parse_args()
   
   with app.app_context():
@@ -81,4 +417,14 @@ if __name__ == '__main__':
       sys.exit(0)
     
     # Load sample data
-    load_sample_companies(args.file) 
\ No newline at end of file
+    if args.mode == 'copy':
+      bulk_load_sample_companies(
+        args.file,
+        args.limit,
+        args.chunk_rows,
+        defer_indexes=not args.keep_indexes,
+        workers=args.workers or os.cpu_count(),
+        chunk_bytes=args.chunk_mb * 1024 * 1024
+      )
+    else:
+      load_sample_companies(args.file, args.limit)
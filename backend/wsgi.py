@@ -0,0 +1,6 @@
+"""WSGI entry point for production servers, e.g. gunicorn -c gunicorn.conf.py wsgi:app"""
+import os
+
+from app import create_app
+
+app = create_app(os.getenv('FLASK_CONFIG', 'app.config.ProductionConfig'))